@@ -99,6 +99,13 @@ class GenerateRequest(BaseModel):
         max_length=2000
     )
     
+    design_id: Optional[str] = Field(
+        default=None,
+        description="Identifier of the design this spec belongs to. Resubmitting under the same id regenerates only modules whose spec sections changed",
+        example="uart_controller",
+        max_length=100
+    )
+    
     @validator('spec_text')
     def validate_spec_text(cls, v):
         """Validate specification text"""
@@ -112,14 +119,21 @@ class GenerateRequest(BaseModel):
         if v is None:
             return {}
         return v
+    
+    @validator('design_id')
+    def validate_design_id(cls, v):
+        """Validate design identifier"""
+        if v is not None and not all(c.isalnum() or c in ('-', '_', '.') for c in v):
+            raise ValueError('Design id may only contain letters, digits, "-", "_" and "."')
+        return v
 
 class TestbenchRequest(BaseModel):
     """
     Request model for testbench generation endpoint
     """
-    rtl_code: str = Field(
-        ...,
-        description="RTL code for which to generate testbench",
+    rtl_code: Optional[str] = Field(
+        default=None,
+        description="RTL code for which to generate testbench; read from the project when omitted",
         example="module my_module(input clk, input rst, output reg [7:0] data); ... endmodule",
         min_length=10,
         max_length=50000
@@ -151,13 +165,31 @@ class TestbenchRequest(BaseModel):
         example={"code_coverage": True, "functional_coverage": False}
     )
     
+    spec_text: Optional[str] = Field(
+        default=None,
+        description="Specification the RTL was generated from; its clocks, resets and register map guide the testbench",
+        max_length=10000
+    )
+    
+    project_id: Optional[str] = Field(
+        default=None,
+        description="Project whose RTL contains the module; its design hierarchy guides the testbench"
+    )
+    
     @validator('rtl_code')
     def validate_rtl_code(cls, v):
         """Validate RTL code"""
-        if 'module' not in v.lower() and 'entity' not in v.lower():
+        if v is not None and 'module' not in v.lower() and 'entity' not in v.lower():
             raise ValueError('RTL code must contain module or entity declaration')
         return v
     
+    @validator('project_id', always=True)
+    def validate_source(cls, v, values):
+        """Require RTL code, a project, or both"""
+        if not v and not values.get('rtl_code'):
+            raise ValueError('Either rtl_code or project_id is required')
+        return v
+    
     @validator('module_name')
     def validate_module_name(cls, v):
         """Validate module name"""
@@ -236,6 +268,28 @@ class AnalysisRequest(BaseModel):
         description="Analysis constraints"
     )
 
+class KnowledgeIngestRequest(BaseModel):
+    """
+    Request model for knowledge base ingestion endpoint
+    """
+    text: str = Field(
+        ...,
+        description="Document text to chunk and add to the knowledge base",
+        min_length=10
+    )
+    
+    source: str = Field(
+        ...,
+        description="Document source name",
+        example="axi4_lite_datasheet.pdf"
+    )
+    
+    doc_type: str = Field(
+        default="specification",
+        description="Document type stored in chunk metadata",
+        example="protocol"
+    )
+
 # Response Models
 class RAGContextItem(BaseModel):
     """
@@ -265,6 +319,35 @@ class PPAMetrics(BaseModel):
     complexity_score: Optional[float] = Field(None, description="Complexity score")
     optimization_suggestions: List[str] = Field(default=[], description="Optimization suggestions")
 
+class DesignUpdate(BaseModel):
+    """
+    Outcome of an incremental design update
+    """
+    design_id: str = Field(..., description="Design identifier")
+    changed_sections: List[str] = Field(default=[], description="Spec sections added, removed or edited since the last submission")
+    requirements_changed: bool = Field(False, description="Whether the structured requirements changed")
+    reused_modules: List[str] = Field(default=[], description="Modules reused from the previous generation")
+    regenerated_modules: List[str] = Field(default=[], description="Modules generated by this request")
+
+class SubmoduleResult(BaseModel):
+    """
+    Generation outcome of one submodule of a hierarchical design
+    """
+    name: str = Field(..., description="Planned submodule name")
+    module_name: str = Field(..., description="Name of the generated module")
+    depends_on: List[str] = Field(default=[], description="Submodules this module instantiates")
+    status: str = Field(..., description="generated, reused, failed, or skipped (a dependency failed)")
+    attempts: int = Field(0, description="LLM attempts made")
+    error: Optional[str] = Field(None, description="Last error for failed or skipped submodules")
+
+class DesignHierarchy(BaseModel):
+    """
+    Submodule breakdown of a hierarchically generated design
+    """
+    top_module: str = Field(..., description="Top-level module")
+    modules: List[SubmoduleResult] = Field(..., description="Submodules in dependency order, top last")
+    failed_modules: List[str] = Field(default=[], description="Submodules that were not generated; resubmit with the same design_id to retry them")
+
 class RTLResponse(BaseModel):
     """
     Response model for RTL generation endpoint
@@ -295,6 +378,16 @@ class RTLResponse(BaseModel):
         description="Requirements used for generation"
     )
     
+    design: Optional[DesignUpdate] = Field(
+        None,
+        description="Incremental update details when a design_id was given"
+    )
+    
+    hierarchy: Optional[DesignHierarchy] = Field(
+        None,
+        description="Submodule breakdown when the spec was generated hierarchically"
+    )
+    
     generation_time: float = Field(
         ...,
         description="Generation time in seconds"
@@ -495,6 +588,26 @@ class AnalysisResponse(BaseModel):
     analysis_time: float = Field(..., description="Analysis time in seconds")
     timestamp: datetime = Field(..., description="Analysis timestamp")
 
+class RemovedChunk(BaseModel):
+    """
+    Near-duplicate chunk dropped during ingestion
+    """
+    chunk_index: int = Field(..., description="Index of the chunk within the document")
+    duplicate_of: str = Field(..., description="ID of the stored chunk it duplicates")
+    hamming_distance: int = Field(..., description="SimHash distance to the stored chunk")
+    preview: str = Field(..., description="Start of the dropped chunk text")
+
+class KnowledgeIngestResponse(BaseModel):
+    """
+    Response model for knowledge base ingestion endpoint
+    """
+    document_id: str = Field(..., description="Document identifier")
+    chunks_total: int = Field(..., description="Chunks produced from the document")
+    chunks_added: int = Field(..., description="Chunks stored in the knowledge base")
+    chunks_removed: int = Field(..., description="Near-duplicate chunks dropped")
+    bytes_removed: int = Field(..., description="Text bytes not indexed due to deduplication")
+    removed: List[RemovedChunk] = Field(default=[], description="Dropped chunks")
+
 class ErrorResponse(BaseModel):
     """
     Standard error response model
@@ -577,6 +690,42 @@ class ProjectFilesResponse(BaseModel):
         description="File count by type"
     )
 
+class ModuleVersion(BaseModel):
+    """
+    One entry in a module's generation history
+    """
+    module_name: str = Field(..., description="Module name")
+    version: int = Field(..., description="Version number (1-based)")
+    kind: str = Field(..., description="Storage kind: full copy or delta against the previous version")
+    size: int = Field(..., description="Source size in bytes")
+    stored_size: int = Field(..., description="Bytes stored for this version")
+    content_hash: str = Field(..., description="SHA-256 of the source")
+    file_path: Optional[str] = Field(None, description="Artifact path written for this version")
+    created_at: datetime = Field(..., description="Creation timestamp")
+    metadata: Optional[Dict[str, Any]] = Field(None, description="Generation metadata")
+
+class ModuleVersionListResponse(BaseModel):
+    """
+    Response model for a module's version history
+    """
+    module_name: str = Field(..., description="Module name")
+    project_id: Optional[str] = Field(None, description="Project identifier")
+    versions: List[ModuleVersion] = Field(..., description="Versions, oldest first")
+    total_versions: int = Field(..., description="Number of versions")
+    total_size: int = Field(..., description="Combined source size of all versions")
+    total_stored_size: int = Field(..., description="Bytes actually stored for all versions")
+
+class VersionDiffResponse(BaseModel):
+    """
+    Response model for a diff between two module versions
+    """
+    module_name: str = Field(..., description="Module name")
+    from_version: int = Field(..., description="Older version")
+    to_version: int = Field(..., description="Newer version")
+    diff: str = Field(..., description="Unified diff")
+    lines_added: int = Field(..., description="Lines added")
+    lines_removed: int = Field(..., description="Lines removed")
+
 # Batch operation models
 class BatchGenerateRequest(BaseModel):
     """
@@ -607,6 +756,99 @@ class BatchGenerateResponse(BaseModel):
     batch_id: str = Field(..., description="Batch identifier")
     processing_time: float = Field(..., description="Total processing time in seconds")
 
+class BatchUploadResult(BaseModel):
+    """
+    Per-file result of a batch specification upload
+    """
+    filename: str = Field(..., description="Original filename")
+    success: bool = Field(..., description="Whether the file was saved and parsed")
+    file: Optional[FileUploadResponse] = Field(None, description="Upload and parse result")
+    error: Optional[str] = Field(None, description="Error message if the file failed")
+
+class BatchUploadResponse(BaseModel):
+    """
+    Response model for batch specification upload
+    """
+    results: List[BatchUploadResult] = Field(..., description="Results in upload order")
+    total_processed: int = Field(..., description="Total files processed")
+    successful: int = Field(..., description="Number of files saved and parsed")
+    failed: int = Field(..., description="Number of failed files")
+    
+    # Batch metadata
+    batch_id: str = Field(..., description="Batch identifier")
+    processing_time: float = Field(..., description="Total processing time in seconds")
+
+class RTLSource(BaseModel):
+    """
+    One named source of a batch RTL analysis
+    """
+    filename: str = Field(..., description="Name reported with the source's result", example="uart_tx.v")
+    rtl_code: str = Field(..., description="RTL code to analyze", min_length=1)
+
+class BatchAnalysisRequest(BaseModel):
+    """
+    Request model for batch RTL analysis
+    """
+    sources: Optional[List[RTLSource]] = Field(
+        default=None,
+        description="RTL sources to analyze"
+    )
+    
+    project_id: Optional[str] = Field(
+        default=None,
+        description="Analyze every Verilog/SystemVerilog file of this project"
+    )
+    
+    analysis_type: List[str] = Field(
+        default=["syntax", "complexity"],
+        description="Types of analysis to perform on each source",
+        example=["syntax", "complexity", "ppa_estimation", "port_analysis"]
+    )
+    
+    @validator('project_id', always=True)
+    def validate_selection(cls, v, values):
+        """Require sources, a project, or both"""
+        if not v and not values.get('sources'):
+            raise ValueError('Either sources or project_id is required')
+        return v
+
+class BatchAnalysisFileResult(BaseModel):
+    """
+    Per-file line of a batch RTL analysis stream
+    """
+    type: str = Field(default="file", description="Line type")
+    index: int = Field(..., description="Position of the source in the batch")
+    filename: str = Field(..., description="Source name")
+    file_path: Optional[str] = Field(None, description="Artifact path for project files")
+    success: bool = Field(..., description="Whether the source was read and analyzed")
+    results: Dict[str, Any] = Field(default_factory=dict, description="Results by analysis type")
+    modules: List[str] = Field(default_factory=list, description="Modules declared in the source")
+    instantiates: List[str] = Field(default_factory=list, description="Modules the source instantiates")
+    errors: int = Field(default=0, description="Parse errors found")
+    warnings: int = Field(default=0, description="Parse warnings found")
+    error: Optional[str] = Field(None, description="Error message if the source failed")
+
+class BatchAnalysisSummary(BaseModel):
+    """
+    Final line of a batch RTL analysis stream
+    """
+    type: str = Field(default="summary", description="Line type")
+    batch_id: str = Field(..., description="Batch identifier")
+    project_id: Optional[str] = Field(None, description="Project analyzed, if any")
+    total_processed: int = Field(..., description="Total sources processed")
+    successful: int = Field(..., description="Number of sources analyzed")
+    failed: int = Field(..., description="Number of sources that could not be read or analyzed")
+    skipped: List[str] = Field(default_factory=list, description="Project RTL files the Verilog parser does not read (VHDL)")
+    files_with_errors: List[str] = Field(default_factory=list, description="Sources with parse errors")
+    total_errors: int = Field(..., description="Parse errors across all sources")
+    total_warnings: int = Field(..., description="Parse warnings across all sources")
+    metrics: Dict[str, int] = Field(default_factory=dict, description="Line and token counts summed over all sources")
+    modules: int = Field(..., description="Modules declared across all sources")
+    top_modules: List[str] = Field(default_factory=list, description="Declared modules no source instantiates")
+    undefined_modules: List[str] = Field(default_factory=list, description="Instantiated modules no source declares")
+    duplicate_modules: List[str] = Field(default_factory=list, description="Modules declared in more than one source")
+    processing_time: float = Field(..., description="Total processing time in seconds")
+
 # Configuration models
 class ServiceConfig(BaseModel):
     """
@@ -9,9 +9,9 @@ This module contains all FastAPI route definitions for:
 - Health checks and system status
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Query, Path
-from fastapi.responses import JSONResponse, FileResponse
-from typing import List, Optional, Dict, Any
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Query, Path, Request
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse
+from typing import List, Optional, Dict, Any, Tuple
 import os
 import uuid
 import asyncio
@@ -30,10 +30,19 @@ from .models import (
     AnalysisRequest,
     AnalysisResponse,
     SearchResponse,
+    KnowledgeIngestRequest,
+    KnowledgeIngestResponse,
     ProjectListResponse,
     ProjectFilesResponse,
+    ModuleVersionListResponse,
+    VersionDiffResponse,
     BatchGenerateRequest,
     BatchGenerateResponse,
+    BatchUploadResult,
+    BatchUploadResponse,
+    BatchAnalysisRequest,
+    BatchAnalysisFileResult,
+    BatchAnalysisSummary,
     APIInfoResponse,
     OptimizationTarget,
     RTLanguage,
@@ -45,21 +54,29 @@ from app.services import (
     vip_generator,
     file_service,
     rag_service,
+    artifact_store,
+    version_store,
+    catalog,
+    retention_worker,
+    parse_cache,
+    design_store,
+    rtl_analysis_cache,
+    design_index,
     get_service_status,
     check_all_services_health,
     app_state
 )
 
 from app.utils import (
-    FileParser,
     TextProcessor,
-    CodeFormatter,
-    SpecificationValidator,
     generate_module_name,
-    validate_verilog_syntax,
-    calculate_pp_metrics,
+    analyze_specification,
     performance_timer
 )
+from app.utils.zip_stream import ZipStream
+from app.services.process_pool import run_in_process
+from app.services.rtl_analysis_cache import ANALYSES, analyze_rtl_source
+from app.core.config import settings
 
 # Create main API router
 router = APIRouter()
@@ -67,6 +84,8 @@ router = APIRouter()
 # In-memory storage for background tasks (in production, use Redis or database)
 background_tasks: Dict[str, Dict[str, Any]] = {}
 
+SPEC_UPLOAD_EXTENSIONS = {'.txt', '.md', '.yaml', '.yml', '.json', '.pdf', '.doc', '.docx'}
+
 # RTL Generation Endpoints
 @router.post(
     "/generate-rtl",
@@ -89,6 +108,7 @@ async def generate_rtl(request: GenerateRequest):
     - **optimization_target**: Power, Performance, Area, or Balanced optimization
     - **language**: Target RTL language (Verilog, VHDL, SystemVerilog)
     - **include_testbench**: Whether to generate testbench (handled separately)
+    - **design_id**: Update an existing design, regenerating only modules whose spec sections changed
     
     Returns generated RTL code with validation results and PPA metrics.
     """
@@ -96,33 +116,56 @@ async def generate_rtl(request: GenerateRequest):
         app_state.increment_requests()
         
         with performance_timer("RTL Generation"):
+            # Work out which modules of an existing design the edit affects
+            design_plan = None
+            if request.design_id:
+                design_plan = await asyncio.to_thread(
+                    design_store.plan, request.design_id, request.spec_text, request.requirements
+                )
+            
             # Generate RTL using the RTL generator service
             result = await rtl_generator.generate_from_spec(
                 spec_text=request.spec_text,
-                requirements=request.requirements
+                requirements=request.requirements,
+                design_plan=design_plan
             )
             
-            # Add PPA metrics
-            ppa_metrics = calculate_pp_metrics(result["code"])
-            result["ppa_metrics"] = ppa_metrics
+            # Add PPA metrics; the other analyses are cached alongside for /analyze-rtl
+            analyses = await asyncio.to_thread(rtl_analysis_cache.analyze, result["code"], list(ANALYSES))
+            result["ppa_metrics"] = analyses["ppa_estimation"]
             
             # Add generation metadata
             result["language"] = request.language
             result["optimization_target"] = request.optimization_target
             result["generation_time"] = performance_timer.duration if hasattr(performance_timer, 'duration') else 0
             
-            # Save generated RTL to file
-            if result["code"]:
-                await file_service.save_generated_rtl(
-                    rtl_code=result["code"],
-                    module_name=result["module_name"],
+            # Save each generated module (reused modules are already stored)
+            regenerated = {}
+            for module in result.get("modules", []):
+                if module["reused"] or not module["code"]:
+                    continue
+                saved = await file_service.save_generated_rtl(
+                    rtl_code=module["code"],
+                    module_name=module["module_name"],
                     metadata={
                         "specification": request.spec_text[:500] + "..." if len(request.spec_text) > 500 else request.spec_text,
                         "requirements": request.requirements,
                         "optimization_target": request.optimization_target,
-                        "generation_time": result["generation_time"]
+                        "generation_time": result["generation_time"],
+                        "design_id": request.design_id
                     }
                 )
+                regenerated[module["name"]] = {
+                    "module_name": module["module_name"],
+                    "sections": module["sections"],
+                    "version": saved["version"]
+                }
+            
+            if design_plan is not None:
+                # Only the modules this spec produced stay part of the design
+                design_plan = design_store.limit_to(design_plan, [module["name"] for module in result.get("modules", [])])
+                await asyncio.to_thread(design_store.record, design_plan, regenerated)
+                result["design"] = design_store.describe(design_plan, list(regenerated))
             
             app_state.increment_rtl()
         
@@ -159,6 +202,10 @@ async def generate_testbench(request: TestbenchRequest):
     - **module_name**: Name of the module under test
     - **test_scenarios**: Specific test scenarios to include
     - **verification_methodology**: UVM, OVM, or basic testbench
+    - **spec_text**: Optional source specification for clock, reset and register details
+    - **project_id**: Optional project containing the module; its elaborated
+      hierarchy guides the testbench, and the RTL is read from the project
+      when rtl_code is omitted
     
     Returns generated testbench code with implemented scenarios.
     """
@@ -166,10 +213,24 @@ async def generate_testbench(request: TestbenchRequest):
         app_state.increment_requests()
         
         with performance_timer("Testbench Generation"):
+            spec_ir = None
+            if request.spec_text:
+                spec_ir = await asyncio.to_thread(parse_cache.get_spec_ir, request.spec_text)
+            
+            design = None
+            rtl_code = request.rtl_code
+            if request.project_id:
+                design = await design_index.get_design_context(request.project_id, request.module_name)
+                if rtl_code is None:
+                    content = await asyncio.to_thread(file_service.read_artifact, design["file_path"])
+                    rtl_code = content.decode('utf-8', errors='replace')
+            
             # Generate testbench using VIP generator service
             result = await vip_generator.generate_testbench(
-                rtl_code=request.rtl_code,
-                module_name=request.module_name
+                rtl_code=rtl_code,
+                module_name=request.module_name,
+                spec_ir=spec_ir,
+                design=design
             )
             
             # Add test scenarios and metadata
@@ -187,6 +248,16 @@ async def generate_testbench(request: TestbenchRequest):
         
         return TestbenchResponse(**result)
         
+    except ValueError as e:
+        app_state.increment_errors()
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                error="DESIGN_NOT_FOUND",
+                message=str(e),
+                suggestion="Check the project ID and that the module is defined in one of its RTL files."
+            ).dict()
+        )
     except Exception as e:
         app_state.increment_errors()
         raise HTTPException(
@@ -199,6 +270,42 @@ async def generate_testbench(request: TestbenchRequest):
         )
 
 # File Management Endpoints
+async def _analyze_cached(content: str, file_type: str, content_hash: str = None) -> Dict[str, Any]:
+    """Run analyze_specification through the parse cache"""
+    content_hash = content_hash or parse_cache.hash_text(content)
+    parsed_data = await asyncio.to_thread(parse_cache.get, content_hash, file_type)
+    if parsed_data is None:
+        parsed_data = await run_in_process(analyze_specification, content, file_type)
+        await asyncio.to_thread(parse_cache.put, content_hash, file_type, parsed_data)
+    parsed_data["raw_text"] = content
+    return parsed_data
+
+async def _process_spec_upload(file: UploadFile, project_id: Optional[str], ingest: bool) -> Dict[str, Any]:
+    """
+    Save, parse and optionally ingest one uploaded specification
+    
+    Parse results are cached by upload hash; on a miss parsing runs in the
+    process pool so large specs do not block the event loop. rag_service
+    serializes ingestion itself, since the near-duplicate index is shared
+    across documents.
+    """
+    file_extension = os.path.splitext(file.filename)[1].lower()
+    file_metadata = await file_service.save_uploaded_file(file, project_id)
+    file_content = await file_service.read_file_content(file_metadata["file_path"])
+    
+    parsed_data = await _analyze_cached(file_content, file_extension, file_metadata["content_hash"])
+    
+    if ingest:
+        metadata = {"type": "specification", "source": file.filename}
+        parsed_data["knowledge_base"] = await asyncio.to_thread(
+            rag_service.ingest_document, file_content, metadata
+        )
+    
+    return {
+        **file_metadata,
+        "parsed_data": parsed_data
+    }
+
 @router.post(
     "/upload-spec",
     response_model=FileUploadResponse,
@@ -213,7 +320,8 @@ Automatically extracts interfaces, protocols, and parameters.
 )
 async def upload_specification(
     file: UploadFile = File(..., description="Specification file to upload"),
-    project_id: Optional[str] = Query(None, description="Optional project ID for organization")
+    project_id: Optional[str] = Query(None, description="Optional project ID for organization"),
+    ingest: bool = Query(False, description="Also add the extracted text to the knowledge base")
 ):
     """
     Upload and parse specification file.
@@ -226,41 +334,19 @@ async def upload_specification(
         app_state.increment_requests()
         
         # Validate file type
-        allowed_extensions = {'.txt', '.md', '.yaml', '.yml', '.json', '.pdf', '.doc', '.docx'}
         file_extension = os.path.splitext(file.filename)[1].lower()
         
-        if file_extension not in allowed_extensions:
+        if file_extension not in SPEC_UPLOAD_EXTENSIONS:
             raise HTTPException(
                 status_code=400,
                 detail=ErrorResponse(
                     error="INVALID_FILE_TYPE",
                     message=f"File type {file_extension} not supported",
-                    suggestion=f"Please upload one of: {', '.join(allowed_extensions)}"
+                    suggestion=f"Please upload one of: {', '.join(sorted(SPEC_UPLOAD_EXTENSIONS))}"
                 ).dict()
             )
         
-        # Save uploaded file
-        file_metadata = await file_service.save_uploaded_file(file, project_id)
-        
-        # Read and parse file content
-        file_content = await file_service.read_file_content(file_metadata["file_path"])
-        
-        # Parse specification
-        parsed_data = FileParser.parse_specification(file_content, file_extension)
-        
-        # Add complexity analysis
-        complexity = TextProcessor.estimate_complexity(file_content)
-        parsed_data["complexity_analysis"] = complexity
-        
-        # Validate specification structure
-        validation = SpecificationValidator.validate_specification_structure(parsed_data)
-        parsed_data["validation"] = validation
-        
-        response_data = {
-            **file_metadata,
-            "parsed_data": parsed_data
-        }
-        
+        response_data = await _process_spec_upload(file, project_id, ingest)
         return FileUploadResponse(**response_data)
         
     except HTTPException:
@@ -350,10 +436,9 @@ async def list_projects(
     Returns paginated list of projects with basic information.
     """
     try:
-        # This would typically query a database
-        # For now, return empty list as we're using file-based storage
-        projects = []
-        total_projects = 0
+        result = await file_service.list_projects(page=page, page_size=page_size)
+        projects = [ProjectResponse(**project) for project in result["projects"]]
+        total_projects = result["total_projects"]
         
         return ProjectListResponse(
             projects=projects,
@@ -380,29 +465,29 @@ async def list_projects(
     tags=["Project Management"]
 )
 async def get_project_files(
-    project_id: str = Path(..., description="Project ID")
+    project_id: str = Path(..., description="Project ID"),
+    category: Optional[str] = Query(None, description="Only list files in this category"),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(1000, ge=1, le=10000, description="Files per page")
 ):
     """
     Get all files in a project.
     
     Returns files organized by category (specifications, RTL, testbenches, etc.)
-    with detailed file information.
+    with detailed file information. Totals cover the whole project, not just
+    the returned page.
     """
     try:
-        project_files = await file_service.get_project_files(project_id)
-        
-        # Calculate statistics
-        total_files = sum(len(files) for files in project_files.values())
-        total_size = 0  # Would calculate from actual files
-        
-        file_type_breakdown = {category: len(files) for category, files in project_files.items()}
+        project_files = await file_service.get_project_files(
+            project_id, category=category, page=page, page_size=page_size
+        )
         
         return ProjectFilesResponse(
             project_id=project_id,
-            files=project_files,
-            total_files=total_files,
-            total_size=total_size,
-            file_type_breakdown=file_type_breakdown
+            files=project_files["files"],
+            total_files=project_files["total_files"],
+            total_size=project_files["total_size"],
+            file_type_breakdown=project_files["file_type_breakdown"]
         )
         
     except ValueError as e:
@@ -422,6 +507,137 @@ async def get_project_files(
             ).dict()
         )
 
+# Version History Endpoints
+@router.get(
+    "/modules/{module_name}/versions",
+    response_model=ModuleVersionListResponse,
+    summary="List Module Versions",
+    description="Get the generation history of an RTL module.",
+    tags=["Version History"]
+)
+async def list_module_versions(
+    module_name: str = Path(..., description="Module name"),
+    project_id: Optional[str] = Query(None, description="Project the module belongs to")
+):
+    """
+    List module versions.
+    
+    Returns every saved version with its storage kind (full copy or delta)
+    and the bytes stored for it.
+    """
+    try:
+        versions = await asyncio.to_thread(version_store.list_versions, module_name, project_id)
+        if not versions:
+            raise ValueError(f"No versions found for module {module_name}")
+        
+        return ModuleVersionListResponse(
+            module_name=module_name,
+            project_id=project_id,
+            versions=versions,
+            total_versions=len(versions),
+            total_size=sum(v["size"] for v in versions),
+            total_stored_size=sum(v["stored_size"] for v in versions)
+        )
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                error="MODULE_NOT_FOUND",
+                message=str(e)
+            ).dict()
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="VERSION_LIST_ERROR",
+                message=f"Failed to list module versions: {str(e)}"
+            ).dict()
+        )
+
+@router.get(
+    "/modules/{module_name}/diff",
+    response_model=VersionDiffResponse,
+    summary="Diff Module Versions",
+    description="Get a unified diff between two versions of an RTL module.",
+    tags=["Version History"]
+)
+async def diff_module_versions(
+    module_name: str = Path(..., description="Module name"),
+    from_version: int = Query(..., ge=1, description="Older version"),
+    to_version: Optional[int] = Query(None, ge=1, description="Newer version (defaults to the latest)"),
+    project_id: Optional[str] = Query(None, description="Project the module belongs to"),
+    context_lines: int = Query(3, ge=0, le=50, description="Unchanged lines around each change")
+):
+    """
+    Diff two module versions.
+    """
+    try:
+        diff = await asyncio.to_thread(
+            version_store.diff, module_name, from_version, to_version, project_id, context_lines
+        )
+        return VersionDiffResponse(**diff)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                error="VERSION_NOT_FOUND",
+                message=str(e)
+            ).dict()
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="VERSION_DIFF_ERROR",
+                message=f"Failed to diff module versions: {str(e)}"
+            ).dict()
+        )
+
+@router.get(
+    "/modules/{module_name}/versions/{version}",
+    summary="Get Module Version",
+    description="Get the RTL source of one version of a module.",
+    tags=["Version History"]
+)
+async def get_module_version(
+    module_name: str = Path(..., description="Module name"),
+    version: int = Path(..., ge=1, description="Version number"),
+    project_id: Optional[str] = Query(None, description="Project the module belongs to")
+):
+    """
+    Get a module version.
+    
+    Rebuilds the version from its nearest full copy and the deltas after it.
+    """
+    try:
+        rtl_code = await asyncio.to_thread(version_store.get_version, module_name, version, project_id)
+        return {
+            "module_name": module_name,
+            "version": version,
+            "project_id": project_id,
+            "rtl_code": rtl_code
+        }
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                error="VERSION_NOT_FOUND",
+                message=str(e)
+            ).dict()
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="VERSION_READ_ERROR",
+                message=f"Failed to read module version: {str(e)}"
+            ).dict()
+        )
+
 # Analysis and Search Endpoints
 @router.post(
     "/analyze-rtl",
@@ -443,18 +659,10 @@ async def analyze_rtl(request: AnalysisRequest):
         app_state.increment_requests()
         
         analysis_id = str(uuid.uuid4())
-        results = {}
-        
-        # Perform requested analyses
-        for analysis_type in request.analysis_type:
-            if analysis_type == "syntax":
-                results["syntax"] = validate_verilog_syntax(request.rtl_code)
-            elif analysis_type == "complexity":
-                results["complexity"] = CodeFormatter.count_code_metrics(request.rtl_code)
-            elif analysis_type == "ppa_estimation":
-                results["ppa_estimation"] = calculate_pp_metrics(request.rtl_code)
-            elif analysis_type == "port_analysis":
-                results["port_analysis"] = CodeFormatter.extract_module_ports(request.rtl_code)
+        
+        # Perform requested analyses; the source is parsed once and results
+        # are cached by content hash, so repeats skip the work entirely
+        results = await asyncio.to_thread(rtl_analysis_cache.analyze, request.rtl_code, request.analysis_type)
         
         # Generate summary and recommendations
         summary = {
@@ -489,6 +697,149 @@ async def analyze_rtl(request: AnalysisRequest):
             ).dict()
         )
 
+# Design Hierarchy Endpoints
+@router.get(
+    "/projects/{project_id}/design",
+    summary="Get Design Index",
+    description="Index a project's RTL files into a module table and instance graph, re-reading only changed files.",
+    tags=["Analysis"]
+)
+async def get_design_index(project_id: str = Path(..., description="Project ID")):
+    """
+    Get the design index of a project.
+    
+    Returns every module with its file, parameters, ports and instances,
+    the instance graph, top-level modules, and modules that are
+    instantiated but never defined or defined more than once.
+    """
+    try:
+        app_state.increment_requests()
+        return await design_index.get_index(project_id)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                error="PROJECT_NOT_FOUND",
+                message=str(e)
+            ).dict()
+        )
+    except Exception as e:
+        app_state.increment_errors()
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="DESIGN_INDEX_ERROR",
+                message=f"Failed to index design: {str(e)}"
+            ).dict()
+        )
+
+@router.get(
+    "/projects/{project_id}/design/hierarchy",
+    summary="Elaborate Design Hierarchy",
+    description="Elaborate a project's design from its top-level modules, resolving parameters on every instance.",
+    tags=["Analysis"]
+)
+async def get_design_hierarchy(
+    project_id: str = Path(..., description="Project ID"),
+    top: Optional[str] = Query(None, description="Module to elaborate from (defaults to every top-level module)")
+):
+    """
+    Elaborate the design hierarchy of a project.
+    
+    Returns the instance tree under each top with resolved parameters,
+    the total instance count, and elaboration issues such as unknown
+    ports, bad parameter overrides and undefined modules.
+    """
+    try:
+        app_state.increment_requests()
+        return await design_index.elaborate(project_id, top)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                error="DESIGN_NOT_FOUND",
+                message=str(e)
+            ).dict()
+        )
+    except Exception as e:
+        app_state.increment_errors()
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="ELABORATION_ERROR",
+                message=f"Design elaboration failed: {str(e)}"
+            ).dict()
+        )
+
+@router.post(
+    "/projects/{project_id}/design/analyze",
+    response_model=AnalysisResponse,
+    summary="Analyze Design",
+    description="Run RTL analyses on a project's whole design instead of a single source.",
+    tags=["Analysis"]
+)
+async def analyze_design(
+    project_id: str = Path(..., description="Project ID"),
+    top: Optional[str] = Query(None, description="Module to analyze from (defaults to every top-level module)"),
+    analysis_type: List[str] = Query(["syntax", "complexity"], description="Types of analysis to perform")
+):
+    """
+    Analyze a project's design.
+    
+    Syntax results include cross-module elaboration issues, complexity
+    covers every module in the hierarchy, and PPA is estimated from the
+    flattened design.
+    """
+    try:
+        app_state.increment_requests()
+        
+        analysis_id = str(uuid.uuid4())
+        
+        with performance_timer("Design Analysis"):
+            results = await design_index.analyze_design(project_id, analysis_type, top)
+        
+        summary = {
+            "total_analyses": len(analysis_type),
+            "completed_analyses": list(results.keys()),
+            "overall_quality": "good"  # Would calculate based on results
+        }
+        
+        recommendations = []
+        if "syntax" in results and not results["syntax"]["valid"]:
+            recommendations.append("Fix syntax and elaboration issues in the design")
+        if "complexity" in results and results["complexity"]["always_blocks"] > 10:
+            recommendations.append("Consider simplifying design - high number of always blocks")
+        
+        return AnalysisResponse(
+            analysis_id=analysis_id,
+            analysis_type=analysis_type,
+            results=results,
+            summary=summary,
+            recommendations=recommendations,
+            analysis_time=performance_timer.duration if hasattr(performance_timer, 'duration') else 0,
+            timestamp=datetime.now()
+        )
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                error="DESIGN_NOT_FOUND",
+                message=str(e)
+            ).dict()
+        )
+    except Exception as e:
+        app_state.increment_errors()
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="ANALYSIS_ERROR",
+                message=f"Design analysis failed: {str(e)}"
+            ).dict()
+        )
+
 @router.get(
     "/search",
     response_model=SearchResponse,
@@ -498,7 +849,8 @@ async def analyze_rtl(request: AnalysisRequest):
 )
 async def search_knowledge_base(
     query: str = Query(..., description="Search query"),
-    n_results: int = Query(5, ge=1, le=20, description="Number of results to return")
+    n_results: int = Query(5, ge=1, le=20, description="Number of results to return"),
+    rerank: Optional[bool] = Query(None, description="Re-rank candidates with the cross-encoder (defaults to server setting)")
 ):
     """
     Search knowledge base.
@@ -510,7 +862,7 @@ async def search_knowledge_base(
         app_state.increment_requests()
         
         with performance_timer("Knowledge Base Search"):
-            results = rag_service.query(query, n_results=n_results)
+            results = await asyncio.to_thread(rag_service.query, query, n_results=n_results, rerank=rerank)
         
         return SearchResponse(
             query=query,
@@ -529,6 +881,80 @@ async def search_knowledge_base(
             ).dict()
         )
 
+@router.get(
+    "/files/search",
+    summary="Search Design Files",
+    description="Full-text search over uploaded specifications, RTL and testbenches with ranked results and snippets.",
+    tags=["File Management"]
+)
+async def search_design_files(
+    query: str = Query(..., min_length=1, description="Search text; identifiers match whole or by their parts, a trailing * matches a prefix"),
+    project_id: Optional[str] = Query(None, description="Restrict the search to a project"),
+    limit: int = Query(20, ge=1, le=200, description="Maximum number of results")
+):
+    """
+    Search design files.
+    
+    Returns matching files ranked by relevance, each with a highlighted
+    snippet of the matching content.
+    """
+    try:
+        app_state.increment_requests()
+        
+        with performance_timer("File Search"):
+            results = await file_service.search_files(query, project_id=project_id, limit=limit)
+        
+        return {
+            "query": query,
+            "results": results,
+            "total_results": len(results)
+        }
+        
+    except Exception as e:
+        app_state.increment_errors()
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="FILE_SEARCH_ERROR",
+                message=f"File search failed: {str(e)}"
+            ).dict()
+        )
+
+@router.post(
+    "/knowledge/ingest",
+    response_model=KnowledgeIngestResponse,
+    summary="Ingest Document into Knowledge Base",
+    description="Chunk a document into the RAG knowledge base, dropping near-duplicate chunks such as repeated boilerplate.",
+    tags=["Analysis"]
+)
+async def ingest_knowledge(request: KnowledgeIngestRequest):
+    """
+    Ingest document into knowledge base.
+    
+    Returns a report of stored chunks and the near-duplicates that were removed.
+    """
+    try:
+        app_state.increment_requests()
+        
+        with performance_timer("Knowledge Base Ingestion"):
+            report = await asyncio.to_thread(
+                rag_service.ingest_document,
+                request.text,
+                {"type": request.doc_type, "source": request.source}
+            )
+        
+        return KnowledgeIngestResponse(**report)
+        
+    except Exception as e:
+        app_state.increment_errors()
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="INGESTION_ERROR",
+                message=f"Knowledge base ingestion failed: {str(e)}"
+            ).dict()
+        )
+
 # Batch Operations
 @router.post(
     "/batch/generate-rtl",
@@ -601,6 +1027,241 @@ async def batch_generate_rtl(request: BatchGenerateRequest):
             ).dict()
         )
 
+@router.post(
+    "/batch/upload-spec",
+    response_model=BatchUploadResponse,
+    summary="Batch Specification Upload",
+    description="""
+Upload and parse many specification files in one multipart request.
+
+Files are streamed to disk and parsed in parallel in the worker process
+pool. Each file gets its own result, so one bad file does not fail the batch.
+    """,
+    tags=["Batch Operations"]
+)
+async def batch_upload_specifications(
+    files: List[UploadFile] = File(..., description="Specification files to upload"),
+    project_id: Optional[str] = Query(None, description="Optional project ID for organization"),
+    ingest: bool = Query(False, description="Also add each file's text to the knowledge base")
+):
+    """
+    Batch upload and parse specification files.
+    
+    - **files**: Specification files (.txt, .md, .yaml, .yml, .json, .pdf, .doc, .docx)
+    - **project_id**: Optional project to file them under
+    - **ingest**: Add each parsed file to the knowledge base
+    
+    Returns per-file results in upload order with batch statistics.
+    """
+    try:
+        app_state.increment_requests()
+        
+        if len(files) > settings.BATCH_UPLOAD_MAX_FILES:
+            raise HTTPException(
+                status_code=400,
+                detail=ErrorResponse(
+                    error="BATCH_TOO_LARGE",
+                    message=f"Batch contains {len(files)} files",
+                    suggestion=f"Upload at most {settings.BATCH_UPLOAD_MAX_FILES} files per batch"
+                ).dict()
+            )
+        
+        batch_id = str(uuid.uuid4())
+        start_time = datetime.now()
+        semaphore = asyncio.Semaphore(settings.BATCH_UPLOAD_CONCURRENCY)
+        
+        async def process(file: UploadFile) -> BatchUploadResult:
+            file_extension = os.path.splitext(file.filename)[1].lower()
+            if file_extension not in SPEC_UPLOAD_EXTENSIONS:
+                return BatchUploadResult(
+                    filename=file.filename,
+                    success=False,
+                    error=f"File type {file_extension} not supported"
+                )
+            try:
+                async with semaphore:
+                    response_data = await _process_spec_upload(file, project_id, ingest)
+                return BatchUploadResult(
+                    filename=file.filename,
+                    success=True,
+                    file=FileUploadResponse(**response_data)
+                )
+            except Exception as e:
+                app_state.increment_errors()
+                return BatchUploadResult(filename=file.filename, success=False, error=str(e))
+        
+        results = await asyncio.gather(*(process(file) for file in files))
+        successful = sum(1 for result in results if result.success)
+        
+        return BatchUploadResponse(
+            results=results,
+            total_processed=len(files),
+            successful=successful,
+            failed=len(files) - successful,
+            batch_id=batch_id,
+            processing_time=(datetime.now() - start_time).total_seconds()
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        app_state.increment_errors()
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="BATCH_UPLOAD_ERROR",
+                message=f"Batch upload failed: {str(e)}"
+            ).dict()
+        )
+
+async def _stream_batch_analysis(sources: List[Dict[str, Any]], analysis_types: List[str], batch_id: str,
+                                 project_id: Optional[str], skipped: List[str]):
+    """Analyze sources in the process pool, yielding an NDJSON line as each one completes"""
+    start_time = datetime.now()
+    semaphore = asyncio.Semaphore(settings.BATCH_ANALYSIS_CONCURRENCY)
+    
+    async def analyze(index: int, source: Dict[str, Any]) -> Tuple[BatchAnalysisFileResult, Dict[str, int]]:
+        async with semaphore:
+            try:
+                rtl_code = source.get("rtl_code")
+                if rtl_code is None:
+                    data = await asyncio.to_thread(file_service.read_artifact, source["file_path"])
+                    rtl_code = data.decode('utf-8', errors='replace')
+                analysis = await run_in_process(analyze_rtl_source, rtl_code, analysis_types)
+            except Exception as e:
+                app_state.increment_errors()
+                return BatchAnalysisFileResult(
+                    index=index,
+                    filename=source["filename"],
+                    file_path=source.get("file_path"),
+                    success=False,
+                    error=str(e)
+                ), {}
+        metrics = analysis.pop("metrics")
+        return BatchAnalysisFileResult(
+            index=index,
+            filename=source["filename"],
+            file_path=source.get("file_path"),
+            success=True,
+            **analysis
+        ), metrics
+    
+    tasks = [asyncio.create_task(analyze(index, source)) for index, source in enumerate(sources)]
+    declared: Dict[str, List[str]] = {}
+    instantiated = set()
+    metrics_total: Dict[str, int] = {}
+    files_with_errors = []
+    successful = total_errors = total_warnings = 0
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result, metrics = await next_result
+            if result.success:
+                successful += 1
+                total_errors += result.errors
+                total_warnings += result.warnings
+                if result.errors:
+                    files_with_errors.append(result.filename)
+                for name in result.modules:
+                    declared.setdefault(name, []).append(result.filename)
+                instantiated.update(result.instantiates)
+                for key, value in metrics.items():
+                    metrics_total[key] = metrics_total.get(key, 0) + value
+            yield result.json() + "\n"
+        
+        yield BatchAnalysisSummary(
+            batch_id=batch_id,
+            project_id=project_id,
+            total_processed=len(sources),
+            successful=successful,
+            failed=len(sources) - successful,
+            skipped=skipped,
+            files_with_errors=sorted(files_with_errors),
+            total_errors=total_errors,
+            total_warnings=total_warnings,
+            metrics=metrics_total,
+            modules=len(declared),
+            top_modules=sorted(name for name in declared if name not in instantiated),
+            undefined_modules=sorted(instantiated.difference(declared)),
+            duplicate_modules=sorted(name for name, filenames in declared.items() if len(filenames) > 1),
+            processing_time=(datetime.now() - start_time).total_seconds()
+        ).json() + "\n"
+    finally:
+        # The client may have gone away: drop work that has not started
+        for task in tasks:
+            task.cancel()
+
+@router.post(
+    "/batch/analyze-rtl",
+    summary="Batch RTL Analysis",
+    description="""
+Analyze many RTL sources, or every RTL file of a project, in one request.
+
+Sources are parsed and analyzed in the worker process pool, so a large IP
+repository uses every core without holding up other requests. Results
+stream back as newline-delimited JSON: one line per source as it
+completes, then a project-wide summary line.
+    """,
+    tags=["Batch Operations"]
+)
+async def batch_analyze_rtl(request: BatchAnalysisRequest):
+    """
+    Batch analyze RTL sources.
+    
+    - **sources**: Named RTL sources
+    - **project_id**: Also analyze every Verilog/SystemVerilog file of this project
+    - **analysis_type**: Analyses to run on each source
+    
+    Returns an application/x-ndjson stream of per-file results followed by a summary.
+    """
+    try:
+        app_state.increment_requests()
+        
+        sources = [{"filename": source.filename, "rtl_code": source.rtl_code} for source in request.sources or []]
+        skipped = []
+        if request.project_id:
+            for row in await file_service.get_project_rtl_files(request.project_id):
+                if os.path.splitext(row['filename'])[1].lower() in file_service.verilog_extensions:
+                    sources.append({"filename": row['filename'], "file_path": row['file_path']})
+                else:
+                    skipped.append(row['filename'])
+        
+        if len(sources) > settings.BATCH_ANALYSIS_MAX_SOURCES:
+            raise HTTPException(
+                status_code=400,
+                detail=ErrorResponse(
+                    error="BATCH_TOO_LARGE",
+                    message=f"Batch contains {len(sources)} sources",
+                    suggestion=f"Analyze at most {settings.BATCH_ANALYSIS_MAX_SOURCES} sources per batch"
+                ).dict()
+            )
+        
+        batch_id = str(uuid.uuid4())
+        return StreamingResponse(
+            _stream_batch_analysis(sources, request.analysis_type, batch_id, request.project_id, skipped),
+            media_type="application/x-ndjson",
+            headers={"X-Batch-ID": batch_id}
+        )
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                error="PROJECT_NOT_FOUND",
+                message=str(e)
+            ).dict()
+        )
+    except Exception as e:
+        app_state.increment_errors()
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="BATCH_ANALYSIS_ERROR",
+                message=f"Batch analysis failed: {str(e)}"
+            ).dict()
+        )
+
 # System Endpoints
 @router.get(
     "/health",
@@ -761,6 +1422,7 @@ async def api_statistics():
             "timestamp": datetime.now(),
             "requests": stats,
             "performance": additional_stats,
+            "reranker": rag_service.reranker.get_stats(),
             "services": get_service_status()
         }
         
@@ -773,6 +1435,122 @@ async def api_statistics():
             ).dict()
         )
 
+@router.get(
+    "/storage/stats",
+    summary="Artifact Storage Statistics",
+    description="Get content-addressable artifact store statistics including deduplication savings.",
+    tags=["System"]
+)
+async def storage_statistics():
+    """
+    Artifact storage statistics endpoint.
+    
+    Returns blob and reference counts, stored versus logical bytes,
+    the number of blobs awaiting garbage collection, and parse cache
+    and RTL analysis cache hit rates.
+    """
+    try:
+        stats = await asyncio.to_thread(artifact_store.get_stats)
+        stats["parse_cache"] = await asyncio.to_thread(parse_cache.get_stats)
+        stats["rtl_analysis_cache"] = await asyncio.to_thread(rtl_analysis_cache.get_stats)
+        return stats
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="STORAGE_STATS_ERROR",
+                message=f"Failed to get storage statistics: {str(e)}"
+            ).dict()
+        )
+
+@router.get(
+    "/storage/retention",
+    summary="Retention Status",
+    description="Get retention policies and what the background cleanup has evicted and reclaimed.",
+    tags=["System"]
+)
+async def retention_status():
+    """
+    Retention status endpoint.
+    
+    Returns the active per-category policies, cumulative eviction and
+    reclaim counters, and the report of the most recent pass.
+    """
+    try:
+        return retention_worker.get_stats()
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="RETENTION_STATS_ERROR",
+                message=f"Failed to get retention status: {str(e)}"
+            ).dict()
+        )
+
+@router.post(
+    "/storage/retention/run",
+    summary="Run Retention Pass",
+    description="Apply retention policies now instead of waiting for the next scheduled pass.",
+    tags=["System"]
+)
+async def run_retention():
+    """
+    Run one retention pass immediately.
+    
+    Waits for a pass already in progress to finish before starting. Refused
+    unless RETENTION_ENABLED is set, since a pass deletes files.
+    """
+    try:
+        app_state.increment_requests()
+        if not retention_worker.enabled:
+            raise HTTPException(
+                status_code=409,
+                detail=ErrorResponse(
+                    error="RETENTION_DISABLED",
+                    message="Retention is disabled on this server",
+                    suggestion="Set RETENTION_ENABLED=true to allow retention passes."
+                ).dict()
+            )
+        return await retention_worker.run_once()
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        app_state.increment_errors()
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="RETENTION_ERROR",
+                message=f"Retention pass failed: {str(e)}"
+            ).dict()
+        )
+
+@router.post(
+    "/storage/gc",
+    summary="Collect Unreferenced Artifacts",
+    description="Delete artifact blobs that are no longer referenced by any stored file.",
+    tags=["System"]
+)
+async def storage_gc():
+    """
+    Artifact garbage collection endpoint.
+    
+    Returns the number of blobs removed and bytes reclaimed.
+    """
+    try:
+        return await asyncio.to_thread(artifact_store.gc)
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="STORAGE_GC_ERROR",
+                message=f"Artifact garbage collection failed: {str(e)}"
+            ).dict()
+        )
+
 # Utility Endpoints
 @router.post(
     "/utils/validate-spec",
@@ -787,12 +1565,10 @@ async def validate_specification(spec_text: str = Query(..., description="Specif
     Returns validation results with issues and recommendations.
     """
     try:
-        # Parse and validate specification
-        parsed_data = FileParser.parse_specification(spec_text, "txt")
-        validation = SpecificationValidator.validate_specification_structure(parsed_data)
-        
-        # Add complexity analysis
-        complexity = TextProcessor.estimate_complexity(spec_text)
+        # Parse and validate specification (cached by content hash)
+        parsed_data = await _analyze_cached(spec_text, "txt")
+        validation = parsed_data["validation"]
+        complexity = parsed_data["complexity_analysis"]
         
         return {
             "validation": validation,
@@ -853,6 +1629,159 @@ async def suggest_module_name(spec_text: str = Query(..., description="Specifica
         )
 
 # File Download Endpoints
+def _accepts_encoding(accept_encoding: str, coding: str) -> bool:
+    """Check whether an Accept-Encoding header allows a content coding"""
+    if coding == "none":
+        return False
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip().lower() in (coding, "*"):
+            q = params.strip()
+            try:
+                return float(q[2:]) > 0 if q.startswith("q=") else True
+            except ValueError:
+                return False
+    return False
+
+def _parse_byte_range(range_header: str, total: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "bytes=" header against a known total size
+
+    Returns None when the header should be ignored (other units, multiple
+    ranges, malformed) and raises ValueError when it cannot be satisfied.
+    """
+    units, _, spec = range_header.partition("=")
+    if units.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    if not (first.isdigit() or first == "") or not (last.isdigit() or last == ""):
+        return None
+    if first == "":
+        if not last or int(last) == 0:
+            raise ValueError("Range not satisfiable")
+        start, end = max(total - int(last), 0), total - 1
+    else:
+        start = int(first)
+        end = int(last) if last else total - 1
+    if start >= total or end < start:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, total - 1)
+
+async def _bundle_response(request: Request, entries: list, archive_name: str,
+                           compress_level: int) -> Response:
+    """Stream a zip of entries, honouring single byte-range requests"""
+    zip_stream = ZipStream(entries, compress_level)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": zip_stream.etag,
+        "Content-Disposition": f'attachment; filename="{archive_name}"'
+    }
+    
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range == zip_stream.etag):
+        # Deflated archives are sized by one generating pass; stored ones by arithmetic
+        total = await asyncio.to_thread(zip_stream.compute_size)
+        try:
+            byte_range = _parse_byte_range(range_header, total)
+        except ValueError:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{total}"})
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                zip_stream.iter_bytes(start, end),
+                status_code=206,
+                media_type="application/zip",
+                headers=headers
+            )
+    
+    if zip_stream.size is not None:
+        headers["Content-Length"] = str(zip_stream.size)
+    return StreamingResponse(zip_stream.iter_bytes(), media_type="application/zip", headers=headers)
+
+@router.get(
+    "/projects/{project_id}/bundle",
+    summary="Download Project Bundle",
+    description="Stream a zip archive of a project's files, or a selected subset, with resumable range support.",
+    tags=["File Management"]
+)
+async def download_project_bundle(
+    request: Request,
+    project_id: str = Path(..., description="Project ID"),
+    file_paths: Optional[List[str]] = Query(None, description="Only include these project files"),
+    level: int = Query(0, ge=0, le=9, description="Deflate level; 0 stores files uncompressed (fastest ranged resume)")
+):
+    """
+    Download a project as a zip archive.
+    
+    The archive is generated on the fly in constant memory. Files are
+    grouped by category. Responses carry an ETag and honour Range/If-Range
+    so interrupted downloads can resume.
+    """
+    try:
+        app_state.increment_requests()
+        entries = await file_service.get_bundle_entries(project_id=project_id, file_paths=file_paths)
+        return await _bundle_response(request, entries, f"{project_id}.zip", level)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                error="PROJECT_NOT_FOUND",
+                message=str(e)
+            ).dict()
+        )
+    except Exception as e:
+        app_state.increment_errors()
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="BUNDLE_ERROR",
+                message=f"Bundle download failed: {str(e)}"
+            ).dict()
+        )
+
+@router.get(
+    "/download/bundle",
+    summary="Download Artifact Bundle",
+    description="Stream a zip archive of selected generated files with resumable range support.",
+    tags=["File Management"]
+)
+async def download_artifact_bundle(
+    request: Request,
+    file_paths: List[str] = Query(..., description="Paths of the files to include"),
+    level: int = Query(0, ge=0, le=9, description="Deflate level; 0 stores files uncompressed (fastest ranged resume)")
+):
+    """
+    Download selected artifacts as a zip archive.
+    
+    Accepts the file paths returned by the generation and upload endpoints.
+    """
+    try:
+        app_state.increment_requests()
+        entries = await file_service.get_bundle_entries(file_paths=file_paths)
+        return await _bundle_response(request, entries, "artifacts.zip", level)
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse(
+                error="FILE_NOT_FOUND",
+                message=str(e)
+            ).dict()
+        )
+    except Exception as e:
+        app_state.increment_errors()
+        raise HTTPException(
+            status_code=500,
+            detail=ErrorResponse(
+                error="BUNDLE_ERROR",
+                message=f"Bundle download failed: {str(e)}"
+            ).dict()
+        )
+
 @router.get(
     "/download/{file_type}/{filename}",
     summary="Download Generated File",
@@ -860,13 +1789,16 @@ async def suggest_module_name(spec_text: str = Query(..., description="Specifica
     tags=["File Management"]
 )
 async def download_file(
+    request: Request,
     file_type: str = Path(..., description="Type of file to download"),
     filename: str = Path(..., description="Filename to download")
 ):
     """
     Download generated file.
     
-    Supports downloading RTL files, testbenches, and reports.
+    Supports downloading RTL files, testbenches, and reports. Artifacts
+    stored compressed are sent as-is with Content-Encoding when the client
+    accepts that coding, and decompressed on the fly otherwise.
     """
     try:
         # Construct file path based on type and filename
@@ -886,13 +1818,34 @@ async def download_file(
                 ).dict()
             )
         
+        await asyncio.to_thread(catalog.touch_file, file_path)
         if not os.path.exists(file_path):
-            raise HTTPException(
-                status_code=404,
-                detail=ErrorResponse(
-                    error="FILE_NOT_FOUND",
-                    message=f"File not found: {filename}"
-                ).dict()
+            stored = await asyncio.to_thread(file_service.resolve_artifact, file_path)
+            if stored is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=ErrorResponse(
+                        error="FILE_NOT_FOUND",
+                        message=f"File not found: {filename}"
+                    ).dict()
+                )
+            
+            if _accepts_encoding(request.headers.get("accept-encoding", ""), stored["codec"]):
+                # Pass the compressed blob straight through
+                return FileResponse(
+                    path=artifact_store.blob_path(stored["digest"]),
+                    filename=filename,
+                    media_type='application/octet-stream',
+                    headers={"Content-Encoding": stored["codec"], "Vary": "Accept-Encoding"}
+                )
+            return StreamingResponse(
+                file_service.iter_artifact(file_path),
+                media_type='application/octet-stream',
+                headers={
+                    "Content-Disposition": f'attachment; filename="{filename}"',
+                    "Content-Length": str(stored["size"]),
+                    "Vary": "Accept-Encoding"
+                }
             )
         
         return FileResponse(
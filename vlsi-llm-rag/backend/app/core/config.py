@@ -91,6 +91,10 @@ class Settings(BaseSettings):
         ],
         env="VLSI_ALLOWED_EXTENSIONS"
     )
+    BATCH_UPLOAD_MAX_FILES: int = Field(default=500, env="VLSI_BATCH_UPLOAD_MAX_FILES")
+    BATCH_UPLOAD_CONCURRENCY: int = Field(default=8, env="VLSI_BATCH_UPLOAD_CONCURRENCY")  # Files saved and parsed at once
+    BATCH_ANALYSIS_MAX_SOURCES: int = Field(default=2000, env="VLSI_BATCH_ANALYSIS_MAX_SOURCES")
+    BATCH_ANALYSIS_CONCURRENCY: int = Field(default=32, env="VLSI_BATCH_ANALYSIS_CONCURRENCY")  # Sources read and queued on the process pool at once
     
     # RTL Generation Configuration
     DEFAULT_LANGUAGE: str = Field(default="verilog", env="VLSI_DEFAULT_LANGUAGE")
@@ -14,6 +14,16 @@ from .llm_service import llm_service, LLMService
 from .rtl_generator import rtl_generator, RTLGenerator
 from .vip_generator import vip_generator, VIPGenerator
 from .file_service import file_service, FileService
+from .reranker import CrossEncoderReranker
+from .artifact_store import artifact_store, ArtifactStore
+from .catalog import catalog, MetadataCatalog
+from .version_store import version_store, VersionStore
+from .retention import retention_worker, RetentionWorker
+from .parse_cache import parse_cache, ParseCache
+from .design_store import design_store, DesignStore
+from .design_planner import design_planner, DesignPlanner
+from .rtl_analysis_cache import rtl_analysis_cache, RTLAnalysisCache
+from .design_index import design_index, DesignIndex
 
 __all__ = [
     # Services instances
@@ -22,6 +32,15 @@ __all__ = [
     "rtl_generator",
     "vip_generator",
     "file_service",
+    "artifact_store",
+    "catalog",
+    "version_store",
+    "retention_worker",
+    "parse_cache",
+    "design_store",
+    "design_planner",
+    "rtl_analysis_cache",
+    "design_index",
     
     # Service classes
     "RAGService",
@@ -29,6 +48,16 @@ __all__ = [
     "RTLGenerator", 
     "VIPGenerator",
     "FileService",
+    "CrossEncoderReranker",
+    "ArtifactStore",
+    "MetadataCatalog",
+    "VersionStore",
+    "RetentionWorker",
+    "ParseCache",
+    "DesignStore",
+    "DesignPlanner",
+    "RTLAnalysisCache",
+    "DesignIndex",
 ]
 
 # Service initialization status
@@ -0,0 +1,484 @@
+import os
+import gzip
+import shutil
+import sqlite3
+import hashlib
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, BinaryIO, List, Optional, Tuple
+from ...config import settings
+from ..utils.durable_io import GroupCommitter, fsync_all, fsync_file
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+CODEC_NONE = "none"
+CODEC_GZIP = "gzip"
+CODEC_ZSTD = "zstd"
+
+
+class ArtifactStore:
+    """
+    Content-addressable blob store for generated and uploaded artifacts.
+
+    Blobs are keyed by SHA-256 and sharded as objects/ab/cd/<digest>, so
+    identical bytes are stored and written once. Human-readable artifact
+    paths are named references to a blob; each blob keeps a reference count
+    and is removed by garbage collection once nothing refers to it.
+
+    Blobs written through put_bytes are compressed (zstd when available,
+    otherwise gzip) when that saves space; the codec is recorded per blob
+    and the digest always refers to the uncompressed content.
+
+    Writes are staged in tmp/ and committed in groups: concurrent puts are
+    batched so one leader fsyncs the staged blobs, renames them into place,
+    fsyncs each shard directory once and registers every reference in a
+    single transaction. A put either fully lands or leaves nothing behind.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or f"{settings.UPLOAD_DIR}/store"
+        self.objects_dir = f"{self.root}/objects"
+        self.staging_dir = f"{self.root}/tmp"
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self.durable = settings.DURABLE_WRITES
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(f"{self.root}/refs.db", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # FULL syncs the WAL on every commit; group commits keep that to one per batch
+        self._conn.execute(f"PRAGMA synchronous={'FULL' if self.durable else 'NORMAL'}")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                refcount INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS refs (
+                name TEXT PRIMARY KEY,
+                digest TEXT NOT NULL REFERENCES blobs(digest),
+                created_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_refs_digest ON refs(digest);
+            CREATE INDEX IF NOT EXISTS idx_blobs_refcount ON blobs(refcount);
+        """)
+        self._migrate()
+        self._conn.commit()
+
+        self.codec = self._select_codec(settings.ARTIFACT_COMPRESSION)
+        self._committer = GroupCommitter(self._commit_batch, settings.FSYNC_BATCH_WINDOW_MS / 1000)
+        self._discard_staged()
+
+    def _discard_staged(self) -> int:
+        """
+        Remove writes left uncommitted by a crash
+
+        The staging directory is shared by every worker process, so only
+        files older than STAGED_WRITE_MAX_AGE_SECONDS are removed; younger
+        ones may be another process's writes still waiting to commit.
+        """
+        cutoff = time.time() - settings.STAGED_WRITE_MAX_AGE_SECONDS
+        removed = 0
+        for name in os.listdir(self.staging_dir):
+            path = f"{self.staging_dir}/{name}"
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def _migrate(self):
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(blobs)")}
+        if "codec" not in columns:
+            self._conn.execute(f"ALTER TABLE blobs ADD COLUMN codec TEXT NOT NULL DEFAULT '{CODEC_NONE}'")
+        if "stored_size" not in columns:
+            self._conn.execute("ALTER TABLE blobs ADD COLUMN stored_size INTEGER")
+
+    @staticmethod
+    def _select_codec(preference: str) -> str:
+        preference = (preference or CODEC_NONE).lower()
+        if preference == "auto":
+            return CODEC_ZSTD if zstandard is not None else CODEC_GZIP
+        if preference == CODEC_ZSTD and zstandard is None:
+            print("⚠️  zstandard not installed, compressing artifacts with gzip")
+            return CODEC_GZIP
+        if preference not in (CODEC_NONE, CODEC_GZIP, CODEC_ZSTD):
+            print(f"⚠️  Unknown artifact compression '{preference}', storing artifacts uncompressed")
+            return CODEC_NONE
+        return preference
+
+    def _encode(self, data: bytes, compress: bool) -> Tuple[str, bytes]:
+        """Compress data with the store codec when worthwhile"""
+        if not compress or self.codec == CODEC_NONE or len(data) < settings.ARTIFACT_COMPRESS_MIN_BYTES:
+            return CODEC_NONE, data
+        if self.codec == CODEC_ZSTD:
+            payload = zstandard.ZstdCompressor(level=settings.ARTIFACT_COMPRESSION_LEVEL).compress(data)
+        else:
+            # mtime=0 keeps the compressed bytes deterministic
+            payload = gzip.compress(data, compresslevel=settings.ARTIFACT_COMPRESSION_LEVEL, mtime=0)
+        if len(payload) >= len(data):
+            return CODEC_NONE, data
+        return self.codec, payload
+
+    @staticmethod
+    def compute_digest(data: bytes) -> str:
+        """SHA-256 hex digest used as the blob key"""
+        return hashlib.sha256(data).hexdigest()
+
+    def blob_path(self, digest: str) -> str:
+        """Sharded on-disk location of a blob"""
+        return f"{self.objects_dir}/{digest[:2]}/{digest[2:4]}/{digest}"
+
+    def _stage_blob(self, digest: str, data: bytes) -> str:
+        """Write blob bytes to a temporary file in the staging directory"""
+        temp_path = f"{self.staging_dir}/{digest}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        return temp_path
+
+    def _link_ref(self, cursor, name: str, digest: str, size: int,
+                  codec: str = CODEC_NONE, stored_size: int = None):
+        """Register the blob and point name at it (caller holds the lock)"""
+        now = datetime.now().isoformat()
+        cursor.execute(
+            "INSERT OR IGNORE INTO blobs (digest, size, refcount, created_at, codec, stored_size) "
+            "VALUES (?, ?, 0, ?, ?, ?)",
+            (digest, size, now, codec, size if stored_size is None else stored_size)
+        )
+        row = cursor.execute("SELECT digest FROM refs WHERE name = ?", (name,)).fetchone()
+        if row and row[0] == digest:
+            return
+        if row:
+            cursor.execute("UPDATE blobs SET refcount = refcount - 1 WHERE digest = ?", (row[0],))
+        cursor.execute(
+            "INSERT OR REPLACE INTO refs (name, digest, created_at) VALUES (?, ?, ?)",
+            (name, digest, now)
+        )
+        cursor.execute("UPDATE blobs SET refcount = refcount + 1 WHERE digest = ?", (digest,))
+
+    def put_bytes(self, name: str, data: bytes, compress: bool = True) -> Tuple[str, bool]:
+        """
+        Store bytes under a named reference
+
+        Args:
+            name: Reference name (the artifact's logical path)
+            data: Blob content
+            compress: Allow the blob to be stored compressed
+
+        Returns:
+            (digest, written) where written is False if the blob already existed
+        """
+        return self.put_many([(name, data)], compress)[0]
+
+    def put_many(self, items: List[Tuple[str, bytes]], compress: bool = True) -> List[Tuple[str, bool]]:
+        """
+        Store several named blobs as one unit
+
+        Either every reference is registered or none is, so an artifact and
+        its companions (e.g. RTL and its metadata) never appear half-written.
+
+        Args:
+            items: (reference name, content) pairs
+            compress: Allow the blobs to be stored compressed
+
+        Returns:
+            (digest, written) per item, in order
+        """
+        entries = []
+        staged = {}
+        try:
+            for name, data in items:
+                digest = self.compute_digest(data)
+                temp_path = None
+                if not os.path.exists(self.blob_path(digest)):
+                    if digest not in staged:
+                        # Compress and write outside the lock; the commit only renames
+                        codec, payload = self._encode(data, compress)
+                        staged[digest] = (codec, len(payload), self._stage_blob(digest, payload))
+                    temp_path = staged[digest][2]
+                entries.append({
+                    "name": name, "digest": digest, "size": len(data), "data": data,
+                    "compress": compress, "staged": staged.get(digest) if temp_path else None
+                })
+            return self._committer.submit(entries)
+        finally:
+            for _, _, temp_path in staged.values():
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+    def adopt_file(self, name: str, file_path: str, digest: str) -> Tuple[str, bool]:
+        """
+        Move an already hashed file into the store under a named reference
+
+        Used for streamed uploads whose digest was computed while writing,
+        so the bytes are neither re-read nor copied. Adopted blobs are kept
+        uncompressed.
+
+        Args:
+            name: Reference name
+            file_path: File to adopt; it is moved or removed
+            digest: SHA-256 hex digest of the file content
+
+        Returns:
+            (digest, written) where written is False if the blob already existed
+        """
+        size = os.path.getsize(file_path)
+        entry = {
+            "name": name, "digest": digest, "size": size, "data": None,
+            "compress": False, "staged": (CODEC_NONE, size, file_path)
+        }
+        try:
+            return self._committer.submit([entry])[0]
+        finally:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def _commit_batch(self, batches: List[List[Dict[str, Any]]]) -> List[List[Tuple[str, bool]]]:
+        """
+        Commit the puts of concurrent writers together (group commit leader)
+
+        Staged blobs are fsynced, renamed into place and their directories
+        fsynced before any reference to them is committed, so a committed
+        reference never points at a missing or partial blob.
+        """
+        entries = [entry for batch in batches for entry in batch]
+        staged_paths = {entry["staged"][2] for entry in entries if entry["staged"]}
+        if self.durable:
+            fsync_all(path for path in staged_paths if os.path.exists(path))
+
+        with self._lock:
+            cursor = self._conn.cursor()
+            placed = []
+            try:
+                for entry in entries:
+                    digest = entry["digest"]
+                    path = self.blob_path(digest)
+                    # Rows inserted earlier in this batch are visible here
+                    row = cursor.execute("SELECT codec, stored_size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+                    entry["written"] = row is None or not os.path.exists(path)
+                    if entry["written"]:
+                        staged = entry["staged"]
+                        if staged is None or not os.path.exists(staged[2]):
+                            # Collected between staging and the commit
+                            codec, payload = self._encode(entry["data"], entry["compress"])
+                            staged = (codec, len(payload), self._stage_blob(digest, payload))
+                            if self.durable:
+                                fsync_file(staged[2])
+                        codec, stored_size, temp_path = staged
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        os.replace(temp_path, path)
+                        placed.append(path)
+                        cursor.execute(
+                            "INSERT OR IGNORE INTO blobs (digest, size, refcount, created_at, codec, stored_size) "
+                            "VALUES (?, ?, 0, ?, ?, ?)",
+                            (digest, entry["size"], datetime.now().isoformat(), codec, stored_size)
+                        )
+                        cursor.execute(
+                            "UPDATE blobs SET codec = ?, stored_size = ? WHERE digest = ?",
+                            (codec, stored_size, digest)
+                        )
+                    else:
+                        codec, stored_size = row
+                    self._link_ref(cursor, entry["name"], digest, entry["size"], codec, stored_size)
+
+                if self.durable:
+                    fsync_all(directories={os.path.dirname(path) for path in placed})
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                for path in placed:
+                    if os.path.exists(path):
+                        os.remove(path)
+                raise
+
+        return [[(entry["digest"], entry["written"]) for entry in batch] for batch in batches]
+
+    def remove_ref(self, name: str) -> Optional[str]:
+        """
+        Drop a named reference
+
+        Args:
+            name: Reference name
+
+        Returns:
+            Digest the reference pointed at, or None if it did not exist
+        """
+        with self._lock:
+            cursor = self._conn.cursor()
+            row = cursor.execute("SELECT digest FROM refs WHERE name = ?", (name,)).fetchone()
+            if not row:
+                return None
+            cursor.execute("DELETE FROM refs WHERE name = ?", (name,))
+            cursor.execute("UPDATE blobs SET refcount = refcount - 1 WHERE digest = ?", (row[0],))
+            self._conn.commit()
+            return row[0]
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Get the digest a named reference points at"""
+        with self._lock:
+            row = self._conn.execute("SELECT digest FROM refs WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def stat_ref(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get blob details for a named reference
+
+        Returns:
+            Digest, uncompressed size, codec and on-disk size, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT b.digest, b.size, b.codec, COALESCE(b.stored_size, b.size)
+                FROM refs r JOIN blobs b ON b.digest = r.digest WHERE r.name = ?
+                """,
+                (name,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"digest": row[0], "size": row[1], "codec": row[2], "stored_size": row[3]}
+
+    def get_codec(self, digest: str) -> str:
+        with self._lock:
+            row = self._conn.execute("SELECT codec FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        return row[0] if row else CODEC_NONE
+
+    def open_blob(self, digest: str) -> BinaryIO:
+        """
+        Open a blob for reading its uncompressed content
+
+        Args:
+            digest: Blob digest
+
+        Returns:
+            Binary file object; forward seeks are supported for all codecs
+        """
+        path = self.blob_path(digest)
+        codec = self.get_codec(digest)
+        if codec == CODEC_GZIP:
+            return gzip.open(path, 'rb')
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise ValueError("Blob is zstd-compressed but zstandard is not installed")
+            return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return open(path, 'rb')
+
+    def materialize(self, digest: str, dest_path: str):
+        """
+        Expose a blob at a regular file path
+
+        A hard link is used so the named file shares the blob's storage;
+        a copy is made only when the destination is on another filesystem.
+        The file is swapped in with a rename, so readers never see it missing
+        or partial. It is not fsynced: the store holds the durable copy and
+        a path lost in a crash still resolves through its reference.
+
+        Args:
+            digest: Blob digest
+            dest_path: Destination file path
+        """
+        source = self.blob_path(digest)
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+        temp_path = f"{dest_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            if self.get_codec(digest) != CODEC_NONE:
+                # Compressed blobs are expanded into a private copy
+                with self.open_blob(digest) as src, open(temp_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+            else:
+                try:
+                    os.link(source, temp_path)
+                except OSError:
+                    shutil.copyfile(source, temp_path)
+            os.replace(temp_path, dest_path)
+        except Exception:
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def read_bytes(self, digest: str) -> bytes:
+        """Read a blob's uncompressed content"""
+        with self.open_blob(digest) as f:
+            return f.read()
+
+    def gc(self) -> Dict[str, Any]:
+        """
+        Remove blobs that are no longer referenced, and stale staged writes
+
+        Returns:
+            Number of blobs removed, bytes reclaimed and staged files removed
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT digest, COALESCE(stored_size, size) FROM blobs WHERE refcount <= 0"
+            ).fetchall()
+
+        removed = 0
+        reclaimed = 0
+        for digest, size in rows:
+            with self._lock:
+                # A reference may have been added since the scan
+                still_free = self._conn.execute(
+                    "SELECT 1 FROM blobs WHERE digest = ? AND refcount <= 0", (digest,)
+                ).fetchone()
+                if not still_free:
+                    continue
+                self._conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                self._conn.commit()
+                try:
+                    os.remove(self.blob_path(digest))
+                except FileNotFoundError:
+                    pass
+            removed += 1
+            reclaimed += size
+
+        return {"blobs_removed": removed, "bytes_reclaimed": reclaimed, "staged_removed": self._discard_staged()}
+
+    def list_refs(self, digest: str) -> List[str]:
+        """Get all reference names pointing at a blob"""
+        with self._lock:
+            rows = self._conn.execute("SELECT name FROM refs WHERE digest = ?", (digest,)).fetchall()
+        return [row[0] for row in rows]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics"""
+        with self._lock:
+            blob_count, unique_bytes, stored_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(COALESCE(stored_size, size)), 0) FROM blobs"
+            ).fetchone()
+            compressed = self._conn.execute(
+                "SELECT COUNT(*) FROM blobs WHERE codec != ?", (CODEC_NONE,)
+            ).fetchone()[0]
+            ref_count, logical_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(b.size), 0) FROM refs r JOIN blobs b ON b.digest = r.digest"
+            ).fetchone()
+            unreferenced = self._conn.execute(
+                "SELECT COUNT(*) FROM blobs WHERE refcount <= 0"
+            ).fetchone()[0]
+        return {
+            "blobs": blob_count,
+            "refs": ref_count,
+            "stored_bytes": stored_bytes,
+            "unique_bytes": unique_bytes,
+            "logical_bytes": logical_bytes,
+            "bytes_saved": logical_bytes - stored_bytes,
+            "compression_saved": unique_bytes - stored_bytes,
+            "compressed_blobs": compressed,
+            "codec": self.codec,
+            "unreferenced_blobs": unreferenced,
+            "durable_writes": self.durable,
+            "commit_batches": self._committer.batches,
+            "commit_requests": self._committer.requests
+        }
+
+
+# Global artifact store instance
+artifact_store = ArtifactStore()
@@ -0,0 +1,696 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from ...config import settings
+
+# Project categories and the API file type each maps to
+CATEGORY_FILE_TYPES = {
+    "specifications": "specification",
+    "rtl": "rtl",
+    "testbenches": "testbench",
+    "constraints": "constraint",
+    "reports": "documentation",
+    "logs": "documentation",
+    "documents": "documentation",
+}
+
+_IDENTIFIER_PATTERN = re.compile(r'[A-Za-z_$][\w$]*')
+_SUBTOKEN_PATTERN = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+_QUERY_TERM_PATTERN = re.compile(r'[\w$]+\*?')
+
+# Full-text index over file content. Identifiers are kept whole in `body`
+# (underscore and $ are token characters) and their parts are indexed in
+# `subtokens`, so both "wr_ptr_gray" and "gray" find the same signal.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+    body, subtokens, tokenize = "unicode61 tokenchars '_$'"
+);
+CREATE TRIGGER IF NOT EXISTS trg_files_fts_delete AFTER DELETE ON files
+BEGIN
+    DELETE FROM files_fts WHERE rowid = OLD.id;
+END;
+"""
+
+
+def identifier_subtokens(text: str) -> str:
+    """
+    Split compound identifiers into their parts for indexing
+
+    snake_case, camelCase and digit boundaries are split, e.g.
+    "axi_wrAddr0" -> "axi wr addr 0". Plain words are left to the body column.
+
+    Args:
+        text: Source text
+
+    Returns:
+        Space-separated lowercase subtokens
+    """
+    parts = []
+    for identifier in set(_IDENTIFIER_PATTERN.findall(text)):
+        pieces = _SUBTOKEN_PATTERN.findall(identifier)
+        if len(pieces) > 1:
+            parts.extend(piece.lower() for piece in pieces)
+    return " ".join(parts)
+
+
+def build_match_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 MATCH expression
+
+    Every term must match; a trailing * makes a term a prefix search.
+    """
+    terms = []
+    for term in _QUERY_TERM_PATTERN.findall(query):
+        prefix = term.endswith("*")
+        term = term.rstrip("*")
+        if term:
+            terms.append(f'"{term}"*' if prefix else f'"{term}"')
+    return " ".join(terms)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    project_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    directories TEXT NOT NULL DEFAULT '[]',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    file_count INTEGER NOT NULL DEFAULT 0,
+    total_size INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_projects_created ON projects(created_at);
+
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_path TEXT NOT NULL UNIQUE,
+    project_id TEXT,
+    category TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    module_name TEXT,
+    size INTEGER NOT NULL DEFAULT 0,
+    content_hash TEXT,
+    created_at TEXT NOT NULL,
+    modified_at TEXT NOT NULL,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_files_project ON files(project_id, category, created_at);
+CREATE INDEX IF NOT EXISTS idx_files_category ON files(category, created_at);
+CREATE INDEX IF NOT EXISTS idx_files_hash ON files(content_hash);
+
+-- Keep per-project totals current in the same transaction as the file change
+CREATE TRIGGER IF NOT EXISTS trg_files_insert AFTER INSERT ON files
+WHEN NEW.project_id IS NOT NULL
+BEGIN
+    UPDATE projects
+    SET file_count = file_count + 1,
+        total_size = total_size + NEW.size,
+        updated_at = NEW.modified_at
+    WHERE project_id = NEW.project_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_files_delete AFTER DELETE ON files
+WHEN OLD.project_id IS NOT NULL
+BEGIN
+    UPDATE projects
+    SET file_count = file_count - 1,
+        total_size = total_size - OLD.size
+    WHERE project_id = OLD.project_id;
+END;
+
+-- Per-module generation history; project_key is '' outside projects
+CREATE TABLE IF NOT EXISTS module_versions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_key TEXT NOT NULL,
+    module_name TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    file_path TEXT,
+    created_at TEXT NOT NULL,
+    metadata TEXT,
+    UNIQUE (project_key, module_name, version)
+);
+CREATE INDEX IF NOT EXISTS idx_versions_path ON module_versions(file_path);
+
+-- Incrementally regenerated designs: section hashes of the last submitted
+-- spec and, per generated module, the sections it was built from
+CREATE TABLE IF NOT EXISTS designs (
+    design_id TEXT PRIMARY KEY,
+    sections TEXT NOT NULL DEFAULT '{}',
+    modules TEXT NOT NULL DEFAULT '{}',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+# Recompute project totals from the files table
+_RECOUNT_PROJECTS = """
+UPDATE projects SET
+    file_count = (SELECT COUNT(*) FROM files WHERE files.project_id = projects.project_id),
+    total_size = (SELECT COALESCE(SUM(size), 0) FROM files WHERE files.project_id = projects.project_id)
+"""
+
+
+class MetadataCatalog:
+    """
+    SQLite (WAL) catalog of projects and stored artifacts.
+
+    FileService records every saved file here, so listings, counts and
+    totals come from indexed queries instead of walking and stat-ing the
+    upload tree on every request.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or settings.CATALOG_DB_PATH
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            print(f"⚠️  SQLite FTS5 unavailable, file search falls back to scanning: {e}")
+            self.fts_enabled = False
+
+    def _migrate(self):
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(files)")}
+        if "accessed_at" not in columns:
+            self._conn.execute("ALTER TABLE files ADD COLUMN accessed_at TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_files_module ON files(category, project_id, module_name, created_at)"
+        )
+        # Repair totals left wrong by files recorded before their project row
+        self._conn.execute(_RECOUNT_PROJECTS)
+
+    @contextmanager
+    def transaction(self):
+        """Run several catalog updates as one atomic transaction"""
+        with self._lock:
+            if self._conn.in_transaction:
+                # Nested use joins the outer transaction
+                yield self._conn
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    # Projects
+
+    def upsert_project(self, project_info: Dict[str, Any]):
+        """
+        Insert or update a project record
+
+        Totals are recounted from the files table: files recorded under a
+        project id before its row existed were missed by the triggers.
+        """
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO projects (project_id, name, description, directories, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(project_id) DO UPDATE SET
+                    name = excluded.name,
+                    description = excluded.description,
+                    directories = excluded.directories,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    project_info["project_id"],
+                    project_info.get("project_name", project_info.get("name", "")),
+                    project_info.get("description") or "",
+                    json.dumps(project_info.get("directories", [])),
+                    project_info["created_at"],
+                    project_info.get("updated_at", project_info["created_at"])
+                )
+            )
+            conn.execute(f"{_RECOUNT_PROJECTS} WHERE project_id = ?", (project_info["project_id"],))
+
+    def get_project(self, project_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM projects WHERE project_id = ?", (project_id,)
+            ).fetchone()
+        return self._project_row(row) if row else None
+
+    def list_projects(self, offset: int = 0, limit: int = 10) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get a page of projects, newest first
+
+        Returns:
+            (projects, total project count)
+        """
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT * FROM projects ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (limit, offset)
+            ).fetchall()
+            projects = [self._project_row(row) for row in rows]
+
+            if projects:
+                placeholders = ",".join("?" * len(projects))
+                breakdown = self._conn.execute(
+                    f"""
+                    SELECT project_id, category, COUNT(*) FROM files
+                    WHERE project_id IN ({placeholders})
+                    GROUP BY project_id, category
+                    """,
+                    [p["project_id"] for p in projects]
+                ).fetchall()
+                by_id = {p["project_id"]: p for p in projects}
+                for project_id, category, count in breakdown:
+                    by_id[project_id]["file_count"][category] = count
+
+        return projects, total
+
+    @staticmethod
+    def _project_row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "project_id": row["project_id"],
+            "name": row["name"],
+            "description": row["description"],
+            "directories": json.loads(row["directories"]),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "file_count": {},
+            "total_files": row["file_count"],
+            "total_size": row["total_size"]
+        }
+
+    # Files
+
+    def record_file(self, file_path: str, category: str, size: int,
+                    project_id: str = None, content_hash: str = None,
+                    module_name: str = None, metadata: Dict[str, Any] = None,
+                    created_at: str = None, content: str = None):
+        """
+        Insert or replace the catalog entry for a stored file
+
+        Args:
+            file_path: Path of the stored file (unique key)
+            category: Category such as rtl, testbenches or specifications
+            size: File size in bytes
+            project_id: Owning project, if any
+            content_hash: SHA-256 of the content
+            module_name: RTL module the file belongs to, if any
+            metadata: Generation or upload metadata
+            created_at: Creation timestamp (defaults to now)
+            content: Text to add to the full-text index
+        """
+        now = datetime.now().isoformat()
+        with self.transaction() as conn:
+            # Delete + insert so the triggers keep project totals exact
+            conn.execute("DELETE FROM files WHERE file_path = ?", (file_path,))
+            conn.execute(
+                """
+                INSERT INTO files (file_path, project_id, category, filename, module_name,
+                                   size, content_hash, created_at, modified_at, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    file_path, project_id, category, os.path.basename(file_path),
+                    module_name, size, content_hash, created_at or now, now,
+                    json.dumps(metadata) if metadata else None
+                )
+            )
+            if content is not None and self.fts_enabled:
+                self._index(conn, file_path, content)
+
+    def _index(self, conn: sqlite3.Connection, file_path: str, content: str):
+        row = conn.execute("SELECT id FROM files WHERE file_path = ?", (file_path,)).fetchone()
+        if row is None:
+            return
+        conn.execute("DELETE FROM files_fts WHERE rowid = ?", (row[0],))
+        conn.execute(
+            "INSERT INTO files_fts (rowid, body, subtokens) VALUES (?, ?, ?)",
+            (row[0], content, identifier_subtokens(content))
+        )
+
+    def index_content(self, file_path: str, content: str) -> bool:
+        """
+        (Re)index the text of an already cataloged file
+
+        Returns:
+            True if the file is cataloged and was indexed
+        """
+        if not self.fts_enabled:
+            return False
+        with self.transaction() as conn:
+            exists = conn.execute("SELECT 1 FROM files WHERE file_path = ?", (file_path,)).fetchone()
+            if exists:
+                self._index(conn, file_path, content)
+            return exists is not None
+
+    def search(self, query: str, project_id: str = None, categories: List[str] = None,
+               limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Full-text search over indexed file content
+
+        Args:
+            query: Search text; all terms must match
+            project_id: Optional project scope
+            categories: Optional category filter
+            limit: Maximum number of results
+
+        Returns:
+            Matching files, best first, each with a score and a snippet
+        """
+        match = build_match_query(query)
+        if not match:
+            return []
+
+        sql = """
+            SELECT f.*, bm25(files_fts, 4.0, 1.0) AS score,
+                   snippet(files_fts, 0, '[', ']', '...', 16) AS snippet
+            FROM files_fts JOIN files f ON f.id = files_fts.rowid
+            WHERE files_fts MATCH ?
+        """
+        params: List[Any] = [match]
+        if project_id:
+            sql += " AND f.project_id = ?"
+            params.append(project_id)
+        if categories:
+            sql += f" AND f.category IN ({','.join('?' * len(categories))})"
+            params.extend(categories)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        results = []
+        for row in rows:
+            result = self._file_row(row)
+            # bm25() is lower-is-better; report higher-is-better
+            result["score"] = -row["score"]
+            result["snippet"] = row["snippet"]
+            results.append(result)
+        return results
+
+    def remove_file(self, file_path: str) -> bool:
+        """Remove a file entry; returns True if it existed"""
+        with self.transaction() as conn:
+            cursor = conn.execute("DELETE FROM files WHERE file_path = ?", (file_path,))
+            return cursor.rowcount > 0
+
+    def touch_file(self, file_path: str, min_interval_seconds: int = 60):
+        """Record a read of a file for LRU retention (at most once per interval)"""
+        now = datetime.now()
+        threshold = datetime.fromtimestamp(now.timestamp() - min_interval_seconds).isoformat()
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                UPDATE files SET accessed_at = ?
+                WHERE file_path = ? AND (accessed_at IS NULL OR accessed_at < ?)
+                """,
+                (now.isoformat(), file_path, threshold)
+            )
+
+    # Retention queries
+
+    def get_category_usage(self, category: str) -> Tuple[int, int]:
+        """File count and total size of a category"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files WHERE category = ?",
+                (category,)
+            ).fetchone()
+        return row[0], row[1]
+
+    def find_files_older_than(self, category: str, cutoff: str, limit: int) -> List[Dict[str, Any]]:
+        """Files in a category created before cutoff, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT * FROM files WHERE category = ? AND created_at < ?
+                ORDER BY created_at LIMIT ?
+                """,
+                (category, cutoff, limit)
+            ).fetchall()
+        return [self._file_row(row) for row in rows]
+
+    def find_excess_module_files(self, category: str, keep: int, limit: int) -> List[Dict[str, Any]]:
+        """Files beyond the newest keep per (project, module), oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT * FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY project_id, module_name ORDER BY created_at DESC, id DESC
+                    ) AS position
+                    FROM files WHERE category = ? AND module_name IS NOT NULL
+                ) WHERE position > ? ORDER BY created_at LIMIT ?
+                """,
+                (category, keep, limit)
+            ).fetchall()
+        return [self._file_row(row) for row in rows]
+
+    def find_eviction_candidates(self, category: str, limit: int, order: str = "lru") -> List[Dict[str, Any]]:
+        """Files in a category in eviction order: least recently used or oldest first"""
+        order_by = "COALESCE(accessed_at, created_at)" if order == "lru" else "created_at"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM files WHERE category = ? ORDER BY {order_by}, id LIMIT ?",
+                (category, limit)
+            ).fetchall()
+        return [self._file_row(row) for row in rows]
+
+    def get_file(self, file_path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM files WHERE file_path = ?", (file_path,)
+            ).fetchone()
+        return self._file_row(row) if row else None
+
+    def get_project_files(self, project_id: str, category: str = None,
+                          offset: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Get a page of a project's files, newest first"""
+        query = "SELECT * FROM files WHERE project_id = ?"
+        params: List[Any] = [project_id]
+        if category:
+            query += " AND category = ?"
+            params.append(category)
+        query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._file_row(row) for row in rows]
+
+    def get_project_summary(self, project_id: str) -> Dict[str, Any]:
+        """File count and size per category for a project"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT category, COUNT(*), COALESCE(SUM(size), 0) FROM files
+                WHERE project_id = ? GROUP BY category
+                """,
+                (project_id,)
+            ).fetchall()
+        breakdown = {category: count for category, count, _ in rows}
+        return {
+            "file_type_breakdown": breakdown,
+            "total_files": sum(breakdown.values()),
+            "total_size": sum(size for _, _, size in rows)
+        }
+
+    # Module versions
+
+    def add_module_version(self, project_key: str, module_name: str, version: int,
+                           kind: str, digest: str, content_hash: str, size: int,
+                           stored_size: int, file_path: str = None,
+                           metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Record one version in a module's history"""
+        created_at = datetime.now().isoformat()
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO module_versions (project_key, module_name, version, kind, digest,
+                                             content_hash, size, stored_size, file_path,
+                                             created_at, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    project_key, module_name, version, kind, digest, content_hash,
+                    size, stored_size, file_path, created_at,
+                    json.dumps(metadata) if metadata else None
+                )
+            )
+        return self.get_module_version(project_key, module_name, version)
+
+    def get_module_version(self, project_key: str, module_name: str,
+                           version: int = None) -> Optional[Dict[str, Any]]:
+        """Get one version record, or the latest when version is None"""
+        with self._lock:
+            if version is None:
+                row = self._conn.execute(
+                    """
+                    SELECT * FROM module_versions WHERE project_key = ? AND module_name = ?
+                    ORDER BY version DESC LIMIT 1
+                    """,
+                    (project_key, module_name)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    """
+                    SELECT * FROM module_versions
+                    WHERE project_key = ? AND module_name = ? AND version = ?
+                    """,
+                    (project_key, module_name, version)
+                ).fetchone()
+        return self._version_row(row) if row else None
+
+    def get_module_versions(self, project_key: str, module_name: str) -> List[Dict[str, Any]]:
+        """Get a module's version records, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT * FROM module_versions WHERE project_key = ? AND module_name = ?
+                ORDER BY version
+                """,
+                (project_key, module_name)
+            ).fetchall()
+        return [self._version_row(row) for row in rows]
+
+    def get_version_chain(self, project_key: str, module_name: str, version: int) -> List[Dict[str, Any]]:
+        """Get the records from the nearest full version up to version, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT * FROM module_versions
+                WHERE project_key = ? AND module_name = ? AND version <= ?
+                  AND version >= (
+                      SELECT MAX(version) FROM module_versions
+                      WHERE project_key = ? AND module_name = ? AND version <= ? AND kind = 'full'
+                  )
+                ORDER BY version
+                """,
+                (project_key, module_name, version, project_key, module_name, version)
+            ).fetchall()
+        return [self._version_row(row) for row in rows]
+
+    def find_modules_over_version_limit(self, keep: int) -> List[Tuple[str, str]]:
+        """(project_key, module_name) pairs with more than keep versions"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT project_key, module_name FROM module_versions
+                GROUP BY project_key, module_name HAVING COUNT(*) > ?
+                """,
+                (keep,)
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def delete_module_versions(self, project_key: str, module_name: str, below_version: int) -> int:
+        """Delete a module's versions older than below_version"""
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM module_versions WHERE project_key = ? AND module_name = ? AND version < ?",
+                (project_key, module_name, below_version)
+            )
+            return cursor.rowcount
+
+    def delete_module_version(self, project_key: str, module_name: str, version: int) -> int:
+        """Delete one version of a module"""
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM module_versions WHERE project_key = ? AND module_name = ? AND version = ?",
+                (project_key, module_name, version)
+            )
+            return cursor.rowcount
+
+    def get_version_by_path(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Get the version record written for an artifact path"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM module_versions WHERE file_path = ? ORDER BY version DESC LIMIT 1",
+                (file_path,)
+            ).fetchone()
+        return self._version_row(row) if row else None
+
+    # Designs
+
+    def upsert_design(self, design_id: str, sections: Dict[str, str], modules: Dict[str, Dict[str, Any]]):
+        """Insert or replace a design's section hashes and module map"""
+        now = datetime.now().isoformat()
+        with self.transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO designs (design_id, sections, modules, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(design_id) DO UPDATE SET
+                    sections = excluded.sections,
+                    modules = excluded.modules,
+                    updated_at = excluded.updated_at
+                """,
+                (design_id, json.dumps(sections), json.dumps(modules), now, now)
+            )
+
+    def get_design(self, design_id: str) -> Optional[Dict[str, Any]]:
+        """Get a design record"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM designs WHERE design_id = ?", (design_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "design_id": row["design_id"],
+            "sections": json.loads(row["sections"]),
+            "modules": json.loads(row["modules"]),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"]
+        }
+
+    @staticmethod
+    def _version_row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "project_id": row["project_key"] or None,
+            "module_name": row["module_name"],
+            "version": row["version"],
+            "kind": row["kind"],
+            "digest": row["digest"],
+            "content_hash": row["content_hash"],
+            "size": row["size"],
+            "stored_size": row["stored_size"],
+            "file_path": row["file_path"],
+            "created_at": row["created_at"],
+            "metadata": json.loads(row["metadata"]) if row["metadata"] else None
+        }
+
+    @staticmethod
+    def _file_row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "filename": row["filename"],
+            "file_path": row["file_path"],
+            "file_type": CATEGORY_FILE_TYPES.get(row["category"], "documentation"),
+            "category": row["category"],
+            "project_id": row["project_id"],
+            "module_name": row["module_name"],
+            "size": row["size"],
+            "content_hash": row["content_hash"],
+            "created": row["created_at"],
+            "modified": row["modified_at"],
+            "accessed": row["accessed_at"],
+            "metadata": json.loads(row["metadata"]) if row["metadata"] else None
+        }
+
+
+# Global catalog instance
+catalog = MetadataCatalog()
@@ -0,0 +1,702 @@
+import os
+import re
+import asyncio
+import graphlib
+import operator
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from ...config import settings
+from ..utils import CodeFormatter, validate_verilog_syntax, estimate_pp_metrics
+from ..utils.verilog_parser import VerilogAST, ModuleDecl, PRIMITIVES, loads as load_ast
+from .file_service import file_service
+from .process_pool import run_in_process
+from .rtl_analysis_cache import ANALYSES, parse_rtl_source
+
+# Tokens of Verilog constant expressions; anything else (reals, strings,
+# concatenations, x/z digits) leaves a parameter unresolved
+_EXPRESSION_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<size>\d[\d_]*)?\s*'[sS]?(?P<base>[bBoOdDhH])\s*(?P<digits>[0-9a-fA-F_]+)
+      | (?P<number>\d[\d_]*)(?!\.)
+      | (?P<name>[A-Za-z_$][\w$]*)
+      | (?P<operator>\*\*|<<<|>>>|<<|>>|<=|>=|===|!==|==|!=|&&|\|\||~\^|\^~|[-+*/%&|^~!<>?:(),])
+    )\s*""", re.VERBOSE)
+_BASES = {"b": 2, "o": 8, "d": 10, "h": 16}
+
+
+def _divide(a: int, b: int) -> int:
+    """Verilog integer division, truncating toward zero"""
+    quotient = abs(a) // abs(b)
+    return quotient if (a < 0) == (b < 0) else -quotient
+
+
+def _shift(shift):
+    def apply(a: int, b: int) -> int:
+        if not 0 <= b <= 1024:
+            raise ValueError(f"Shift by {b}")
+        return shift(a, b)
+    return apply
+
+
+def _power(a: int, b: int) -> int:
+    if not 0 <= b <= 1024:
+        raise ValueError(f"Exponent {b}")
+    return a ** b
+
+
+# Binary operators by precedence (higher binds tighter) and what they compute
+_BINARY = {
+    "||": (1, lambda a, b: int(bool(a) or bool(b))),
+    "&&": (2, lambda a, b: int(bool(a) and bool(b))),
+    "|": (3, operator.or_),
+    "^": (4, operator.xor),
+    "~^": (4, lambda a, b: ~(a ^ b)),
+    "^~": (4, lambda a, b: ~(a ^ b)),
+    "&": (5, operator.and_),
+    "==": (6, lambda a, b: int(a == b)),
+    "!=": (6, lambda a, b: int(a != b)),
+    "===": (6, lambda a, b: int(a == b)),
+    "!==": (6, lambda a, b: int(a != b)),
+    "<": (7, lambda a, b: int(a < b)),
+    "<=": (7, lambda a, b: int(a <= b)),
+    ">": (7, lambda a, b: int(a > b)),
+    ">=": (7, lambda a, b: int(a >= b)),
+    "<<": (8, _shift(operator.lshift)),
+    ">>": (8, _shift(operator.rshift)),
+    "<<<": (8, _shift(operator.lshift)),
+    ">>>": (8, _shift(operator.rshift)),
+    "+": (9, operator.add),
+    "-": (9, operator.sub),
+    "*": (10, operator.mul),
+    "/": (10, _divide),
+    "%": (10, lambda a, b: a - b * _divide(a, b)),
+    "**": (11, _power),
+}
+_UNARY = {"-": operator.neg, "+": operator.pos, "!": lambda a: int(not a), "~": operator.invert}
+
+
+class _ConstantExpression:
+    """Evaluates a Verilog constant expression over resolved integer parameters"""
+
+    def __init__(self, expression: str, scope: Dict[str, Any]):
+        self.scope = scope
+        self.tokens: List[Tuple[str, Any]] = []
+        position = 0
+        while position < len(expression):
+            match = _EXPRESSION_TOKEN.match(expression, position)
+            if match is None or match.end() == position:
+                raise ValueError(f"Not a constant integer expression: {expression}")
+            if match.group("base"):
+                self.tokens.append(("number", int(match.group("digits").replace("_", ""),
+                                                  _BASES[match.group("base").lower()])))
+            elif match.group("number"):
+                self.tokens.append(("number", int(match.group("number").replace("_", ""))))
+            elif match.group("name"):
+                self.tokens.append(("name", match.group("name")))
+            elif match.group("operator"):
+                self.tokens.append(("operator", match.group("operator")))
+            position = match.end()
+        self.position = 0
+
+    def _peek(self) -> str:
+        if self.position < len(self.tokens) and self.tokens[self.position][0] == "operator":
+            return self.tokens[self.position][1]
+        return ""
+
+    def _expect(self, text: str):
+        if self._peek() != text:
+            raise ValueError(f"Expected '{text}'")
+        self.position += 1
+
+    def evaluate(self) -> int:
+        value = self._conditional()
+        if self.position != len(self.tokens):
+            raise ValueError("Trailing tokens in constant expression")
+        return value
+
+    def _conditional(self) -> int:
+        condition = self._binary(1)
+        if self._peek() != "?":
+            return condition
+        self.position += 1
+        when_true = self._conditional()
+        self._expect(":")
+        when_false = self._conditional()
+        return when_true if condition else when_false
+
+    def _binary(self, min_precedence: int) -> int:
+        left = self._operand()
+        while self._peek() in _BINARY:
+            precedence, apply = _BINARY[self._peek()]
+            if precedence < min_precedence:
+                break
+            self.position += 1
+            # ** is right-associative, everything else left-associative
+            right = self._binary(precedence if precedence == 11 else precedence + 1)
+            left = apply(left, right)
+        return left
+
+    def _operand(self) -> int:
+        if self.position >= len(self.tokens):
+            raise ValueError("Incomplete constant expression")
+        kind, value = self.tokens[self.position]
+        self.position += 1
+        if kind == "number":
+            return value
+        if kind == "name":
+            if value == "$clog2":
+                self._expect("(")
+                argument = self._conditional()
+                self._expect(")")
+                return (argument - 1).bit_length() if argument > 0 else 0
+            resolved = self.scope.get(value)
+            if not isinstance(resolved, int) or isinstance(resolved, bool):
+                raise ValueError(f"Unresolved parameter {value}")
+            return resolved
+        if value == "(":
+            result = self._conditional()
+            self._expect(")")
+            return result
+        if value in _UNARY:
+            return _UNARY[value](self._operand())
+        raise ValueError(f"Unexpected '{value}'")
+
+
+def _parameter_value(expression: str, scope: Dict[str, Any]) -> Any:
+    """Integer value of a parameter expression, or its text if it does not reduce to one"""
+    try:
+        return _ConstantExpression(expression, scope).evaluate()
+    except (ValueError, ArithmeticError):
+        return expression
+
+
+def _port_bits(width: str, scope: Dict[str, Any]) -> Optional[int]:
+    """Bit count of a packed range such as "WIDTH-1:0" or "3:0][7:0", if it is constant"""
+    if not width:
+        return 1
+    bits = 1
+    for dimension in width.split("]["):
+        bounds = dimension.split(":")
+        if len(bounds) != 2:
+            return None
+        msb, lsb = (_parameter_value(bound, scope) for bound in bounds)
+        if not isinstance(msb, int) or not isinstance(lsb, int):
+            return None
+        bits *= abs(msb - lsb) + 1
+    return bits
+
+
+class DesignIndex:
+    """
+    Elaboration index over every RTL file of a project.
+
+    For each project the index keeps the parsed AST of its RTL files and
+    derives from them a module table, the instance graph, the top-level
+    modules (declared but never instantiated) and, per top, an elaborated
+    hierarchy with parameter values resolved through instance overrides
+    and defparams. Cross-module problems are reported along the way:
+    undefined or recursively instantiated modules, and overrides or
+    connections naming parameters or ports the module does not have.
+
+    refresh() compares the catalog's content hashes with the indexed
+    files, so only new or changed files are read and parsed (in the
+    process pool, through the RTL analysis cache); derived tables are
+    rebuilt from the kept ASTs. Older versions of a generated module are
+    left out; the newest file wins when a module is declared twice.
+    """
+
+    def __init__(self, max_projects: int = None, max_depth: int = None, max_instances: int = None):
+        self.max_projects = max_projects or settings.DESIGN_INDEX_MAX_PROJECTS
+        self.max_depth = max_depth or settings.DESIGN_INDEX_MAX_DEPTH
+        self.max_instances = max_instances or settings.DESIGN_INDEX_MAX_INSTANCES
+        self._lock = threading.Lock()
+        self._projects: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._refresh_locks: Dict[str, asyncio.Lock] = {}
+
+    # Index maintenance
+
+    def _project(self, project_id: str) -> Dict[str, Any]:
+        """Indexed state of a project, created empty on first use (caller holds the lock)"""
+        project = self._projects.get(project_id)
+        if project is None:
+            project = {"files": {}, "design": None}
+            self._projects[project_id] = project
+            while len(self._projects) > self.max_projects:
+                self._projects.popitem(last=False)
+        self._projects.move_to_end(project_id)
+        return project
+
+    def update_file(self, project_id: str, file_path: str, ast: VerilogAST,
+                    signature: str = None, created: str = ""):
+        """
+        Add or replace one file of a project's index
+
+        Args:
+            project_id: Project identifier
+            file_path: Path of the RTL file
+            ast: Parsed file
+            signature: Content hash the file was indexed at
+            created: Creation timestamp; later files win duplicate module declarations
+        """
+        with self._lock:
+            project = self._project(project_id)
+            project["files"][file_path] = {
+                "filename": os.path.basename(file_path),
+                "signature": signature,
+                "created": created,
+                "ast": ast
+            }
+            project["design"] = None
+
+    def remove_file(self, project_id: str, file_path: str):
+        """Drop a file from a project's index"""
+        with self._lock:
+            project = self._project(project_id)
+            if project["files"].pop(file_path, None) is not None:
+                project["design"] = None
+
+    async def _index_file(self, project_id: str, row: Dict[str, Any], signature: str):
+        data = await asyncio.to_thread(file_service.read_artifact, row['file_path'])
+        ast = load_ast(await run_in_process(parse_rtl_source, data.decode('utf-8', errors='replace')))
+        self.update_file(project_id, row['file_path'], ast, signature, row['created'])
+
+    async def refresh(self, project_id: str) -> Dict[str, int]:
+        """
+        Bring a project's index up to date with the catalog
+
+        Args:
+            project_id: Project identifier
+
+        Returns:
+            Counts of files added, updated, removed and unchanged
+
+        Raises:
+            ValueError: If the project does not exist
+        """
+        lock = self._refresh_locks.setdefault(project_id, asyncio.Lock())
+        async with lock:
+            rows = await file_service.get_project_rtl_files(project_id)
+            # Generated modules keep every version; only the newest is part of the design
+            latest: Dict[str, Dict[str, Any]] = {}
+            for row in rows:
+                if os.path.splitext(row['filename'])[1].lower() in file_service.verilog_extensions:
+                    latest[row['module_name'] or row['file_path']] = row
+            wanted = {row['file_path']: row for row in latest.values()}
+
+            with self._lock:
+                indexed = {path: file["signature"] for path, file in self._project(project_id)["files"].items()}
+            changed = []
+            for file_path, row in wanted.items():
+                signature = row['content_hash'] or f"{row['modified']}:{row['size']}"
+                if indexed.get(file_path) != signature:
+                    changed.append((row, signature))
+            removed = [file_path for file_path in indexed if file_path not in wanted]
+
+            semaphore = asyncio.Semaphore(settings.DESIGN_INDEX_READ_CONCURRENCY)
+
+            async def index(row: Dict[str, Any], signature: str):
+                async with semaphore:
+                    await self._index_file(project_id, row, signature)
+
+            await asyncio.gather(*(index(row, signature) for row, signature in changed))
+            for file_path in removed:
+                self.remove_file(project_id, file_path)
+
+            added = sum(1 for row, _ in changed if row['file_path'] not in indexed)
+            return {
+                "added": added,
+                "updated": len(changed) - added,
+                "removed": len(removed),
+                "unchanged": len(wanted) - len(changed)
+            }
+
+    # Derived tables
+
+    def _design(self, project_id: str) -> Dict[str, Any]:
+        """Module table, instance graph and top modules of a project, rebuilt after changes"""
+        with self._lock:
+            project = self._project(project_id)
+            if project["design"] is not None:
+                return project["design"]
+            files = sorted(project["files"].items(), key=lambda item: (item[1]["created"], item[0]))
+
+            modules: Dict[str, Dict[str, Any]] = {}
+            declared_in: Dict[str, List[str]] = {}
+            for file_path, file in files:
+                for module in file["ast"].modules:
+                    modules[module.name] = {"module": module, "file_path": file_path, "filename": file["filename"]}
+                    declared_in.setdefault(module.name, []).append(file["filename"])
+
+            graph = {}
+            undefined: Dict[str, List[str]] = {}
+            for name, entry in modules.items():
+                children = sorted({
+                    instance.module for instance in entry["module"].instances if instance.module not in PRIMITIVES
+                })
+                graph[name] = children
+                for child in children:
+                    if child not in modules:
+                        undefined.setdefault(child, []).append(name)
+            instantiated = {child for children in graph.values() for child in children}
+            try:
+                graphlib.TopologicalSorter(
+                    {name: [child for child in children if child in modules] for name, children in graph.items()}
+                ).prepare()
+                cycle = []
+            except graphlib.CycleError as e:
+                # Modules that (indirectly) instantiate themselves; none of them can be a top
+                cycle = e.args[1]
+
+            project["design"] = {
+                "modules": modules,
+                "files": {file_path: file["ast"] for file_path, file in files},
+                "graph": graph,
+                "top_modules": sorted(name for name in modules if name not in instantiated),
+                "undefined_modules": undefined,
+                "duplicate_modules": {name: filenames for name, filenames in declared_in.items() if len(filenames) > 1},
+                "instantiation_cycle": cycle,
+                "elaborations": {}
+            }
+            return project["design"]
+
+    def _resolve_parameters(self, module: ModuleDecl, overrides: tuple, parent_scope: Dict[str, Any],
+                            defparams: Dict[str, Any], path: str, issues: List[Tuple[str, str, str]]) -> Dict[str, Any]:
+        """Parameter values of one instance: overrides and defparams first, then the module's defaults in order"""
+        overridable = [parameter.name for parameter in module.parameters if not parameter.local]
+        given = {}
+        for position, (name, expression) in enumerate(overrides):
+            if name is None:
+                if position >= len(overridable):
+                    issues.append(("error", path, f"More parameter overrides than '{module.name}' has parameters"))
+                    continue
+                name = overridable[position]
+            elif name not in overridable:
+                issues.append(("error", path, f"'{module.name}' has no parameter '{name}'"))
+                continue
+            given[name] = _parameter_value(expression, parent_scope)
+        for name, value in defparams.items():
+            if "." in name:
+                continue
+            if name not in overridable:
+                issues.append(("error", path, f"defparam of unknown parameter '{name}' of '{module.name}'"))
+                continue
+            given[name] = value
+
+        scope = {}
+        for parameter in module.parameters:
+            scope[parameter.name] = given[parameter.name] if parameter.name in given else _parameter_value(parameter.value, scope)
+        return scope
+
+    def _elaborate(self, design: Dict[str, Any], top: str) -> Dict[str, Any]:
+        """Elaborated hierarchy under one top module, memoized until the index changes"""
+        elaboration = design["elaborations"].get(top)
+        if elaboration is not None:
+            return elaboration
+
+        modules = design["modules"]
+        issues: List[Tuple[str, str, str]] = []
+        instance_counts: Dict[str, int] = {}
+        flattened = {"always_blocks": 0, "assign_statements": 0, "module_instances": 0}
+        state = {"instances": 0, "depth": 0, "truncated": False}
+
+        def visit(module_name: str, instance_name: str, path: str, overrides: tuple,
+                  parent_scope: Dict[str, Any], defparams: Dict[str, Any], stack: Tuple[str, ...]) -> Dict[str, Any]:
+            state["instances"] += 1
+            state["depth"] = max(state["depth"], len(stack) + 1)
+            entry = modules.get(module_name)
+            node = {"module": module_name, "instance": instance_name, "path": path}
+            if entry is None:
+                issues.append(("error", path, f"Module '{module_name}' is not defined in the project"))
+                node["undefined"] = True
+                return node
+
+            module = entry["module"]
+            instance_counts[module_name] = instance_counts.get(module_name, 0) + 1
+            flattened["always_blocks"] += sum(1 for process in module.processes if process.kind.startswith("always"))
+            flattened["assign_statements"] += len(module.assigns)
+            flattened["module_instances"] += len(module.instances)
+            scope = self._resolve_parameters(module, overrides, parent_scope, defparams, path, issues)
+            node.update(file=entry["filename"], file_path=entry["file_path"], parameters=scope, children=[])
+
+            # defparams declared here and inherited from above, by the instance they target
+            targets: Dict[str, Dict[str, Any]] = {}
+            inherited = [(name, value) for name, value in defparams.items() if "." in name]
+            declared = [(name, _parameter_value(expression, scope)) for name, expression in module.defparams]
+            for name, value in inherited + declared:
+                instance, _, rest = name.partition(".")
+                if rest:
+                    targets.setdefault(instance, {})[rest] = value
+
+            for instance in module.instances:
+                if instance.module in PRIMITIVES:
+                    continue
+                child_path = f"{path}.{instance.name or instance.module}"
+                if instance.module in stack or instance.module == module_name:
+                    issues.append(("error", child_path, f"Recursive instantiation of '{instance.module}'"))
+                    continue
+                if len(stack) + 1 >= self.max_depth or state["instances"] >= self.max_instances:
+                    state["truncated"] = True
+                    continue
+                child = modules.get(instance.module)
+                if child is not None:
+                    self._check_connections(instance, child["module"], child_path, issues)
+                node["children"].append(visit(
+                    instance.module, instance.name, child_path, instance.parameters,
+                    scope, targets.get(instance.name, {}), stack + (module_name,)
+                ))
+            return node
+
+        hierarchy = visit(top, top, top, (), {}, {}, ())
+        if state["truncated"]:
+            issues.append(("warning", top, f"Hierarchy truncated at {self.max_depth} levels or {self.max_instances} instances"))
+        elaboration = {
+            "top": top,
+            "hierarchy": hierarchy,
+            "instances": state["instances"],
+            "depth": state["depth"],
+            "instance_counts": instance_counts,
+            "flattened": flattened,
+            "issues": issues
+        }
+        design["elaborations"][top] = elaboration
+        return elaboration
+
+    @staticmethod
+    def _check_connections(instance, module: ModuleDecl, path: str, issues: List[Tuple[str, str, str]]):
+        """Flag connections to ports the instantiated module does not have"""
+        port_names = {port.name for port in module.ports}
+        positional = 0
+        for port, _ in instance.connections:
+            if port is None:
+                positional += 1
+            elif port != "*" and port not in port_names:
+                issues.append(("error", path, f"'{module.name}' has no port '{port}'"))
+        if positional > len(module.ports):
+            issues.append(("error", path, f"{positional} positional connections but '{module.name}' has {len(module.ports)} ports"))
+
+    def _tops(self, design: Dict[str, Any], project_id: str, top: Optional[str]) -> List[str]:
+        if top is None:
+            return design["top_modules"]
+        if top not in design["modules"]:
+            raise ValueError(f"Module {top} not found in project {project_id}")
+        return [top]
+
+    async def _elaborations(self, project_id: str, top: Optional[str]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Refresh a project, then elaborate it off the event loop"""
+        await self.refresh(project_id)
+
+        def build():
+            design = self._design(project_id)
+            return design, [self._elaborate(design, name) for name in self._tops(design, project_id, top)]
+
+        return await asyncio.to_thread(build)
+
+    # Queries
+
+    async def get_index(self, project_id: str) -> Dict[str, Any]:
+        """
+        Get a project's module table and instance graph
+
+        Args:
+            project_id: Project identifier
+
+        Returns:
+            Modules with their file, parameters, ports and instances, the
+            instance graph, top-level, undefined and duplicate modules, an
+            instantiation cycle if there is one, and what the refresh re-read
+        """
+        changes = await self.refresh(project_id)
+        design = await asyncio.to_thread(self._design, project_id)
+        modules = {}
+        for name, entry in design["modules"].items():
+            module = entry["module"]
+            modules[name] = {
+                "kind": module.kind,
+                "file": entry["filename"],
+                "file_path": entry["file_path"],
+                "line": module.line,
+                "parameters": [
+                    {"name": parameter.name, "value": parameter.value, "local": parameter.local}
+                    for parameter in module.parameters
+                ],
+                "ports": [
+                    {"name": port.name, "direction": port.direction, "width": port.width or "1"}
+                    for port in module.ports
+                ],
+                "instances": [
+                    {"name": instance.name, "module": instance.module, "line": instance.line}
+                    for instance in module.instances if instance.module not in PRIMITIVES
+                ]
+            }
+        return {
+            "project_id": project_id,
+            "files": len(design["files"]),
+            "modules": modules,
+            "instance_graph": design["graph"],
+            "top_modules": design["top_modules"],
+            "undefined_modules": design["undefined_modules"],
+            "duplicate_modules": design["duplicate_modules"],
+            "instantiation_cycle": design["instantiation_cycle"],
+            "refresh": changes
+        }
+
+    async def elaborate(self, project_id: str, top: str = None) -> Dict[str, Any]:
+        """
+        Elaborate a project's design hierarchy
+
+        Args:
+            project_id: Project identifier
+            top: Module to elaborate from; every top-level module if None
+
+        Returns:
+            One hierarchy per top, with resolved parameters on every
+            instance, plus instance counts and elaboration issues
+
+        Raises:
+            ValueError: If the project or the top module does not exist
+        """
+        _, hierarchies = await self._elaborations(project_id, top)
+        return {
+            "project_id": project_id,
+            "top_modules": [elaboration["top"] for elaboration in hierarchies],
+            "hierarchies": [elaboration["hierarchy"] for elaboration in hierarchies],
+            "instances": sum(elaboration["instances"] for elaboration in hierarchies),
+            "issues": [
+                {"severity": severity, "path": path, "message": message}
+                for elaboration in hierarchies for severity, path, message in elaboration["issues"]
+            ]
+        }
+
+    async def analyze_design(self, project_id: str, analysis_types: List[str], top: str = None) -> Dict[str, Any]:
+        """
+        Run the RTL analyses on a whole design instead of a single source
+
+        Syntax results add elaboration problems to the parse issues of the
+        files involved; complexity counts every module in the hierarchy
+        once, plus instance totals; PPA is estimated from the flattened
+        design, so a module instantiated eight times counts eight times;
+        port analysis reports the top-level ports.
+
+        Args:
+            project_id: Project identifier
+            analysis_types: Keys of rtl_analysis_cache.ANALYSES to run
+            top: Module to analyze from; every top-level module if None
+
+        Returns:
+            Results keyed by analysis type
+
+        Raises:
+            ValueError: If the project, the top module or any module to analyze does not exist
+        """
+        design, elaborations = await self._elaborations(project_id, top)
+        if not elaborations:
+            raise ValueError(f"Project {project_id} has no top-level RTL module to analyze")
+
+        used = {}
+        for elaboration in elaborations:
+            used.update(elaboration["instance_counts"])
+        file_paths = {design["modules"][name]["file_path"] for name in used}
+        issues = []
+        metrics: Dict[str, int] = {}
+        for file_path in sorted(file_paths):
+            ast = design["files"][file_path]
+            filename = os.path.basename(file_path)
+            issues.extend((severity, line, f"{message} ({filename})") for severity, line, message in ast.issues)
+            for key, value in ast.metrics.items():
+                metrics[key] = metrics.get(key, 0) + value
+        design_ast = VerilogAST(
+            modules=[design["modules"][name]["module"] for name in used],
+            issues=issues,
+            metrics=metrics
+        )
+
+        results = {}
+        for analysis_type in dict.fromkeys(analysis_types):
+            if analysis_type not in ANALYSES:
+                continue
+            if analysis_type == "syntax":
+                syntax = validate_verilog_syntax(design_ast)
+                for elaboration in elaborations:
+                    for severity, path, message in elaboration["issues"]:
+                        (syntax["issues"] if severity == "error" else syntax["warnings"]).append(f"{path}: {message}")
+                syntax["valid"] = not syntax["issues"]
+                results["syntax"] = syntax
+            elif analysis_type == "complexity":
+                complexity = CodeFormatter.count_code_metrics(design_ast)
+                complexity["instances"] = sum(elaboration["instances"] for elaboration in elaborations)
+                complexity["hierarchy_depth"] = max((elaboration["depth"] for elaboration in elaborations), default=0)
+                results["complexity"] = complexity
+            elif analysis_type == "ppa_estimation":
+                flattened = {}
+                for elaboration in elaborations:
+                    for key, value in elaboration["flattened"].items():
+                        flattened[key] = flattened.get(key, 0) + value
+                results["ppa_estimation"] = estimate_pp_metrics(flattened)
+            elif analysis_type == "port_analysis":
+                tops = [design["modules"][elaboration["top"]]["module"] for elaboration in elaborations]
+                results["port_analysis"] = CodeFormatter.extract_module_ports(VerilogAST(modules=tops))
+        return results
+
+    async def get_design_context(self, project_id: str, module_name: str) -> Dict[str, Any]:
+        """
+        Describe a module and the hierarchy under it, for testbench generation
+
+        Args:
+            project_id: Project identifier
+            module_name: Module under test
+
+        Returns:
+            The module's file, default parameters, ports with resolved bit
+            widths, submodule instance counts, elaboration issues and a
+            text summary for prompts
+
+        Raises:
+            ValueError: If the project or the module does not exist
+        """
+        design, (elaboration,) = await self._elaborations(project_id, module_name)
+        entry = design["modules"][module_name]
+        scope = elaboration["hierarchy"]["parameters"]
+        ports = [
+            {
+                "name": port.name,
+                "direction": port.direction,
+                "width": port.width or "1",
+                "bits": _port_bits(port.width, scope),
+                "description": port.description
+            }
+            for port in entry["module"].ports
+        ]
+        submodules = {name: count for name, count in elaboration["instance_counts"].items() if name != module_name}
+
+        lines = []
+        if scope:
+            lines.append("Parameters: " + ", ".join(f"{name}={value}" for name, value in scope.items()))
+        for port in ports:
+            width = f" [{port['width']}]" if port["width"] != "1" else ""
+            bits = f" ({port['bits']} bits)" if port["bits"] and port["bits"] > 1 else ""
+            lines.append(f"Port: {port['direction'] or 'port'}{width} {port['name']}{bits}")
+        for child in elaboration["hierarchy"].get("children", []):
+            if child.get("undefined"):
+                lines.append(f"Submodule {child['instance']}: {child['module']} (not defined in the project)")
+                continue
+            parameters = ", ".join(f"{name}={value}" for name, value in child["parameters"].items())
+            lines.append(f"Submodule {child['instance']}: {child['module']} ({child['file']})" +
+                         (f", parameters {parameters}" if parameters else ""))
+        if submodules:
+            lines.append(f"Instances below {module_name}: " +
+                         ", ".join(f"{name} x{count}" for name, count in sorted(submodules.items())))
+
+        return {
+            "module_name": module_name,
+            "file_path": entry["file_path"],
+            "parameters": scope,
+            "ports": ports,
+            "submodules": submodules,
+            "issues": [f"{path}: {message}" for _, path, message in elaboration["issues"]],
+            "summary": "\n".join(lines)
+        }
+
+
+# Global design index instance
+design_index = DesignIndex()
@@ -0,0 +1,152 @@
+import re
+import graphlib
+from typing import Dict, Any, List, Optional
+from ...config import settings
+from ..utils.spec_ir import SpecIR
+from .design_store import design_store, WHOLE_SPEC, REQUIREMENTS_SECTION
+
+# Building blocks a spec can be decomposed into: name suffix, pattern that
+# marks a spec line as describing the block, what the block does, whether it
+# is a datapath block (as opposed to the registers and interrupts almost any
+# peripheral spec mentions), and the blocks it may instantiate
+_COMPONENTS = [
+    ("fifo", re.compile(r'\bfifos?\b', re.IGNORECASE),
+     "Parameterized synchronous FIFO (data width and depth as parameters) with full/empty flags",
+     True, ()),
+    ("baud_gen", re.compile(r'\bbaud\b', re.IGNORECASE),
+     "Baud rate generator: programmable clock divider producing a bit-rate tick",
+     True, ()),
+    ("sync", re.compile(r'\b(?:synchroni[sz]ers?|cdc|clock domain crossing)\b', re.IGNORECASE),
+     "Clock domain crossing synchronizer",
+     True, ()),
+    ("crc", re.compile(r'\bcrc\b', re.IGNORECASE),
+     "CRC generator/checker",
+     True, ()),
+    ("tx", re.compile(r'\b(?:tx|transmit\w*)\b', re.IGNORECASE),
+     "Transmitter: serializes data words onto the serial output",
+     True, ("fifo", "baud_gen", "crc")),
+    ("rx", re.compile(r'\b(?:rx|receive\w*)\b', re.IGNORECASE),
+     "Receiver: samples the serial input and deserializes data words, flagging errors",
+     True, ("fifo", "baud_gen", "crc", "sync")),
+    ("arbiter", re.compile(r'\barbit\w*', re.IGNORECASE),
+     "Arbiter: grants one of several requesters access to a shared resource",
+     True, ()),
+    ("timer", re.compile(r'\btimers?\b', re.IGNORECASE),
+     "Programmable timer/counter",
+     True, ()),
+    ("irq", re.compile(r'\b(?:interrupts?|irq)\b', re.IGNORECASE),
+     "Interrupt controller: combines event sources with enable/status bits into an interrupt output",
+     False, ()),
+    ("regs", re.compile(r'\b(?:registers?|csrs?)\b', re.IGNORECASE),
+     "Register file: control/status registers and the bus slave interface that accesses them",
+     False, ("irq", "sync")),
+]
+_TITLE_NOISE = re.compile(r'_(?:design|spec|specification|document)$')
+_MAX_LINES_PER_MODULE = 40
+
+
+class DesignPlanner:
+    """
+    Splits a specification into a DAG of submodules for hierarchical generation.
+
+    Spec lines are matched against a catalog of common building blocks
+    (FIFOs, baud generators, transmitters, register files, ...). Each block
+    found becomes a module with the spec lines and sections that describe
+    it. A block depends on another it may instantiate (a transmitter on a
+    FIFO) when the spec mentions both on the same line; the top module
+    depends on the blocks nothing else instantiates and is generated last
+    with their port lists. Registers and interrupts come with nearly every
+    peripheral, so only datapath blocks count towards
+    HIERARCHY_MIN_SUBMODULES; specs with fewer are left to single-call
+    generation.
+    """
+
+    def __init__(self, min_submodules: int = None):
+        self.min_submodules = min_submodules or settings.HIERARCHY_MIN_SUBMODULES
+
+    @staticmethod
+    def _top_name(spec_ir: SpecIR) -> str:
+        name = re.sub(r'[^0-9A-Za-z]+', '_', spec_ir.title).strip('_').lower()
+        name = _TITLE_NOISE.sub('', name)[:40].strip('_')
+        if not name or name[0].isdigit():
+            name = f"top_{name}" if name else "top"
+        return name
+
+    def plan(self, spec_text: str, spec_ir: SpecIR) -> Optional[Dict[str, Any]]:
+        """
+        Decompose a spec into submodules
+
+        Args:
+            spec_text: Specification text
+            spec_ir: Structured IR of the spec
+
+        Returns:
+            {"top": name, "modules": [...]} in dependency order, or None when
+            the spec does not break down into enough datapath blocks. Each module
+            has name, description, lines, sections (design_store keys it
+            depends on), depends_on and is_top.
+        """
+        lines: Dict[str, List[str]] = {component[0]: [] for component in _COMPONENTS}
+        for line in spec_text.splitlines():
+            stripped = line.strip()
+            if not stripped:
+                continue
+            for suffix, pattern, *_ in _COMPONENTS:
+                if pattern.search(stripped) and len(lines[suffix]) < _MAX_LINES_PER_MODULE:
+                    lines[suffix].append(stripped)
+
+        found = [component for component in _COMPONENTS if lines[component[0]]]
+        if sum(1 for component in found if component[3]) < self.min_submodules:
+            return None
+        patterns = {suffix: pattern for suffix, pattern, *_ in found}
+
+        sections: Dict[str, List[str]] = {suffix: [] for suffix in patterns}
+        for key, content in design_store.iter_keyed_sections(spec_text):
+            text = f"{key.replace('_', ' ')}\n{content}"
+            for suffix, pattern in patterns.items():
+                if pattern.search(text):
+                    sections[suffix].append(key)
+
+        top = self._top_name(spec_ir)
+        prefix = top.split('_')[0]
+        protocol = spec_ir.protocols[0] if spec_ir.protocols else None
+
+        submodules = []
+        for suffix, _, description, _, uses in found:
+            if suffix == "regs" and protocol:
+                description = f"{description} ({protocol} slave)"
+            # "transmit and receive FIFOs": the transmitter instantiates a FIFO
+            children = [
+                child for child in uses
+                if child in patterns and any(patterns[child].search(line) for line in lines[suffix])
+            ]
+            submodules.append({
+                "name": f"{prefix}_{suffix}",
+                "description": description,
+                "lines": lines[suffix],
+                "sections": (sections[suffix] or [WHOLE_SPEC]) + [REQUIREMENTS_SECTION],
+                "depends_on": [f"{prefix}_{child}" for child in children],
+                "is_top": False
+            })
+        if any(submodule["name"] == top for submodule in submodules):
+            top = f"{top}_top"
+        instantiated = {name for submodule in submodules for name in submodule["depends_on"]}
+        top_module = {
+            "name": top,
+            "description": "Top level: instantiates and connects the submodules",
+            "lines": [],
+            "sections": [WHOLE_SPEC],
+            "depends_on": [submodule["name"] for submodule in submodules if submodule["name"] not in instantiated],
+            "is_top": True
+        }
+        modules = submodules + [top_module]
+
+        # Validates the graph and fixes a dependency-respecting order
+        graph = {module["name"]: module["depends_on"] for module in modules}
+        order = list(graphlib.TopologicalSorter(graph).static_order())
+        by_name = {module["name"]: module for module in modules}
+        return {"top": top, "modules": [by_name[name] for name in order]}
+
+
+# Global design planner instance
+design_planner = DesignPlanner()
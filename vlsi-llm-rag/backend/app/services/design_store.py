@@ -0,0 +1,173 @@
+import json
+import hashlib
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from .catalog import catalog
+from .version_store import version_store
+from ..utils import TextProcessor
+
+# Module dependency on every section, including sections added later
+WHOLE_SPEC = "*"
+# Pseudo-section holding the structured requirements, so editing them
+# counts as a spec change
+REQUIREMENTS_SECTION = "__requirements__"
+
+
+class DesignStore:
+    """
+    Section-level change tracking for incremental RTL regeneration.
+
+    A design is a spec submitted repeatedly under one design_id. Each
+    submission is split with TextProcessor.iter_sections and every section
+    is hashed (whitespace-insensitive). The catalog keeps the hashes of the
+    last submission and, for every generated module, the sections it was
+    built from and the version it was saved as. On resubmission only
+    modules that depend on a changed, added or removed section are
+    regenerated; the rest are read back from the version store.
+    """
+
+    @staticmethod
+    def iter_keyed_sections(spec_text: str) -> Iterator[Tuple[str, str]]:
+        """
+        Stream (key, content) for each section of a spec
+
+        Keys are section names; repeated names get a #n suffix so every
+        section has a stable, distinct key.
+        """
+        seen: Dict[str, int] = {}
+        for name, content in TextProcessor.iter_sections(spec_text):
+            seen[name] = seen.get(name, 0) + 1
+            yield (name if seen[name] == 1 else f"{name}#{seen[name]}"), content
+
+    @staticmethod
+    def hash_sections(spec_text: str, requirements: Dict[str, Any] = None) -> Dict[str, str]:
+        """
+        Hash each section of a spec
+
+        Args:
+            spec_text: Specification text
+            requirements: Structured requirements submitted with the spec
+
+        Returns:
+            Section key -> SHA-256 of its whitespace-normalized content, in
+            document order. Repeated section names get a #n suffix.
+        """
+        hashes = {}
+        for key, content in DesignStore.iter_keyed_sections(spec_text):
+            normalized = " ".join(content.split())
+            hashes[key] = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        if requirements:
+            canonical = json.dumps(requirements, sort_keys=True, separators=(",", ":"), default=str)
+            hashes[REQUIREMENTS_SECTION] = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+        return hashes
+
+    def plan(self, design_id: str, spec_text: str, requirements: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Work out which modules of a design must be regenerated
+
+        Args:
+            design_id: Design identifier
+            spec_text: Newly submitted specification text
+            requirements: Structured requirements submitted with the spec
+
+        Returns:
+            Plan with the new section hashes, the changed sections, the
+            modules to reuse (name -> stored record) and the modules to
+            regenerate
+        """
+        sections = self.hash_sections(spec_text, requirements)
+        design = catalog.get_design(design_id)
+        previous = design["sections"] if design else {}
+
+        changed = [key for key, digest in sections.items() if previous.get(key) != digest]
+        changed += [key for key in previous if key not in sections]
+        changed_set = set(changed)
+
+        reuse: Dict[str, Dict[str, Any]] = {}
+        regenerate: List[str] = []
+        for module_name, record in (design["modules"] if design else {}).items():
+            depends_on = record.get("sections") or [WHOLE_SPEC]
+            affected = bool(changed_set) if WHOLE_SPEC in depends_on else not changed_set.isdisjoint(depends_on)
+            if affected or record.get("version") is None:
+                regenerate.append(module_name)
+            else:
+                reuse[module_name] = record
+
+        return {
+            "design_id": design_id,
+            "is_new": design is None,
+            "sections": sections,
+            "changed_sections": changed,
+            "reuse": reuse,
+            "regenerate": regenerate
+        }
+
+    @staticmethod
+    def limit_to(plan: Dict[str, Any], module_names: List[str]) -> Dict[str, Any]:
+        """
+        Restrict a plan to the modules the current spec produced
+
+        Modules of earlier submissions that the spec no longer contains are
+        dropped, so record() and describe() do not carry them forward.
+
+        Args:
+            plan: Plan returned by plan()
+            module_names: Names of the modules in the current generation result
+
+        Returns:
+            Copy of the plan with reuse and regenerate limited to module_names
+        """
+        names = set(module_names)
+        return {
+            **plan,
+            "reuse": {name: record for name, record in plan["reuse"].items() if name in names},
+            "regenerate": [name for name in plan["regenerate"] if name in names]
+        }
+
+    @staticmethod
+    def can_reuse_all(plan: Dict[str, Any]) -> bool:
+        """True when every module of the design is unaffected by the changes"""
+        return not plan["is_new"] and bool(plan["reuse"]) and not plan["regenerate"]
+
+    def load_module(self, module_name: str, record: Dict[str, Any]) -> Optional[str]:
+        """
+        Read back a reused module's source
+
+        Returns:
+            Module source, or None if its version is no longer stored (e.g.
+            pruned by retention), in which case it must be regenerated
+        """
+        try:
+            return version_store.get_version(
+                record.get("module_name", module_name), record["version"], record.get("project_id")
+            )
+        except ValueError:
+            return None
+
+    def record(self, plan: Dict[str, Any], modules: Dict[str, Dict[str, Any]]):
+        """
+        Store a submission's section hashes and module map
+
+        Args:
+            plan: Plan returned by plan() for this submission
+            modules: Regenerated modules: name -> {"sections": [...], "version": n,
+                "module_name": ..., "project_id": ...}; module_name is the
+                saved module when it differs from the planned name. Reused
+                modules from the plan are kept
+        """
+        module_map = {**plan["reuse"], **modules}
+        catalog.upsert_design(plan["design_id"], plan["sections"], module_map)
+
+    @staticmethod
+    def describe(plan: Dict[str, Any], regenerated: List[str]) -> Dict[str, Any]:
+        """Summary of an incremental update for API responses"""
+        return {
+            "design_id": plan["design_id"],
+            "changed_sections": [key for key in plan["changed_sections"] if key != REQUIREMENTS_SECTION],
+            "requirements_changed": REQUIREMENTS_SECTION in plan["changed_sections"],
+            "reused_modules": [name for name in plan["reuse"] if name not in regenerated],
+            "regenerated_modules": regenerated
+        }
+
+
+# Global design store instance
+design_store = DesignStore()
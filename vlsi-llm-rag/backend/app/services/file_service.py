@@ -2,13 +2,22 @@ import os
 import shutil
 import aiofiles
 import asyncio
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, BinaryIO, Iterator, Optional, Tuple
 from datetime import datetime
 import json
 import yaml
 from pathlib import Path
 import hashlib
+import io
+import uuid
 from ...config import settings
+from ..utils.document_extractor import DOCUMENT_EXTENSIONS, extract_document_text
+from ..utils.zip_stream import ZipEntry
+from ..utils.durable_io import atomic_write_bytes
+from .process_pool import run_in_process
+from .artifact_store import artifact_store, CODEC_NONE
+from .catalog import catalog
+from .version_store import version_store
 
 class FileService:
     """
@@ -24,6 +33,10 @@ class FileService:
             '.pdf', '.doc', '.docx'  # Documentation
         }
         self.max_file_size = settings.MAX_FILE_SIZE
+        self.rtl_extensions = {'.v', '.vh', '.sv', '.vhd', '.vhdl'}
+        self.verilog_extensions = {'.v', '.vh', '.sv'}
+        self.spec_extensions = {'.txt', '.md', '.yaml', '.yml', '.json'}
+        self.searchable_categories = ['specifications', 'rtl', 'testbenches', 'documents']
         
         # Create directory structure
         self._create_directories()
@@ -54,56 +67,240 @@ class FileService:
         Returns:
             Dictionary with file metadata
         """
+        temp_path = None
         try:
-            # Validate file size
-            content = await file.read()
-            if len(content) > self.max_file_size:
-                raise ValueError(f"File size exceeds maximum limit of {self.max_file_size} bytes")
-            
-            # Validate file extension
+            # Validate file extension before reading the body
             file_extension = Path(file.filename).suffix.lower()
             if file_extension not in self.allowed_extensions:
                 raise ValueError(f"File type {file_extension} not allowed")
             
+            # Stream to disk in chunks, hashing incrementally and enforcing the
+            # size limit as soon as it is crossed
+            temp_path = f"{self.base_upload_dir}/temp/.upload_{uuid.uuid4().hex}{file_extension}"
+            hasher = hashlib.sha256()
+            file_size = 0
+            async with aiofiles.open(temp_path, 'wb') as f:
+                while True:
+                    chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    file_size += len(chunk)
+                    if file_size > self.max_file_size:
+                        raise ValueError(f"File size exceeds maximum limit of {self.max_file_size} bytes")
+                    # hashlib releases the GIL for large buffers
+                    await asyncio.to_thread(hasher.update, chunk)
+                    await f.write(chunk)
+            
             # Generate unique filename
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            file_hash = hashlib.md5(content).hexdigest()[:8]
+            content_hash = hasher.hexdigest()
+            file_hash = content_hash[:8]
             safe_filename = Path(file.filename).stem.replace(' ', '_')
             unique_filename = f"{timestamp}_{file_hash}_{safe_filename}{file_extension}"
             
             # Determine save path based on file type and project
+            category = self._get_upload_category(file_extension)
             if project_id:
                 project_dir = f"{self.base_upload_dir}/projects/{project_id}"
                 os.makedirs(project_dir, exist_ok=True)
                 save_path = f"{project_dir}/{unique_filename}"
             else:
                 # Categorize by file type
-                if file_extension in ['.v', '.vh', '.sv', '.vhd', '.vhdl']:
+                if category == 'rtl':
                     save_path = f"{self.base_upload_dir}/rtl/{unique_filename}"
-                elif file_extension in ['.txt', '.md', '.yaml', '.yml', '.json']:
+                elif category == 'specifications':
                     save_path = f"{self.base_upload_dir}/specs/{unique_filename}"
                 else:
                     save_path = f"{self.base_upload_dir}/temp/{unique_filename}"
             
-            # Save file
-            async with aiofiles.open(save_path, 'wb') as f:
-                await f.write(content)
-            
-            # Return file metadata
-            return {
+            file_info = {
                 "filename": file.filename,
                 "saved_filename": unique_filename,
                 "file_path": save_path,
-                "file_size": len(content),
+                "file_size": file_size,
                 "file_type": file_extension,
                 "project_id": project_id,
                 "upload_time": datetime.now().isoformat(),
-                "file_hash": file_hash
+                "file_hash": file_hash,
+                "content_hash": content_hash
             }
             
+            # Move into the artifact store; identical uploads share one blob
+            await asyncio.to_thread(self._adopt_upload, save_path, temp_path, content_hash)
+            
+            # Index text uploads for search; documents are indexed once extracted
+            content = None
+            if category in ('rtl', 'specifications'):
+                content = await asyncio.to_thread(self._read_index_text, save_path)
+            await asyncio.to_thread(
+                catalog.record_file,
+                save_path,
+                category,
+                file_size,
+                project_id=project_id,
+                content_hash=content_hash,
+                metadata={"original_filename": file.filename},
+                content=content
+            )
+            
+            # Return file metadata
+            return file_info
+            
         except Exception as e:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
             raise Exception(f"Failed to save file: {str(e)}")
     
+    def _store_artifact(self, file_path: str, data: bytes) -> str:
+        """Store bytes in the artifact store under file_path"""
+        return self._store_artifacts([(file_path, data)])[0]
+    
+    def _store_artifacts(self, files: List[Tuple[str, bytes]]) -> List[str]:
+        """
+        Store several artifacts as one durable unit
+        
+        All references are committed together (see ArtifactStore.put_many).
+        Uncompressed blobs are then exposed at their paths as hard links;
+        compressed ones are only reachable through the store (see open_artifact).
+        
+        Args:
+            files: (file_path, content) pairs
+            
+        Returns:
+            Content digest per file
+        """
+        results = artifact_store.put_many(files)
+        for (file_path, _), (digest, _) in zip(files, results):
+            if artifact_store.get_codec(digest) == CODEC_NONE:
+                artifact_store.materialize(digest, file_path)
+            elif os.path.lexists(file_path):
+                # Drop a stale plain copy from before compression was enabled
+                os.remove(file_path)
+        return [digest for digest, _ in results]
+    
+    @staticmethod
+    def _metadata_path(file_path: str) -> str:
+        """Path of the generation metadata saved alongside an artifact"""
+        return f"{os.path.splitext(file_path)[0]}_metadata.json"
+    
+    def _adopt_upload(self, file_path: str, temp_path: str, content_hash: str) -> str:
+        """Move a streamed upload into the artifact store and expose it at file_path"""
+        digest, _ = artifact_store.adopt_file(file_path, temp_path, content_hash)
+        artifact_store.materialize(digest, file_path)
+        return digest
+    
+    def _read_index_text(self, file_path: str) -> str:
+        """Read the leading text of a file for the full-text index"""
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read(settings.SEARCH_INDEX_MAX_CHARS)
+    
+    def _get_upload_category(self, extension: str) -> str:
+        """Map an uploaded file's extension to its catalog category"""
+        if extension in self.rtl_extensions:
+            return 'rtl'
+        if extension in self.spec_extensions:
+            return 'specifications'
+        return 'documents'
+    
+    def resolve_artifact(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Get storage details for an artifact path
+        
+        Older RTL versions whose named copy was released resolve through
+        the version history; their digest is None.
+        
+        Returns:
+            Digest, content hash, size, codec and stored size, or None if the
+            path is not stored
+        """
+        stored = artifact_store.stat_ref(file_path)
+        if stored is not None:
+            return {**stored, "content_hash": stored["digest"]}
+        
+        version = version_store.get_version_for_path(file_path)
+        if version is not None:
+            return {
+                "digest": None,
+                "content_hash": version["content_hash"],
+                "size": version["size"],
+                "codec": CODEC_NONE,
+                "stored_size": version["stored_size"],
+                "version": version["version"]
+            }
+        return None
+    
+    def artifact_exists(self, file_path: str) -> bool:
+        return os.path.isfile(file_path) or self.resolve_artifact(file_path) is not None
+    
+    def open_artifact(self, file_path: str) -> BinaryIO:
+        """
+        Open an artifact for reading, decompressing it if needed
+        
+        Args:
+            file_path: Artifact path
+            
+        Returns:
+            Binary file object with the artifact's original bytes
+        """
+        catalog.touch_file(file_path)
+        if os.path.isfile(file_path):
+            return open(file_path, 'rb')
+        digest = artifact_store.resolve(file_path)
+        if digest is not None:
+            return artifact_store.open_blob(digest)
+        
+        version = version_store.get_version_for_path(file_path)
+        if version is None:
+            raise FileNotFoundError(file_path)
+        content = version_store.get_version(version["module_name"], version["version"], version["project_id"])
+        return io.BytesIO(content.encode('utf-8'))
+    
+    def read_artifact(self, file_path: str) -> bytes:
+        with self.open_artifact(file_path) as f:
+            return f.read()
+    
+    def iter_artifact(self, file_path: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Yield an artifact's original bytes in chunks"""
+        with self.open_artifact(file_path) as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    
+    def _release_to_history(self, file_path: str):
+        """
+        Drop the full named copy of an RTL file now kept in version history
+        
+        Its generation metadata goes too; the version record holds a copy.
+        """
+        for path in (file_path, self._metadata_path(file_path)):
+            if os.path.exists(path):
+                os.remove(path)
+            artifact_store.remove_ref(path)
+    
+    def delete_artifact(self, file_path: str):
+        """
+        Delete a stored artifact and release its blob reference
+        
+        Args:
+            file_path: Path of the artifact
+        """
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        artifact_store.remove_ref(file_path)
+        catalog.remove_file(file_path)
+        
+        if Path(file_path).suffix.lower() in DOCUMENT_EXTENSIONS:
+            artifact_store.remove_ref(self._extracted_text_ref(file_path))
+        
+        if file_path.endswith('.v'):
+            # Generation metadata saved alongside RTL goes with it
+            metadata_file = self._metadata_path(file_path)
+            if os.path.exists(metadata_file):
+                os.remove(metadata_file)
+            artifact_store.remove_ref(metadata_file)
+    
     async def read_file_content(self, file_path: str) -> str:
         """
         Read file content as text
@@ -114,6 +311,18 @@ class FileService:
         Returns:
             File content as string
         """
+        if Path(file_path).suffix.lower() in DOCUMENT_EXTENSIONS:
+            return await self.extract_document_text(file_path)
+        
+        await asyncio.to_thread(catalog.touch_file, file_path)
+        if not os.path.exists(file_path) and self.artifact_exists(file_path):
+            # Compressed artifact or older version held only in the store
+            data = await asyncio.to_thread(self.read_artifact, file_path)
+            try:
+                return data.decode('utf-8')
+            except UnicodeDecodeError:
+                return data.decode('latin-1')
+        
         try:
             async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
                 content = await f.read()
@@ -126,6 +335,56 @@ class FileService:
         except Exception as e:
             raise Exception(f"Failed to read file: {str(e)}")
     
+    @staticmethod
+    def _extracted_text_ref(file_path: str) -> str:
+        """Artifact store reference holding a document's extracted text"""
+        return f"{file_path}#text"
+    
+    async def extract_document_text(self, file_path: str) -> str:
+        """
+        Extract text from a PDF/DOC/DOCX document
+        
+        Extraction streams page by page in the shared process pool. The text is
+        kept in the artifact store under a reference derived from the document
+        path, so later reads skip extraction and deleting the document releases
+        it. Upload paths embed a prefix of the content hash, so a stored text
+        always belongs to the bytes at that path.
+        
+        Args:
+            file_path: Path to the document
+            
+        Returns:
+            Extracted document text
+        """
+        text_ref = self._extracted_text_ref(file_path)
+        try:
+            digest = await asyncio.to_thread(artifact_store.resolve, text_ref)
+            if digest is not None:
+                data = await asyncio.to_thread(artifact_store.read_bytes, digest)
+                return data.decode('utf-8')
+            
+            temp_path = f"{self.base_upload_dir}/temp/.extract_{uuid.uuid4().hex}.txt"
+            try:
+                await run_in_process(
+                    extract_document_text,
+                    file_path,
+                    temp_path,
+                    settings.MAX_EXTRACTED_CHARS
+                )
+                async with aiofiles.open(temp_path, 'r', encoding='utf-8') as f:
+                    text = await f.read()
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            
+            await asyncio.to_thread(artifact_store.put_bytes, text_ref, text.encode('utf-8'))
+            await asyncio.to_thread(
+                catalog.index_content, file_path, text[:settings.SEARCH_INDEX_MAX_CHARS]
+            )
+            return text
+        except Exception as e:
+            raise Exception(f"Failed to extract document text: {str(e)}")
+    
     async def save_generated_rtl(self, rtl_code: str, module_name: str, 
                                project_id: str = None, metadata: Dict = None) -> Dict[str, Any]:
         """
@@ -151,22 +410,67 @@ class FileService:
             else:
                 file_path = f"{self.base_upload_dir}/rtl/{filename}"
             
-            # Save RTL code
-            async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-                await f.write(rtl_code)
-            
-            # Save metadata if provided
+            # Append to the module's version history, then save the RTL code
+            version_info = await asyncio.to_thread(
+                version_store.add_version, module_name, rtl_code, project_id, file_path, metadata
+            )
+            if version_info["unchanged"] and version_info["file_path"]:
+                # Same source as the latest version, whose named copy already holds it
+                return {
+                    "filename": os.path.basename(version_info["file_path"]),
+                    "file_path": version_info["file_path"],
+                    "module_name": module_name,
+                    "saved_at": version_info["created_at"],
+                    "file_size": version_info["size"],
+                    "content_hash": version_info["content_hash"],
+                    "version": version_info["version"],
+                    "version_kind": version_info["kind"],
+                    "unchanged": True
+                }
+            rtl_bytes = rtl_code.encode('utf-8')
+            
+            # The RTL and its metadata are committed as one unit
+            artifacts = [(file_path, rtl_bytes)]
             if metadata:
-                metadata_file = file_path.replace('.v', '_metadata.json')
-                async with aiofiles.open(metadata_file, 'w', encoding='utf-8') as f:
-                    await f.write(json.dumps(metadata, indent=2))
+                artifacts.append((self._metadata_path(file_path), json.dumps(metadata, indent=2).encode('utf-8')))
+            try:
+                content_hash = (await asyncio.to_thread(self._store_artifacts, artifacts))[0]
+            except Exception:
+                if not version_info["unchanged"]:
+                    # Keep the history from pointing at a file that was never written
+                    await asyncio.to_thread(
+                        version_store.discard_version, module_name, version_info["version"], project_id
+                    )
+                raise
+            
+            # Only the latest version keeps a full named copy; older paths
+            # resolve through the version history
+            previous = version_info["previous"]
+            if previous and previous["file_path"] and previous["file_path"] != file_path:
+                await asyncio.to_thread(self._release_to_history, previous["file_path"])
+            
+            await asyncio.to_thread(
+                catalog.record_file,
+                file_path,
+                'rtl',
+                len(rtl_bytes),
+                project_id=project_id,
+                content_hash=content_hash,
+                module_name=module_name,
+                metadata={**(metadata or {}), "version": version_info["version"]},
+                content=rtl_code
+            )
             
             return {
                 "filename": filename,
                 "file_path": file_path,
                 "module_name": module_name,
                 "saved_at": datetime.now().isoformat(),
-                "file_size": len(rtl_code)
+                "file_size": len(rtl_code),
+                "content_hash": content_hash,
+                "version": version_info["version"],
+                "version_kind": version_info["kind"],
+                "unchanged": version_info["unchanged"]
             }
             
         except Exception as e:
@@ -197,15 +501,26 @@ class FileService:
                 file_path = f"{self.base_upload_dir}/testbenches/{filename}"
             
             # Save testbench code
-            async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-                await f.write(testbench_code)
+            testbench_bytes = testbench_code.encode('utf-8')
+            content_hash = await asyncio.to_thread(self._store_artifact, file_path, testbench_bytes)
+            await asyncio.to_thread(
+                catalog.record_file,
+                file_path,
+                'testbenches',
+                len(testbench_bytes),
+                project_id=project_id,
+                content_hash=content_hash,
+                module_name=module_name,
+                content=testbench_code
+            )
             
             return {
                 "filename": filename,
                 "file_path": file_path,
                 "module_name": f"tb_{module_name}",
                 "saved_at": datetime.now().isoformat(),
-                "file_size": len(testbench_code)
+                "file_size": len(testbench_code),
+                "content_hash": content_hash
             }
             
         except Exception as e:
@@ -241,28 +556,58 @@ class FileService:
             }
             
             info_file = f"{project_dir}/project_info.json"
-            async with aiofiles.open(info_file, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(project_info, indent=2))
+            await asyncio.to_thread(
+                atomic_write_bytes,
+                info_file,
+                json.dumps(project_info, indent=2).encode('utf-8'),
+                settings.DURABLE_WRITES
+            )
+            
+            await asyncio.to_thread(catalog.upsert_project, project_info)
             
             return project_info
             
         except Exception as e:
             raise Exception(f"Failed to create project: {str(e)}")
     
-    async def get_project_files(self, project_id: str) -> Dict[str, List[Dict]]:
+    async def list_projects(self, page: int = 1, page_size: int = 10) -> Dict[str, Any]:
+        """
+        Get a page of projects from the catalog
+        
+        Args:
+            page: Page number (1-based)
+            page_size: Projects per page
+            
+        Returns:
+            Projects on the page and the total project count
+        """
+        try:
+            projects, total = await asyncio.to_thread(
+                catalog.list_projects, (page - 1) * page_size, page_size
+            )
+            return {"projects": projects, "total_projects": total}
+        except Exception as e:
+            raise Exception(f"Failed to list projects: {str(e)}")
+    
+    async def get_project_files(self, project_id: str, category: str = None,
+                                page: int = 1, page_size: int = 1000) -> Dict[str, Any]:
         """
-        Get all files in a project organized by type
+        Get files in a project organized by type
+        
+        Listings and totals come from the catalog; the project directory is
+        only scanned once, for projects created before the catalog existed.
         
         Args:
             project_id: Project identifier
+            category: Optional category filter
+            page: Page number (1-based)
+            page_size: Files per page
             
         Returns:
-            Dictionary of files organized by type
+            Files organized by type plus count and size totals
         """
         try:
-            project_dir = f"{self.base_upload_dir}/projects/{project_id}"
-            if not os.path.exists(project_dir):
-                raise ValueError(f"Project {project_id} not found")
+            await self._ensure_project_cataloged(project_id)
             
             file_categories = {
                 'specifications': [],
@@ -272,25 +617,146 @@ class FileService:
                 'logs': []
             }
             
-            for category in file_categories.keys():
-                category_dir = f"{project_dir}/{category}"
-                if os.path.exists(category_dir):
-                    for filename in os.listdir(category_dir):
-                        file_path = f"{category_dir}/{filename}"
-                        if os.path.isfile(file_path):
-                            stat = os.stat(file_path)
-                            file_categories[category].append({
-                                'filename': filename,
-                                'file_path': file_path,
-                                'size': stat.st_size,
-                                'modified': datetime.fromtimestamp(stat.st_mtime).isoformat()
-                            })
-            
-            return file_categories
+            files = await asyncio.to_thread(
+                catalog.get_project_files, project_id, category,
+                (page - 1) * page_size, page_size
+            )
+            for file_info in files:
+                file_categories.setdefault(file_info['category'], []).append(file_info)
+            
+            summary = await asyncio.to_thread(catalog.get_project_summary, project_id)
             
+            return {"files": file_categories, **summary}
+            
+        except ValueError:
+            raise
         except Exception as e:
             raise Exception(f"Failed to get project files: {str(e)}")
     
+    async def get_project_rtl_files(self, project_id: str) -> List[Dict[str, Any]]:
+        """
+        Get every RTL file of a project, for whole-project analysis
+        
+        Args:
+            project_id: Project identifier
+            
+        Returns:
+            Catalog rows of the project's RTL files, oldest first
+        """
+        await self._ensure_project_cataloged(project_id)
+        rows = await asyncio.to_thread(catalog.get_project_files, project_id, 'rtl', 0, -1)
+        return sorted(rows, key=lambda row: (row['created'], row['file_path']))
+    
+    async def _ensure_project_cataloged(self, project_id: str):
+        """Raise ValueError for unknown projects, importing pre-catalog ones"""
+        if await asyncio.to_thread(catalog.get_project, project_id) is None:
+            project_dir = f"{self.base_upload_dir}/projects/{project_id}"
+            if not os.path.exists(project_dir):
+                raise ValueError(f"Project {project_id} not found")
+            await asyncio.to_thread(self._import_project, project_id, project_dir)
+    
+    async def get_bundle_entries(self, project_id: str = None,
+                                 file_paths: List[str] = None) -> List[ZipEntry]:
+        """
+        Resolve the files for a zip bundle download
+        
+        Args:
+            project_id: Bundle every file of this project
+            file_paths: Bundle only these cataloged files (within the project, if given)
+            
+        Returns:
+            Archive entries named <category>/<filename>, in a stable order
+        """
+        if project_id:
+            await self._ensure_project_cataloged(project_id)
+            rows = await asyncio.to_thread(catalog.get_project_files, project_id, None, 0, -1)
+            if file_paths:
+                selected = set(file_paths)
+                rows = [row for row in rows if row['file_path'] in selected]
+        elif file_paths:
+            rows = []
+            for file_path in dict.fromkeys(file_paths):
+                row = await asyncio.to_thread(catalog.get_file, file_path)
+                if row is None:
+                    raise ValueError(f"File not found: {file_path}")
+                rows.append(row)
+        else:
+            raise ValueError("Either a project or a list of files is required")
+        
+        return await asyncio.to_thread(self._build_bundle_entries, rows)
+    
+    def _build_bundle_entries(self, rows: List[Dict[str, Any]]) -> List[ZipEntry]:
+        entries = []
+        used_names = set()
+        for row in sorted(rows, key=lambda r: (r['category'], r['filename'], r['file_path'])):
+            if os.path.isfile(row['file_path']):
+                size = os.path.getsize(row['file_path'])
+                opener = cache_key = None
+            else:
+                stored = self.resolve_artifact(row['file_path'])
+                if stored is None:
+                    continue
+                # Compressed blob or older version: stream it through the store
+                size = stored['size']
+                opener = lambda path=row['file_path']: self.open_artifact(path)
+                cache_key = stored['content_hash']
+            arcname = f"{row['category']}/{row['filename']}"
+            suffix = 1
+            while arcname in used_names:
+                stem, ext = os.path.splitext(row['filename'])
+                arcname = f"{row['category']}/{stem}_{suffix}{ext}"
+                suffix += 1
+            used_names.add(arcname)
+            entries.append(ZipEntry(
+                arcname,
+                row['file_path'],
+                size,
+                datetime.fromisoformat(row['created']),
+                opener=opener,
+                cache_key=cache_key
+            ))
+        return entries
+    
+    def _import_project(self, project_id: str, project_dir: str):
+        """Catalog a project directory that predates the catalog"""
+        project_info = {
+            "project_id": project_id,
+            "project_name": project_id,
+            "created_at": datetime.fromtimestamp(os.path.getctime(project_dir)).isoformat()
+        }
+        info_file = f"{project_dir}/project_info.json"
+        if os.path.exists(info_file):
+            with open(info_file, 'r', encoding='utf-8') as f:
+                project_info.update(json.load(f))
+        
+        subdir_categories = {'specs': 'specifications', 'specifications': 'specifications'}
+        with catalog.transaction():
+            catalog.upsert_project(project_info)
+            for root, dirs, files in os.walk(project_dir):
+                subdir = os.path.relpath(root, project_dir).split(os.sep)[0]
+                for filename in files:
+                    file_path = f"{root}/{filename}"
+                    if file_path == info_file or catalog.get_file(file_path) is not None:
+                        # Files saved under the id before the project row existed
+                        # are already cataloged with their hash and metadata
+                        continue
+                    if subdir == '.':
+                        category = self._get_upload_category(Path(filename).suffix.lower())
+                    else:
+                        category = subdir_categories.get(subdir, subdir)
+                    stat = os.stat(file_path)
+                    content = None
+                    if category in ('specifications', 'rtl', 'testbenches'):
+                        content = self._read_index_text(file_path)
+                    catalog.record_file(
+                        file_path,
+                        category,
+                        stat.st_size,
+                        project_id=project_id,
+                        created_at=datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                        content=content
+                    )
+    
     async def save_analysis_report(self, report_data: Dict[str, Any], 
                                  report_type: str, project_id: str = None) -> Dict[str, Any]:
         """
@@ -315,16 +781,27 @@ class FileService:
             else:
                 file_path = f"{self.base_upload_dir}/reports/{filename}"
             
-            # Save report as JSON
-            async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(report_data, indent=2))
+            # Save report as JSON (serialized once)
+            report_bytes = json.dumps(report_data, indent=2).encode('utf-8')
+            content_hash = await asyncio.to_thread(self._store_artifact, file_path, report_bytes)
+            
+            await asyncio.to_thread(
+                catalog.record_file,
+                file_path,
+                'reports',
+                len(report_bytes),
+                project_id=project_id,
+                content_hash=content_hash,
+                metadata={"report_type": report_type}
+            )
             
             return {
                 "filename": filename,
                 "file_path": file_path,
                 "report_type": report_type,
                 "saved_at": datetime.now().isoformat(),
-                "size": len(json.dumps(report_data))
+                "size": len(report_bytes),
+                "content_hash": content_hash
             }
             
         except Exception as e:
@@ -350,7 +827,9 @@ class FileService:
                 if os.path.isfile(file_path):
                     file_age = current_time - os.path.getmtime(file_path)
                     if file_age > max_age_seconds:
-                        os.remove(file_path)
+                        self.delete_artifact(file_path)
+            
+            artifact_store.gc()
                         
         except Exception as e:
             print(f"Cleanup warning: {str(e)}")
@@ -412,17 +891,35 @@ class FileService:
             bytes_size /= 1024.0
         return f"{bytes_size:.2f} TB"
     
-    async def search_files(self, query: str, project_id: str = None) -> List[Dict[str, Any]]:
+    async def search_files(self, query: str, project_id: str = None,
+                           limit: int = 50) -> List[Dict[str, Any]]:
         """
         Search for files containing specific text
         
+        Uses the catalog's full-text index, ranked by BM25 with a highlighted
+        snippet per file. Verilog identifiers match whole or by their parts.
+        Falls back to scanning files when SQLite lacks FTS5.
+        
         Args:
-            query: Search query
+            query: Search query; all terms must match
             project_id: Optional project scope
+            limit: Maximum number of results
             
         Returns:
-            List of matching files
+            List of matching files, best match first
         """
+        if catalog.fts_enabled:
+            try:
+                return await asyncio.to_thread(
+                    catalog.search,
+                    query,
+                    project_id,
+                    None if project_id else self.searchable_categories,
+                    limit
+                )
+            except Exception as e:
+                raise Exception(f"Search failed: {str(e)}")
+        
         try:
             results = []
             search_dirs = []
@@ -1,4 +1,5 @@
 import google.generativeai as genai
+import asyncio
 import os
 from typing import List, Dict, Any
 from ...config import settings
@@ -19,7 +20,9 @@ class LLMService:
         prompt = self._build_rtl_prompt(spec_text, context)
         
         try:
-            response = self.model.generate_content(prompt)
+            # The client is blocking; run it off the event loop so concurrent
+            # generations (e.g. submodules of one design) overlap
+            response = await asyncio.to_thread(self.model.generate_content, prompt)
             return self._parse_llm_response(response.text)
         except Exception as e:
             print(f"LLM Error: {e}")
@@ -105,7 +108,8 @@ module sample_module (
     end
 endmodule
             """.strip(),
-            "explanation": "Fallback implementation - basic register with valid signal"
+            "explanation": "Fallback implementation - basic register with valid signal",
+            "fallback": True
         }
 
 llm_service = LLMService()
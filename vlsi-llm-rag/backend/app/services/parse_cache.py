@@ -0,0 +1,240 @@
+import os
+import json
+import zlib
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+from ...config import settings
+from ..utils.file_parser import PARSER_VERSION
+from ..utils.spec_ir import SpecIR, IR_VERSION, extract_spec_ir, dumps as dump_ir, loads as load_ir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parse_results (
+    content_hash TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    parser_version TEXT NOT NULL,
+    result BLOB NOT NULL,
+    created_at TEXT NOT NULL,
+    accessed_at TEXT NOT NULL,
+    PRIMARY KEY (content_hash, file_type, parser_version)
+);
+CREATE INDEX IF NOT EXISTS idx_parse_results_accessed ON parse_results(accessed_at);
+CREATE TABLE IF NOT EXISTS spec_ir (
+    content_hash TEXT NOT NULL,
+    ir_version INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    created_at TEXT NOT NULL,
+    accessed_at TEXT NOT NULL,
+    PRIMARY KEY (content_hash, ir_version)
+);
+CREATE INDEX IF NOT EXISTS idx_spec_ir_accessed ON spec_ir(accessed_at);
+"""
+
+
+class ParseCache:
+    """
+    Persistent cache of specification parse results.
+
+    Results of analyze_specification are keyed by the content hash, file
+    type and PARSER_VERSION, so a re-upload or re-validation of the same
+    bytes skips parsing entirely, and bumping PARSER_VERSION invalidates
+    everything parsed by older code. A small in-memory LRU sits in front of
+    the SQLite table. The raw text is not stored; callers already hold it.
+
+    Specification IRs (see utils.spec_ir) are cached the same way, keyed by
+    content hash and IR_VERSION, so the generators get the structured view
+    of a spec without re-extracting it.
+    """
+
+    def __init__(self, db_path: str = None, memory_entries: int = None, max_entries: int = None):
+        self.db_path = db_path or settings.PARSE_CACHE_DB_PATH
+        self.memory_entries = memory_entries or settings.PARSE_CACHE_MEMORY_ENTRIES
+        self.max_entries = max_entries or settings.PARSE_CACHE_MAX_ENTRIES
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._ir_memory: "OrderedDict[str, SpecIR]" = OrderedDict()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # Results from older parser versions can never be hit again
+        self._conn.execute("DELETE FROM parse_results WHERE parser_version != ?", (PARSER_VERSION,))
+        self._conn.execute("DELETE FROM spec_ir WHERE ir_version != ?", (IR_VERSION,))
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """Content hash for text that did not come from an upload"""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _encode(parsed_data: Dict[str, Any]) -> bytes:
+        data = {key: value for key, value in parsed_data.items() if key != "raw_text"}
+        return zlib.compress(json.dumps(data, separators=(",", ":")).encode('utf-8'), 1)
+
+    @staticmethod
+    def _decode(blob: bytes) -> Dict[str, Any]:
+        return json.loads(zlib.decompress(blob))
+
+    def _remember(self, key: Tuple[str, str], blob: bytes):
+        """Add to the in-memory LRU (caller holds the lock)"""
+        self._memory[key] = blob
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, content_hash: str, file_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached parse result
+
+        Args:
+            content_hash: SHA-256 of the parsed content
+            file_type: File extension the content was parsed as
+
+        Returns:
+            A fresh copy of the parsed data (without raw_text), or None
+        """
+        key = (content_hash, file_type)
+        with self._lock:
+            blob = self._memory.get(key)
+            if blob is not None:
+                self._memory.move_to_end(key)
+            else:
+                row = self._conn.execute(
+                    "SELECT result FROM parse_results WHERE content_hash = ? AND file_type = ? AND parser_version = ?",
+                    (content_hash, file_type, PARSER_VERSION)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                blob = row[0]
+                self._remember(key, blob)
+                self._conn.execute(
+                    "UPDATE parse_results SET accessed_at = ? WHERE content_hash = ? AND file_type = ? AND parser_version = ?",
+                    (datetime.now().isoformat(), content_hash, file_type, PARSER_VERSION)
+                )
+                self._conn.commit()
+            self.hits += 1
+        return self._decode(blob)
+
+    def put(self, content_hash: str, file_type: str, parsed_data: Dict[str, Any]):
+        """
+        Cache a parse result
+
+        Args:
+            content_hash: SHA-256 of the parsed content
+            file_type: File extension the content was parsed as
+            parsed_data: Output of analyze_specification
+        """
+        blob = self._encode(parsed_data)
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._remember((content_hash, file_type), blob)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parse_results "
+                "(content_hash, file_type, parser_version, result, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (content_hash, file_type, PARSER_VERSION, blob, now, now)
+            )
+            self._puts += 1
+            if self._puts % 100 == 0:
+                self._trim()
+            self._conn.commit()
+
+    def get_spec_ir(self, text: str, content_hash: str = None) -> SpecIR:
+        """
+        Get the structured IR of a specification, extracting it on a miss
+
+        Args:
+            text: Specification text
+            content_hash: SHA-256 of the text if the caller already has it
+
+        Returns:
+            SpecIR shared with other callers; treat it as read-only
+        """
+        content_hash = content_hash or self.hash_text(text)
+        with self._lock:
+            ir = self._ir_memory.get(content_hash)
+            if ir is not None:
+                self._ir_memory.move_to_end(content_hash)
+                self.hits += 1
+                return ir
+            row = self._conn.execute(
+                "SELECT data FROM spec_ir WHERE content_hash = ? AND ir_version = ?",
+                (content_hash, IR_VERSION)
+            ).fetchone()
+            if row is not None:
+                ir = load_ir(row[0])
+                self._conn.execute(
+                    "UPDATE spec_ir SET accessed_at = ? WHERE content_hash = ? AND ir_version = ?",
+                    (datetime.now().isoformat(), content_hash, IR_VERSION)
+                )
+                self._conn.commit()
+            if ir is not None:
+                self.hits += 1
+                self._remember_ir(content_hash, ir)
+                return ir
+            self.misses += 1
+
+        ir = extract_spec_ir(text)
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._remember_ir(content_hash, ir)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO spec_ir (content_hash, ir_version, data, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (content_hash, IR_VERSION, dump_ir(ir), now, now)
+            )
+            self._puts += 1
+            if self._puts % 100 == 0:
+                self._trim()
+            self._conn.commit()
+        return ir
+
+    def _remember_ir(self, content_hash: str, ir: SpecIR):
+        """Add to the in-memory IR LRU (caller holds the lock)"""
+        self._ir_memory[content_hash] = ir
+        self._ir_memory.move_to_end(content_hash)
+        while len(self._ir_memory) > self.memory_entries:
+            self._ir_memory.popitem(last=False)
+
+    def _trim(self):
+        """Drop least recently used rows beyond max_entries (caller holds the lock)"""
+        for table in ("parse_results", "spec_ir"):
+            self._conn.execute(
+                f"""
+                DELETE FROM {table} WHERE rowid IN (
+                    SELECT rowid FROM {table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss counts and size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM parse_results").fetchone()[0]
+            ir_entries = self._conn.execute("SELECT COUNT(*) FROM spec_ir").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "parser_version": PARSER_VERSION,
+                "ir_version": IR_VERSION,
+                "entries": entries,
+                "ir_entries": ir_entries,
+                "memory_entries": len(self._memory),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+# Global parse cache instance
+parse_cache = ParseCache()
@@ -0,0 +1,49 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+from ...config import settings
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared process pool for CPU-bound work, creating it on first use
+
+    Returns:
+        Process pool shared by all services
+    """
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                workers = settings.PROCESS_POOL_WORKERS or max(1, (os.cpu_count() or 2) - 1)
+                _process_pool = ProcessPoolExecutor(max_workers=workers)
+    return _process_pool
+
+
+async def run_in_process(func: Callable, *args) -> Any:
+    """
+    Run a picklable top-level function in the process pool without blocking the event loop
+
+    Args:
+        func: Module-level function to execute
+        *args: Picklable positional arguments
+
+    Returns:
+        The function's return value
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), func, *args)
+
+
+def shutdown_process_pool():
+    """Shut down the shared process pool (called on application shutdown)"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
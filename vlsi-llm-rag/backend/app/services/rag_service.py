@@ -1,14 +1,23 @@
 import chromadb
 from sentence_transformers import SentenceTransformer
 import os
-from typing import List, Dict, Any
+import asyncio
+import hashlib
+import threading
+from typing import List, Dict, Any, Optional
 from ...config import settings
+from ..utils.dedup import simhash, SimHashIndex
+from .reranker import CrossEncoderReranker
 
 class RAGService:
     def __init__(self):
         self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
         self.client = chromadb.PersistentClient(path=settings.CHROMA_DB_PATH)
         self.collection = self._get_or_create_collection()
+        self.reranker = CrossEncoderReranker()
+        self._dedup_index: Optional[SimHashIndex] = None
+        # Serializes ingestion: the duplicate check and the add must not interleave
+        self._ingest_lock = threading.Lock()
         self._initialize_knowledge_base()
     
     def _get_or_create_collection(self):
@@ -49,27 +58,112 @@ class RAGService:
                 ids=[doc["id"] for doc in default_docs]
             )
     
-    def query(self, query_text: str, n_results: int = 3) -> List[Dict[str, Any]]:
-        """Query the knowledge base for relevant information"""
+    def query(self, query_text: str, n_results: int = 3,
+              rerank: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Query the knowledge base for relevant information
+
+        Args:
+            query_text: Query text
+            n_results: Number of results to return
+            rerank: Force the cross-encoder stage on/off (defaults to settings)
+
+        Returns:
+            List of results with text, metadata, distance and chunk id
+        """
+        use_rerank = settings.RERANK_ENABLED if rerank is None else rerank
+        fetch_count = max(n_results, settings.RERANK_CANDIDATES) if use_rerank else n_results
+
         try:
             results = self.collection.query(
                 query_texts=[query_text],
-                n_results=n_results
+                n_results=fetch_count
             )
             
             formatted_results = []
             for i, doc in enumerate(results['documents'][0]):
                 formatted_results.append({
+                    "id": results['ids'][0][i],
                     "text": doc,
                     "metadata": results['metadatas'][0][i],
                     "distance": results['distances'][0][i] if results['distances'] else 0
                 })
             
-            return formatted_results
+            if use_rerank:
+                formatted_results = self.reranker.rerank(query_text, formatted_results, n_results)
+            
+            return formatted_results[:n_results]
         except Exception as e:
             print(f"RAG Query Error: {e}")
             return []
     
+    async def multi_query(self, queries: List[str], n_results: int = 3,
+                          per_query_results: int = None) -> List[Dict[str, Any]]:
+        """
+        Run several focused queries and fuse their rankings
+        
+        All queries are embedded in a single batch, searched concurrently and
+        merged with reciprocal rank fusion (RRF), so a chunk ranked well by
+        several sub-queries beats one ranked first by a single sub-query.
+        
+        Args:
+            queries: Sub-queries derived from one request
+            n_results: Number of fused results to return
+            per_query_results: Candidates retrieved per sub-query
+            
+        Returns:
+            Fused results with "rrf_score" and "matched_queries" added
+        """
+        queries = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+        if not queries:
+            return []
+        per_query_results = per_query_results or max(n_results, 5)
+        
+        try:
+            embeddings = await asyncio.to_thread(
+                self.embedder.encode,
+                queries,
+                batch_size=len(queries),
+                show_progress_bar=False
+            )
+            searches = [
+                asyncio.to_thread(
+                    self.collection.query,
+                    query_embeddings=[embedding.tolist()],
+                    n_results=per_query_results
+                )
+                for embedding in embeddings
+            ]
+            responses = await asyncio.gather(*searches, return_exceptions=True)
+        except Exception as e:
+            print(f"RAG Multi-Query Error: {e}")
+            return []
+        
+        rrf_k = settings.RRF_K
+        fused: Dict[str, Dict[str, Any]] = {}
+        for response in responses:
+            if isinstance(response, Exception):
+                print(f"RAG Sub-Query Error: {response}")
+                continue
+            for rank, doc_id in enumerate(response['ids'][0]):
+                distance = response['distances'][0][rank] if response['distances'] else 0
+                entry = fused.get(doc_id)
+                if entry is None:
+                    entry = fused[doc_id] = {
+                        "id": doc_id,
+                        "text": response['documents'][0][rank],
+                        "metadata": response['metadatas'][0][rank],
+                        "distance": distance,
+                        "rrf_score": 0.0,
+                        "matched_queries": 0
+                    }
+                entry["rrf_score"] += 1.0 / (rrf_k + rank + 1)
+                entry["matched_queries"] += 1
+                entry["distance"] = min(entry["distance"], distance)
+        
+        ranked = sorted(fused.values(), key=lambda item: item["rrf_score"], reverse=True)
+        return ranked[:n_results]
+    
     def add_document(self, text: str, metadata: Dict[str, Any]):
         """Add a new document to the knowledge base"""
         doc_id = f"doc_{self.collection.count() + 1}"
@@ -78,5 +172,117 @@ class RAGService:
             metadatas=[metadata],
             ids=[doc_id]
         )
+        # Cached re-rank scores were computed against the old collection
+        self.reranker.clear_cache()
+    
+    def _split_into_chunks(self, text: str) -> List[str]:
+        """Split text into overlapping chunks, preferring paragraph boundaries"""
+        chunk_size = settings.CHUNK_SIZE
+        overlap = settings.CHUNK_OVERLAP
+        text = text.strip()
+        if len(text) <= chunk_size:
+            return [text] if text else []
+        
+        chunks = []
+        start = 0
+        while start < len(text):
+            end = min(start + chunk_size, len(text))
+            if end < len(text):
+                # Break on a paragraph or line boundary in the second half of the window
+                boundary = text.rfind("\n\n", start + chunk_size // 2, end)
+                if boundary == -1:
+                    boundary = text.rfind("\n", start + chunk_size // 2, end)
+                if boundary != -1:
+                    end = boundary
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+            if end >= len(text):
+                break
+            start = max(end - overlap, start + 1)
+        return chunks
+    
+    def _get_dedup_index(self) -> SimHashIndex:
+        """Build the fingerprint index from stored chunks on first use"""
+        if self._dedup_index is None:
+            index = SimHashIndex(threshold=settings.DEDUP_HAMMING_THRESHOLD)
+            stored = self.collection.get(include=["metadatas"])
+            for chunk_id, metadata in zip(stored["ids"], stored["metadatas"]):
+                if metadata and metadata.get("simhash"):
+                    index.add(chunk_id, int(metadata["simhash"], 16))
+            self._dedup_index = index
+        return self._dedup_index
+    
+    def ingest_document(self, text: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Chunk a document and add it to the knowledge base, dropping near-duplicates
+        
+        Chunks whose SimHash fingerprint is within DEDUP_HAMMING_THRESHOLD bits
+        of an already indexed chunk (from this or an earlier document) are not
+        stored. The report lists every dropped chunk and what it duplicated.
+        Fingerprints join the shared index only once their chunks are stored,
+        and concurrent calls are serialized, so a failed add never hides
+        later copies of its chunks.
+        
+        Args:
+            text: Document text
+            metadata: Metadata attached to every stored chunk
+            
+        Returns:
+            Ingestion report with added and removed chunk counts
+        """
+        document_id = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        chunks = self._split_into_chunks(text)
+        
+        with self._ingest_lock:
+            index = self._get_dedup_index() if settings.DEDUP_ENABLED else None
+            # Chunks of this document, checked alongside the shared index
+            pending = SimHashIndex(threshold=settings.DEDUP_HAMMING_THRESHOLD) if index is not None else None
+            
+            ids, documents, metadatas, fingerprints, removed = [], [], [], [], []
+            bytes_removed = 0
+            for chunk_index, chunk in enumerate(chunks):
+                chunk_id = f"doc_{document_id}_{chunk_index}"
+                fingerprint = simhash(chunk)
+                
+                if index is not None:
+                    matches = [m for m in (index.find_duplicate(fingerprint), pending.find_duplicate(fingerprint)) if m]
+                    if matches:
+                        match = min(matches, key=lambda m: m[1])
+                        removed.append({
+                            "chunk_index": chunk_index,
+                            "duplicate_of": match[0],
+                            "hamming_distance": match[1],
+                            "preview": chunk[:80]
+                        })
+                        bytes_removed += len(chunk.encode("utf-8"))
+                        continue
+                    pending.add(chunk_id, fingerprint)
+                
+                ids.append(chunk_id)
+                documents.append(chunk)
+                fingerprints.append(fingerprint)
+                metadatas.append({
+                    **metadata,
+                    "document_id": document_id,
+                    "chunk_index": chunk_index,
+                    "simhash": f"{fingerprint:016x}"
+                })
+            
+            if ids:
+                self.collection.add(documents=documents, metadatas=metadatas, ids=ids)
+                if index is not None:
+                    for chunk_id, fingerprint in zip(ids, fingerprints):
+                        index.add(chunk_id, fingerprint)
+                self.reranker.clear_cache()
+        
+        return {
+            "document_id": document_id,
+            "chunks_total": len(chunks),
+            "chunks_added": len(ids),
+            "chunks_removed": len(removed),
+            "bytes_removed": bytes_removed,
+            "removed": removed
+        }
 
 rag_service = RAGService()
@@ -0,0 +1,208 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from ...config import settings
+
+
+class CrossEncoderReranker:
+    """
+    Optional second-stage re-ranker for RAG results.
+
+    Re-scores a wide bi-encoder candidate set with a small CPU cross-encoder.
+    Scores are cached per (query hash, chunk id) and the stage is skipped
+    whenever the projected scoring time does not fit the latency budget.
+    The model loads on a background thread and is timed on a warm-up batch
+    before first use, so no request pays the load time and the budget
+    check always has a measured per-pair cost.
+    """
+
+    def __init__(self, model_name: str = None, batch_size: int = None,
+                 time_budget_ms: int = None, cache_size: int = None):
+        self.model_name = model_name or settings.RERANK_MODEL
+        self.batch_size = batch_size or settings.RERANK_BATCH_SIZE
+        self.time_budget_ms = time_budget_ms or settings.RERANK_TIME_BUDGET_MS
+        self.cache_size = cache_size or settings.RERANK_CACHE_SIZE
+
+        self._model = None
+        self._model_failed = False
+        self._model_lock = threading.Lock()
+        self._loader: Optional[threading.Thread] = None
+
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # Exponentially weighted cost of scoring one pair, in seconds
+        self._pair_cost: Optional[float] = None
+        self._inflight = 0
+        self._state_lock = threading.Lock()
+
+        self.stats = {
+            "reranked": 0,
+            "skipped_budget": 0,
+            "skipped_loading": 0,
+            "skipped_unavailable": 0,
+            "cache_hits": 0,
+            "cache_misses": 0
+        }
+
+    def _get_model(self):
+        """
+        Get the cross-encoder once it is loaded and timed
+
+        The first call starts loading it on a background thread, so startup
+        cost is only paid when re-ranking is used and never inside a request.
+        Returns None until the model is ready.
+        """
+        if self._model is not None or self._model_failed:
+            return self._model
+
+        with self._model_lock:
+            if self._loader is None:
+                self._loader = threading.Thread(target=self._load_model, name="reranker-load", daemon=True)
+                self._loader.start()
+        return None
+
+    def _load_model(self):
+        try:
+            from sentence_transformers import CrossEncoder
+            model = CrossEncoder(self.model_name, device="cpu")
+            # Seed the per-pair cost so the first real call is budget-checked
+            pairs = [("warm up query", "warm up passage")] * self.batch_size
+            start_time = time.perf_counter()
+            model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+            self._record_cost(len(pairs), time.perf_counter() - start_time)
+            self._model = model
+        except Exception as e:
+            print(f"⚠️  Re-ranker unavailable ({self.model_name}): {e}")
+            self._model_failed = True
+
+    @staticmethod
+    def query_hash(query_text: str) -> str:
+        """Stable hash of a normalized query used as the cache key prefix"""
+        normalized = " ".join(query_text.lower().split())
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key: Tuple[str, str]) -> Optional[float]:
+        with self._cache_lock:
+            score = self._cache.get(key)
+            if score is not None:
+                self._cache.move_to_end(key)
+            return score
+
+    def _cache_put(self, key: Tuple[str, str], score: float):
+        with self._cache_lock:
+            self._cache[key] = score
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _projected_cost_ms(self, pair_count: int) -> float:
+        """
+        Estimate how long scoring would take right now
+
+        Concurrent re-rank calls share the same CPU cores, so the per-pair cost
+        is scaled by the number of scoring calls already in flight.
+        """
+        with self._state_lock:
+            if self._pair_cost is None:
+                return 0.0
+            return self._pair_cost * pair_count * (1 + self._inflight) * 1000
+
+    def _record_cost(self, pair_count: int, elapsed: float):
+        per_pair = elapsed / max(1, pair_count)
+        with self._state_lock:
+            if self._pair_cost is None:
+                self._pair_cost = per_pair
+            else:
+                self._pair_cost = 0.8 * self._pair_cost + 0.2 * per_pair
+
+    def rerank(self, query_text: str, candidates: List[Dict[str, Any]],
+               top_k: int, time_budget_ms: int = None) -> List[Dict[str, Any]]:
+        """
+        Re-order candidates by cross-encoder relevance
+
+        Args:
+            query_text: Query the candidates were retrieved for
+            candidates: Bi-encoder results, each with "id" and "text" keys
+            top_k: Number of results to return
+            time_budget_ms: Optional override of the configured latency budget
+
+        Returns:
+            Top-k candidates, re-ordered when scoring fit within the budget
+        """
+        if len(candidates) <= 1:
+            return candidates[:top_k]
+
+        budget_ms = time_budget_ms if time_budget_ms is not None else self.time_budget_ms
+        q_hash = self.query_hash(query_text)
+
+        scores: Dict[str, float] = {}
+        missing = []
+        for candidate in candidates:
+            cached = self._cache_get((q_hash, candidate["id"]))
+            if cached is None:
+                missing.append(candidate)
+            else:
+                scores[candidate["id"]] = cached
+
+        self.stats["cache_hits"] += len(candidates) - len(missing)
+        self.stats["cache_misses"] += len(missing)
+
+        if missing:
+            model = self._get_model()
+            if model is None:
+                self.stats["skipped_unavailable" if self._model_failed else "skipped_loading"] += 1
+                return candidates[:top_k]
+
+            if self._projected_cost_ms(len(missing)) > budget_ms:
+                self.stats["skipped_budget"] += 1
+                return candidates[:top_k]
+
+            pairs = [(query_text, candidate["text"]) for candidate in missing]
+            with self._state_lock:
+                self._inflight += 1
+            try:
+                start_time = time.perf_counter()
+                predictions = model.predict(
+                    pairs,
+                    batch_size=self.batch_size,
+                    show_progress_bar=False
+                )
+                self._record_cost(len(pairs), time.perf_counter() - start_time)
+            except Exception as e:
+                print(f"Re-rank Error: {e}")
+                return candidates[:top_k]
+            finally:
+                with self._state_lock:
+                    self._inflight -= 1
+
+            for candidate, score in zip(missing, predictions):
+                score = float(score)
+                scores[candidate["id"]] = score
+                self._cache_put((q_hash, candidate["id"]), score)
+
+        self.stats["reranked"] += 1
+        ranked = sorted(candidates, key=lambda c: scores[c["id"]], reverse=True)
+        return [
+            {**candidate, "rerank_score": scores[candidate["id"]]}
+            for candidate in ranked[:top_k]
+        ]
+
+    def clear_cache(self):
+        """Drop all cached scores (e.g. after the knowledge base changes)"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get re-ranker statistics"""
+        with self._state_lock:
+            pair_cost_ms = self._pair_cost * 1000 if self._pair_cost is not None else None
+        return {
+            **self.stats,
+            "model": self.model_name,
+            "model_ready": self._model is not None,
+            "cache_entries": len(self._cache),
+            "pair_cost_ms": pair_cost_ms
+        }
@@ -0,0 +1,235 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from ...config import settings
+from .artifact_store import artifact_store
+from .catalog import catalog
+from .file_service import file_service
+from .version_store import version_store
+
+
+class RetentionWorker:
+    """
+    Background worker that enforces per-category retention policies.
+
+    Each category in RETENTION_POLICIES may set max_age_hours, max_per_module
+    (newest files kept per project/module), max_versions (module history
+    length) and max_total_bytes (evicted least recently used or oldest
+    first). Deletions run in small batches on worker threads with a pause
+    in between, so a large eviction never monopolises disk I/O. Unreferenced
+    blobs are garbage collected at the end of each pass.
+    """
+
+    def __init__(self, policies: Dict[str, Dict[str, Any]] = None):
+        self.enabled = settings.RETENTION_ENABLED
+        self.policies = policies if policies is not None else settings.RETENTION_POLICIES
+        self.interval = settings.RETENTION_INTERVAL_SECONDS
+        self.batch_size = settings.RETENTION_BATCH_SIZE
+        self.batch_pause = settings.RETENTION_BATCH_PAUSE_SECONDS
+        self.eviction_order = settings.RETENTION_EVICTION_ORDER
+
+        self._task: Optional[asyncio.Task] = None
+        self._run_lock: Optional[asyncio.Lock] = None
+        self.stats: Dict[str, Any] = {
+            "runs": 0,
+            "files_evicted": 0,
+            "bytes_evicted": 0,
+            "versions_pruned": 0,
+            "blobs_removed": 0,
+            "blob_bytes_reclaimed": 0,
+            "delete_failures": 0,
+            "last_run": None,
+            "last_error": None
+        }
+
+    def start(self):
+        """Start the periodic retention loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run_forever())
+
+    async def stop(self):
+        """Cancel the retention loop and wait for it to exit"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _run_forever(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["last_error"] = str(e)
+                print(f"⚠️  Retention pass failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def run_once(self) -> Dict[str, Any]:
+        """
+        Run one retention pass over every category
+
+        Returns:
+            Report of what the pass evicted and reclaimed
+        """
+        if self._run_lock is None:
+            self._run_lock = asyncio.Lock()
+
+        async with self._run_lock:
+            started = time.perf_counter()
+            report: Dict[str, Any] = {
+                "started_at": datetime.now().isoformat(),
+                "categories": {},
+                "files_evicted": 0,
+                "bytes_evicted": 0,
+                "versions_pruned": 0,
+                "delete_failures": 0
+            }
+
+            await file_service.cleanup_old_files(max_age_hours=settings.RETENTION_TEMP_MAX_AGE_HOURS)
+
+            for category, policy in self.policies.items():
+                result = await self._apply_policy(category, policy)
+                report["categories"][category] = result
+                report["files_evicted"] += result["files_evicted"]
+                report["bytes_evicted"] += result["bytes_evicted"]
+                report["versions_pruned"] += result.get("versions_pruned", 0)
+                report["delete_failures"] += result["delete_failures"]
+
+            gc_result = await asyncio.to_thread(artifact_store.gc)
+            report.update(gc_result)
+            report["duration_seconds"] = round(time.perf_counter() - started, 3)
+
+            self.stats["runs"] += 1
+            self.stats["files_evicted"] += report["files_evicted"]
+            self.stats["bytes_evicted"] += report["bytes_evicted"]
+            self.stats["versions_pruned"] += report["versions_pruned"]
+            self.stats["delete_failures"] += report["delete_failures"]
+            self.stats["blobs_removed"] += gc_result["blobs_removed"]
+            self.stats["blob_bytes_reclaimed"] += gc_result["bytes_reclaimed"]
+            self.stats["last_run"] = report
+            self.stats["last_error"] = None
+            return report
+
+    async def _apply_policy(self, category: str, policy: Dict[str, Any]) -> Dict[str, Any]:
+        result = {"files_evicted": 0, "bytes_evicted": 0, "delete_failures": 0, "reasons": {}}
+
+        def tally(reason: str, outcome: Tuple[List[Dict[str, Any]], int]) -> bool:
+            """Record one batch; False when nothing in it could be deleted"""
+            evicted, failed = outcome
+            result["delete_failures"] += failed
+            if evicted:
+                result["files_evicted"] += len(evicted)
+                result["bytes_evicted"] += sum(f["size"] for f in evicted)
+                result["reasons"][reason] = result["reasons"].get(reason, 0) + len(evicted)
+            return bool(evicted)
+
+        if policy.get("max_age_hours"):
+            cutoff = (datetime.now() - timedelta(hours=policy["max_age_hours"])).isoformat()
+            while True:
+                files = await asyncio.to_thread(
+                    catalog.find_files_older_than, category, cutoff, self.batch_size
+                )
+                # Undeletable files stay cataloged and come back first; stop once
+                # a batch is nothing but those and retry them next pass
+                if not files or not tally("max_age", await self._evict(files)):
+                    break
+
+        if policy.get("max_per_module"):
+            while True:
+                files = await asyncio.to_thread(
+                    catalog.find_excess_module_files, category, policy["max_per_module"], self.batch_size
+                )
+                if not files or not tally("max_per_module", await self._evict(files)):
+                    break
+
+        if policy.get("max_versions"):
+            result["versions_pruned"] = await self._prune_versions(policy["max_versions"])
+
+        if policy.get("max_total_bytes"):
+            _, used = await asyncio.to_thread(catalog.get_category_usage, category)
+            while used > policy["max_total_bytes"]:
+                candidates = await asyncio.to_thread(
+                    catalog.find_eviction_candidates, category, self.batch_size, self.eviction_order
+                )
+                if not candidates:
+                    break
+                batch = []
+                excess = used - policy["max_total_bytes"]
+                for candidate in candidates:
+                    batch.append(candidate)
+                    excess -= candidate["size"]
+                    if excess <= 0:
+                        break
+                outcome = await self._evict(batch)
+                used -= sum(f["size"] for f in outcome[0])
+                if not tally("max_total_bytes", outcome):
+                    break
+
+        return result
+
+    async def _evict(self, files: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """Delete one batch of files, then yield the disk to request traffic"""
+        outcome = await asyncio.to_thread(self._delete_batch, files)
+        await asyncio.sleep(self.batch_pause)
+        return outcome
+
+    def _delete_batch(self, files: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        evicted = []
+        failed = 0
+        for file_info in files:
+            try:
+                file_service.delete_artifact(file_info["file_path"])
+                evicted.append(file_info)
+            except Exception as e:
+                # Keep the catalog entry so a later pass can still reclaim the file
+                failed += 1
+                print(f"⚠️  Retention could not delete {file_info['file_path']}: {e}")
+        return evicted, failed
+
+    async def _prune_versions(self, keep: int) -> int:
+        pruned = 0
+        modules = await asyncio.to_thread(catalog.find_modules_over_version_limit, keep)
+        for project_key, module_name in modules:
+            removed, orphaned = await asyncio.to_thread(
+                self._prune_module, module_name, project_key or None, keep
+            )
+            if orphaned:
+                _, failed = await self._evict(orphaned)
+                self.stats["delete_failures"] += failed
+            pruned += len(removed)
+        return pruned
+
+    @staticmethod
+    def _prune_module(module_name: str, project_id: Optional[str],
+                      keep: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        removed = version_store.prune(module_name, project_id, keep)
+        # Paths whose only copy was the pruned history go with it
+        orphaned = [
+            {"file_path": record["file_path"], "size": record["size"]}
+            for record in removed
+            if record["file_path"] and artifact_store.resolve(record["file_path"]) is None
+        ]
+        return removed, orphaned
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get retention metrics and the active policies"""
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "policies": self.policies
+        }
+
+
+# Global retention worker instance
+retention_worker = RetentionWorker()
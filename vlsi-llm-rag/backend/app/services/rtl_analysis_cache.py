@@ -0,0 +1,376 @@
+import os
+import mmap
+import struct
+import marshal
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from ...config import settings
+from ..utils import CodeFormatter, validate_verilog_syntax, calculate_pp_metrics
+from ..utils.verilog_parser import (
+    VerilogAST, AST_VERSION, PRIMITIVES, parse_verilog, dumps as dump_ast, loads as load_ast
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so no shared store
+    fcntl = None
+
+# Bump whenever an analysis below changes its output
+ANALYSIS_VERSION = 1
+
+# /analyze-rtl analysis types and the function computing each from an AST
+ANALYSES = {
+    "syntax": validate_verilog_syntax,
+    "complexity": CodeFormatter.count_code_metrics,
+    "ppa_estimation": calculate_pp_metrics,
+    "port_analysis": CodeFormatter.extract_module_ports,
+}
+
+_MAGIC = b"RTLC"
+_HEADER = struct.Struct("<4sIIIQ")  # magic, AST_VERSION, ANALYSIS_VERSION, slot count, bytes written
+_SLOT = struct.Struct("<16sQI")  # content hash, write position, record length
+_RECORD = struct.Struct("<16sI")  # content hash, payload length
+
+
+class _SharedStore:
+    """
+    Memory-mapped store of cache entries shared by every process on the host.
+
+    The file holds a header, a direct-mapped table of slots indexed by
+    content hash and a ring buffer of records. Positions count every byte
+    ever written, so a slot whose record the ring has since overwritten is
+    recognized and treated as a miss. flock serializes writers across
+    processes; readers copy a record out under a shared lock and decode it
+    after releasing it. A forked worker reopens the file, since flock locks
+    belong to the open file and would otherwise be shared with the parent.
+    """
+
+    def __init__(self, path: str, size: int, slots: int):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._open()
+        with self._locked(fcntl.LOCK_EX):
+            existing = os.fstat(self._fd).st_size
+            if existing:
+                # Keep the geometry of a file other processes may have mapped
+                size = existing
+                header = os.pread(self._fd, _HEADER.size, 0)
+                if len(header) == _HEADER.size and header[:4] == _MAGIC:
+                    slots = _HEADER.unpack(header)[3]
+            else:
+                os.ftruncate(self._fd, size)
+            self.slots = slots
+            self.size = size
+            self.data_offset = _HEADER.size + slots * _SLOT.size
+            self.data_size = size - self.data_offset
+            if self.data_size < 4096:
+                raise ValueError(f"{path} is too small for {slots} slots")
+            self._map = mmap.mmap(self._fd, size)
+            if self._read_header() is None:
+                self._reset()
+        os.register_at_fork(after_in_child=self._open)
+
+    def _open(self):
+        """Open the file with a fresh lock (also run in forked children)"""
+        if hasattr(self, "_map"):
+            self._map.close()
+            os.close(self._fd)
+        self._lock = threading.Lock()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if hasattr(self, "_map"):
+            self._map = mmap.mmap(self._fd, self.size)
+
+    @contextmanager
+    def _locked(self, operation: int):
+        with self._lock:
+            fcntl.flock(self._fd, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _read_header(self) -> Optional[int]:
+        """Bytes written so far, or None if the file is from other versions (caller holds the lock)"""
+        magic, ast_version, analysis_version, slots, written = _HEADER.unpack_from(self._map, 0)
+        if (magic, ast_version, analysis_version, slots) != (_MAGIC, AST_VERSION, ANALYSIS_VERSION, self.slots):
+            return None
+        return written
+
+    def _reset(self):
+        """Empty the store (caller holds the exclusive lock)"""
+        self._map[_HEADER.size:self.data_offset] = bytes(self.data_offset - _HEADER.size)
+        _HEADER.pack_into(self._map, 0, _MAGIC, AST_VERSION, ANALYSIS_VERSION, self.slots, 0)
+
+    def _slot_offset(self, content_hash: bytes) -> int:
+        return _HEADER.size + int.from_bytes(content_hash[:8], "little") % self.slots * _SLOT.size
+
+    def get(self, content_hash: bytes) -> Optional[bytes]:
+        """Payload stored for a content hash, or None"""
+        with self._locked(fcntl.LOCK_SH):
+            written = self._read_header()
+            if written is None:
+                return None
+            slot_hash, position, length = _SLOT.unpack_from(self._map, self._slot_offset(content_hash))
+            if slot_hash != content_hash or not length or position < written - self.data_size:
+                return None
+            start = self.data_offset + position % self.data_size
+            record_hash, payload_length = _RECORD.unpack_from(self._map, start)
+            if record_hash != content_hash or _RECORD.size + payload_length != length:
+                return None
+            return self._map[start + _RECORD.size:start + length]
+
+    def put(self, content_hash: bytes, payload: bytes):
+        """Store a payload, replacing any earlier one for the hash"""
+        length = _RECORD.size + len(payload)
+        if length > self.data_size // 4:
+            return
+        with self._locked(fcntl.LOCK_EX):
+            written = self._read_header()
+            if written is None:
+                return
+            position = written
+            if position % self.data_size + length > self.data_size:
+                # Records never wrap; skip to the start of the ring
+                position += self.data_size - position % self.data_size
+            start = self.data_offset + position % self.data_size
+            _RECORD.pack_into(self._map, start, content_hash, len(payload))
+            self._map[start + _RECORD.size:start + length] = payload
+            _SLOT.pack_into(self._map, self._slot_offset(content_hash), content_hash, position, length)
+            _HEADER.pack_into(self._map, 0, _MAGIC, AST_VERSION, ANALYSIS_VERSION, self.slots, position + length)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._locked(fcntl.LOCK_SH):
+            written = self._read_header() or 0
+            live = 0
+            for index in range(self.slots):
+                _, position, length = _SLOT.unpack_from(self._map, _HEADER.size + index * _SLOT.size)
+                if length and position >= written - self.data_size:
+                    live += 1
+        return {
+            "path": self.path,
+            "size_bytes": self.size,
+            "slots": self.slots,
+            "entries": live,
+            "bytes_written": written
+        }
+
+
+class RTLAnalysisCache:
+    """
+    Cache of parsed RTL and its analysis results, keyed by content hash.
+
+    /analyze-rtl and /generate-rtl look sources up here instead of parsing
+    them and running each analysis again. An in-process LRU maps the hash
+    to the AST and the results computed so far, so a repeated analysis
+    costs a dictionary lookup. Behind it, a memory-mapped store shares
+    entries with the other worker processes (and survives restarts), so a
+    source parsed by one worker is not parsed again by the next. Stored
+    entries are tied to AST_VERSION and ANALYSIS_VERSION.
+    """
+
+    def __init__(self, store_path: str = None, store_bytes: int = None, memory_entries: int = None):
+        self.memory_entries = memory_entries or settings.RTL_CACHE_MEMORY_ENTRIES
+        store_path = store_path or settings.RTL_CACHE_STORE_PATH
+        store_bytes = settings.RTL_CACHE_STORE_BYTES if store_bytes is None else store_bytes
+
+        self._lock = threading.Lock()
+        # A fork may happen while another thread holds the lock
+        os.register_at_fork(after_in_child=self._reset_lock)
+        self._memory: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self._store: Optional[_SharedStore] = None
+        if store_bytes and fcntl is None:
+            print("⚠️  Shared RTL analysis store needs flock; caching per process only")
+        elif store_bytes:
+            try:
+                self._store = _SharedStore(store_path, store_bytes, settings.RTL_CACHE_STORE_SLOTS)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Shared RTL analysis store unavailable: {e}")
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def hash_text(rtl_code: str) -> bytes:
+        """Content hash of an RTL source"""
+        return hashlib.blake2b(rtl_code.encode('utf-8'), digest_size=16).digest()
+
+    def _remember(self, content_hash: bytes, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Add to the in-memory LRU, keeping an entry another thread added first (caller holds the lock)"""
+        entry = self._memory.setdefault(content_hash, entry)
+        self._memory.move_to_end(content_hash)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+        return entry
+
+    def _load_shared(self, content_hash: bytes) -> Optional[Dict[str, Any]]:
+        payload = self._store.get(content_hash) if self._store else None
+        if payload is None:
+            return None
+        ast_blob, results = marshal.loads(payload)
+        ast = load_ast(ast_blob)
+        if ast is None:
+            return None
+        return {"ast": ast, "ast_blob": ast_blob, "results": dict(results)}
+
+    def _publish(self, content_hash: bytes, entry: Dict[str, Any]):
+        """Write an entry through to the shared store"""
+        if self._store is None:
+            return
+        try:
+            payload = marshal.dumps((entry["ast_blob"], entry["results"]))
+        except ValueError:
+            # A result holding something marshal cannot encode stays process-local
+            return
+        self._store.put(content_hash, payload)
+
+    def _entry(self, rtl_code: str, content_hash: bytes) -> Tuple[Dict[str, Any], bool]:
+        """Cache entry for a source, parsing it on a miss; also says whether it was parsed here"""
+        with self._lock:
+            entry = self._memory.get(content_hash)
+            if entry is not None:
+                self._memory.move_to_end(content_hash)
+                self.hits += 1
+                return entry, False
+
+        entry = self._load_shared(content_hash)
+        parsed = entry is None
+        if parsed:
+            ast = parse_verilog(rtl_code)
+            entry = {"ast": ast, "ast_blob": dump_ast(ast), "results": {}}
+        with self._lock:
+            if parsed:
+                self.misses += 1
+            else:
+                self.shared_hits += 1
+            return self._remember(content_hash, entry), parsed
+
+    def get_ast(self, rtl_code: str, content_hash: bytes = None) -> VerilogAST:
+        """
+        Get the parsed AST of an RTL source, parsing it on a miss
+
+        Args:
+            rtl_code: RTL source text
+            content_hash: hash_text(rtl_code) if the caller already has it
+
+        Returns:
+            VerilogAST shared with other callers; treat it as read-only
+        """
+        return self._parsed(rtl_code, content_hash)["ast"]
+
+    def get_ast_bytes(self, rtl_code: str, content_hash: bytes = None) -> bytes:
+        """
+        Get the AST of an RTL source serialized with verilog_parser.dumps
+
+        Args:
+            rtl_code: RTL source text
+            content_hash: hash_text(rtl_code) if the caller already has it
+
+        Returns:
+            Serialized AST, for handing to another process
+        """
+        return self._parsed(rtl_code, content_hash)["ast_blob"]
+
+    def _parsed(self, rtl_code: str, content_hash: Optional[bytes]) -> Dict[str, Any]:
+        content_hash = content_hash or self.hash_text(rtl_code)
+        entry, parsed = self._entry(rtl_code, content_hash)
+        if parsed:
+            self._publish(content_hash, entry)
+        return entry
+
+    def analyze(self, rtl_code: str, analysis_types: Iterable[str], content_hash: bytes = None) -> Dict[str, Any]:
+        """
+        Run analyses on an RTL source, computing only those not cached yet
+
+        Args:
+            rtl_code: RTL source text
+            analysis_types: Keys of ANALYSES to run; unknown types are ignored
+            content_hash: hash_text(rtl_code) if the caller already has it
+
+        Returns:
+            Results keyed by analysis type, shared with other callers; treat them as read-only
+        """
+        content_hash = content_hash or self.hash_text(rtl_code)
+        entry, parsed = self._entry(rtl_code, content_hash)
+        results = entry["results"]
+        requested = [analysis_type for analysis_type in dict.fromkeys(analysis_types) if analysis_type in ANALYSES]
+        missing = [analysis_type for analysis_type in requested if analysis_type not in results]
+        for analysis_type in missing:
+            results[analysis_type] = ANALYSES[analysis_type](entry["ast"])
+        if parsed or missing:
+            self._publish(content_hash, entry)
+        return {analysis_type: results[analysis_type] for analysis_type in requested}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss counts and sizes"""
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            stats = {
+                "ast_version": AST_VERSION,
+                "analysis_version": ANALYSIS_VERSION,
+                "memory_entries": len(self._memory),
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.shared_hits) / lookups, 3) if lookups else 0.0
+            }
+        stats["shared_store"] = self._store.get_stats() if self._store else None
+        return stats
+
+
+# Global RTL analysis cache instance
+rtl_analysis_cache = RTLAnalysisCache()
+
+
+def analyze_rtl_source(rtl_code: str, analysis_types: List[str]) -> Dict[str, Any]:
+    """
+    Analyze one RTL source through the RTL analysis cache
+
+    Module-level so it can run in a worker process; workers share cached
+    entries with each other and the API process through the shared store.
+
+    Args:
+        rtl_code: RTL source text
+        analysis_types: Keys of ANALYSES to run
+
+    Returns:
+        The analysis results plus what batch summaries need: declared and
+        instantiated module names, issue counts and line metrics
+    """
+    content_hash = rtl_analysis_cache.hash_text(rtl_code)
+    results = rtl_analysis_cache.analyze(rtl_code, analysis_types, content_hash)
+    ast = rtl_analysis_cache.get_ast(rtl_code, content_hash)
+    return {
+        "results": results,
+        "modules": [module.name for module in ast.modules],
+        "instantiates": sorted({
+            instance.module for module in ast.modules for instance in module.instances
+            if instance.module not in PRIMITIVES
+        }),
+        "errors": len(ast.errors),
+        "warnings": len(ast.warnings),
+        "metrics": ast.metrics
+    }
+
+
+def parse_rtl_source(rtl_code: str) -> bytes:
+    """
+    Parse one RTL source through the RTL analysis cache
+
+    Module-level so it can run in a worker process. The AST comes back
+    serialized (load it with verilog_parser.loads), which costs far less
+    than parsing the source again.
+
+    Args:
+        rtl_code: RTL source text
+
+    Returns:
+        The serialized AST
+    """
+    return rtl_analysis_cache.get_ast_bytes(rtl_code)
@@ -1,22 +1,67 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from .llm_service import llm_service
 from .rag_service import rag_service
+from .parse_cache import parse_cache
+from .design_store import design_store, WHOLE_SPEC
+from .design_planner import design_planner
+from ..utils import TextProcessor
+from ..utils.spec_ir import SpecIR
+from ...config import settings
+import asyncio
+import graphlib
 import re
 
+# Module header up to the end of its port list
+_MODULE_HEADER = re.compile(r'\bmodule\s+\w+\s*(?:#\s*\(.*?\)\s*)?\(.*?\)\s*;', re.DOTALL)
+
 class RTLGenerator:
     def __init__(self):
         self.llm_service = llm_service
         self.rag_service = rag_service
     
-    async def generate_from_spec(self, spec_text: str, requirements: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Generate RTL from specification using RAG-enhanced LLM"""
+    async def generate_from_spec(self, spec_text: str, requirements: Dict[str, Any] = None,
+                                 design_plan: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Generate RTL from specification using RAG-enhanced LLM
+        
+        Args:
+            spec_text: Specification text
+            requirements: Structured design requirements
+            design_plan: Plan from design_store.plan() when updating an existing
+                design; modules unaffected by the edit are read back from the
+                version store instead of being generated
+        
+        Returns:
+            Generation result; "modules" lists each module with its code, the
+            spec sections it depends on and whether it was reused
+        """
+        # Structured view of the spec, shared by planning, query building and prompt enhancement
+        spec_ir = await asyncio.to_thread(parse_cache.get_spec_ir, spec_text)
+        
+        # Decomposable specs are generated as a submodule hierarchy. Without a
+        # model every call returns the same fallback, so there is nothing to split.
+        if settings.HIERARCHICAL_GENERATION and getattr(self.llm_service, "model", None) is not None:
+            hierarchy = design_planner.plan(spec_text, spec_ir)
+            if hierarchy is not None:
+                return await self._generate_hierarchy(spec_text, requirements, spec_ir, hierarchy, design_plan)
+        
+        # A single-call design is one module; a stored hierarchy does not fit it
+        if design_plan is not None and design_store.can_reuse_all(design_plan) and len(design_plan["reuse"]) == 1:
+            reused = await self._load_reused_modules(design_plan)
+            if reused is not None:
+                return reused
         
         # Query RAG for relevant context
-        rag_context = self.rag_service.query(spec_text)
+        sub_queries = self._build_sub_queries(spec_text, spec_ir) if settings.MULTI_QUERY_ENABLED else []
+        if len(sub_queries) > 1:
+            rag_context = await self.rag_service.multi_query(sub_queries)
+        else:
+            # query() may run the cross-encoder, which must stay off the event loop
+            rag_context = await asyncio.to_thread(self.rag_service.query, spec_text)
         context_texts = [item["text"] for item in rag_context]
         
         # Enhance spec with requirements
-        enhanced_spec = self._enhance_specification(spec_text, requirements)
+        enhanced_spec = self._enhance_specification(spec_text, requirements, spec_ir)
         
         # Generate RTL using LLM
         result = await self.llm_service.generate_rtl(enhanced_spec, context_texts)
@@ -24,13 +69,239 @@ class RTLGenerator:
         # Add RAG context information
         result["rag_context"] = rag_context
         result["requirements"] = requirements
+        result["modules"] = [{
+            "name": result["module_name"],
+            "module_name": result["module_name"],
+            "code": result["code"],
+            "sections": [WHOLE_SPEC],
+            "reused": False
+        }]
         
         return result
     
-    def _enhance_specification(self, spec_text: str, requirements: Dict[str, Any]) -> str:
-        """Enhance specification with formal requirements"""
+    async def _generate_hierarchy(self, spec_text: str, requirements: Dict[str, Any], spec_ir: SpecIR,
+                                  hierarchy: Dict[str, Any], design_plan: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Generate a decomposed design bottom-up
+        
+        Each submodule starts as soon as everything it depends on is done,
+        so independent leaves run in parallel (at most
+        HIERARCHY_MAX_CONCURRENCY LLM calls at a time) and the top level
+        follows with the leaves' port lists. A failed submodule is retried
+        up to HIERARCHY_MAX_ATTEMPTS times; if it still fails, modules that
+        depend on it are skipped and the rest of the design is returned.
+        Resubmitting under the same design_id then regenerates only the
+        missing modules.
+        """
+        modules = {module["name"]: module for module in hierarchy["modules"]}
+        enhanced_spec = self._enhance_specification(spec_text, requirements, spec_ir)
+        semaphore = asyncio.Semaphore(max(1, settings.HIERARCHY_MAX_CONCURRENCY))
+        outcomes: Dict[str, Dict[str, Any]] = {}
+        
+        sorter = graphlib.TopologicalSorter({name: module["depends_on"] for name, module in modules.items()})
+        sorter.prepare()
+        running: Dict[asyncio.Task, str] = {}
+        try:
+            while sorter.is_active():
+                for name in sorter.get_ready():
+                    task = asyncio.create_task(self._build_submodule(
+                        modules[name], outcomes, enhanced_spec, spec_ir, design_plan, semaphore
+                    ))
+                    running[task] = name
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    outcomes[name] = task.result()
+                    sorter.done(name)
+        finally:
+            # An error (or cancellation) leaves no submodule generating in the background
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+        
+        ordered = [outcomes[module["name"]] for module in hierarchy["modules"]]
+        top = outcomes[hierarchy["top"]]
+        failed = [outcome["name"] for outcome in ordered if outcome["status"] in ("failed", "skipped")]
+        
+        rag_context = []
+        seen_texts = set()
+        for outcome in ordered:
+            for item in outcome["rag_context"]:
+                if item["text"] not in seen_texts:
+                    seen_texts.add(item["text"])
+                    rag_context.append(item)
+        
+        return {
+            "module_name": top["module_name"],
+            "code": "\n\n".join(outcome["code"] for outcome in ordered if outcome["code"]),
+            "explanation": top["explanation"] or f"Hierarchical design: {len(ordered) - 1} submodules under {top['name']}",
+            "rag_context": rag_context,
+            "requirements": requirements,
+            "modules": [
+                {
+                    "name": outcome["name"],
+                    "module_name": outcome["module_name"],
+                    "code": outcome["code"],
+                    "sections": outcome["sections"],
+                    "reused": outcome["status"] == "reused"
+                }
+                for outcome in ordered if outcome["code"]
+            ],
+            "hierarchy": {
+                "top_module": top["name"],
+                "modules": [
+                    {key: outcome[key] for key in ("name", "module_name", "depends_on", "status", "attempts", "error")}
+                    for outcome in ordered
+                ],
+                "failed_modules": failed
+            }
+        }
+    
+    async def _build_submodule(self, module: Dict[str, Any], outcomes: Dict[str, Dict[str, Any]],
+                               enhanced_spec: str, spec_ir: SpecIR, design_plan: Optional[Dict[str, Any]],
+                               semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """Reuse or generate one submodule once its dependencies are done"""
+        outcome = {
+            "name": module["name"],
+            "module_name": module["name"],
+            "code": "",
+            "explanation": "",
+            "depends_on": module["depends_on"],
+            "sections": module["sections"],
+            "status": "failed",
+            "attempts": 0,
+            "error": None,
+            "rag_context": []
+        }
+        dependencies = [outcomes[name] for name in module["depends_on"]]
+        blocked = [dependency["name"] for dependency in dependencies if dependency["status"] in ("failed", "skipped")]
+        if blocked:
+            outcome["status"] = "skipped"
+            outcome["error"] = f"Depends on submodules that were not generated: {', '.join(blocked)}"
+            return outcome
+        
+        # An unchanged module is reused only if nothing it instantiates was regenerated
+        record = design_plan["reuse"].get(module["name"]) if design_plan else None
+        if record is not None and all(dependency["status"] == "reused" for dependency in dependencies):
+            code = await asyncio.to_thread(design_store.load_module, module["name"], record)
+            if code is not None:
+                outcome.update(module_name=record.get("module_name", module["name"]), code=code, status="reused")
+                return outcome
+        
+        prompt = self._submodule_prompt(module, dependencies, enhanced_spec, spec_ir)
+        query = enhanced_spec if module["is_top"] else "\n".join([module["description"]] + module["lines"])
+        query = query[:settings.MULTI_QUERY_MAX_CHARS]
+        
+        for attempt in range(1, max(1, settings.HIERARCHY_MAX_ATTEMPTS) + 1):
+            outcome["attempts"] = attempt
+            try:
+                async with semaphore:
+                    rag_context = await asyncio.to_thread(self.rag_service.query, query)
+                    response = await self.llm_service.generate_rtl(prompt, [item["text"] for item in rag_context])
+                if response.get("fallback") or not response.get("code"):
+                    raise ValueError("LLM returned no usable code")
+                outcome.update(
+                    module_name=response["module_name"],
+                    code=response["code"],
+                    explanation=response.get("explanation", ""),
+                    rag_context=rag_context,
+                    status="generated",
+                    error=None
+                )
+                return outcome
+            except Exception as e:
+                outcome["error"] = str(e)
+        
+        return outcome
+    
+    def _submodule_prompt(self, module: Dict[str, Any], dependencies: List[Dict[str, Any]],
+                          enhanced_spec: str, spec_ir: SpecIR) -> str:
+        """Specification handed to the LLM for one submodule"""
+        headers = []
+        for dependency in dependencies:
+            header = _MODULE_HEADER.search(dependency["code"])
+            headers.append(header.group(0) if header else f"module {dependency['module_name']} (...);")
+        if module["is_top"]:
+            return (
+                f"{enhanced_spec}\n\n"
+                f"SUBMODULES (already implemented; instantiate them, do not redefine them):\n"
+                + "\n\n".join(headers) +
+                f"\n\nGenerate only the top-level module {module['name']}, instantiating and connecting the submodules above."
+            )
+        
+        shared = "\n".join(
+            line for line in spec_ir.summary().splitlines()
+            if line.startswith(("Clocks:", "Resets:", "Parameters:"))
+        )
+        if headers:
+            structure = (
+                "Instantiate the submodules below where it needs them; they are already implemented, "
+                "do not redefine them:\n" + "\n\n".join(headers)
+            )
+        else:
+            structure = "It is a leaf of the design: do not instantiate other design modules."
+        return (
+            f"SUBMODULE: {module['name']}\n"
+            f"{module['description']}.\n"
+            f"Name the module exactly {module['name']}. {structure}\n\n"
+            f"RELEVANT SPECIFICATION:\n" + "\n".join(module["lines"]) +
+            (f"\n\nDESIGN-WIDE SETTINGS:\n{shared}" if shared else "")
+        )
+    
+    async def _load_reused_modules(self, design_plan: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Rebuild a generation result from the stored modules of a design"""
+        sources = []
+        for module_name, record in design_plan["reuse"].items():
+            code = await asyncio.to_thread(design_store.load_module, module_name, record)
+            if code is None:
+                return None
+            sources.append((module_name, record.get("module_name", module_name), code))
+        
+        return {
+            "module_name": sources[-1][1],
+            "code": "\n\n".join(code for _, _, code in sources),
+            "explanation": "No section this design depends on changed; reused the stored modules",
+            "rag_context": [],
+            "modules": [
+                {"name": name, "module_name": saved_name, "code": code, "sections": [WHOLE_SPEC], "reused": True}
+                for name, saved_name, code in sources
+            ]
+        }
+    
+    def _build_sub_queries(self, spec_text: str, spec_ir: SpecIR) -> List[str]:
+        """
+        Split a specification into focused retrieval queries
+        
+        Long specs embedded as a single query dilute into a generic vector.
+        One query per section plus one per detected protocol and interface
+        keeps each embedding specific.
+        """
+        max_chars = settings.MULTI_QUERY_MAX_CHARS
+        queries = []
+        
+        for protocol in spec_ir.protocols:
+            queries.append(f"{protocol} protocol")
+        
+        for name, content in TextProcessor.split_into_sections(spec_text).items():
+            title = name.replace('_', ' ').strip()
+            query = f"{title}: {content}".strip(': ') if content else title
+            if len(query) >= 20:
+                queries.append(query[:max_chars])
+        
+        for interface in spec_ir.interfaces:
+            queries.append(f"interface {interface.name}"[:max_chars])
+        
+        return list(dict.fromkeys(queries))[:settings.MULTI_QUERY_MAX_QUERIES]
+    
+    def _enhance_specification(self, spec_text: str, requirements: Dict[str, Any], spec_ir: SpecIR = None) -> str:
+        """Enhance specification with extracted structure and formal requirements"""
         enhanced = spec_text
         
+        if spec_ir is not None:
+            structure = spec_ir.summary()
+            if structure:
+                enhanced += f"\n\nEXTRACTED STRUCTURE:\n{structure}\n"
+        
         if requirements:
             req_section = "\n\nFORMAL REQUIREMENTS:\n"
             if requirements.get("interface"):
@@ -0,0 +1,302 @@
+import json
+import difflib
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from ...config import settings
+from .artifact_store import artifact_store
+from .catalog import catalog
+
+KIND_FULL = "full"
+KIND_DELTA = "delta"
+
+
+def encode_delta(base_lines: List[str], new_lines: List[str]) -> List[list]:
+    """
+    Line delta turning base_lines into new_lines
+
+    Ops are ["c", start, end] to copy base lines and ["a", lines] to add lines.
+    """
+    ops = []
+    matcher = difflib.SequenceMatcher(None, base_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["c", i1, i2])
+        elif tag in ("replace", "insert"):
+            ops.append(["a", new_lines[j1:j2]])
+    return ops
+
+
+def apply_delta(base_lines: List[str], ops: List[list]) -> List[str]:
+    """Rebuild lines from a base and a delta produced by encode_delta"""
+    lines = []
+    for op in ops:
+        if op[0] == "c":
+            lines.extend(base_lines[op[1]:op[2]])
+        else:
+            lines.extend(op[1])
+    return lines
+
+
+class VersionStore:
+    """
+    Per-module generation history with delta storage.
+
+    Each save of a module appends a version to its chain. A full copy is
+    kept every VERSION_KEYFRAME_INTERVAL versions and the versions in
+    between are stored as line deltas against their predecessor, so any
+    version is rebuilt from at most one keyframe plus a bounded number of
+    deltas. Payloads live in the artifact store; the chain is indexed in the
+    metadata catalog.
+    """
+
+    def __init__(self, keyframe_interval: int = None, cache_size: int = None):
+        self.keyframe_interval = max(1, keyframe_interval or settings.VERSION_KEYFRAME_INTERVAL)
+        self.cache_size = cache_size or settings.VERSION_CACHE_SIZE
+        self._cache: "OrderedDict[Tuple[str, str, int], str]" = OrderedDict()
+        self._chain_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _project_key(project_id: Optional[str]) -> str:
+        return project_id or ""
+
+    def _ref_name(self, project_key: str, module_name: str, version: int) -> str:
+        return f"versions/{project_key or '_'}/{module_name}/{version}"
+
+    def _cache_get(self, key: Tuple[str, str, int]) -> Optional[str]:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        return None
+
+    def _cache_put(self, key: Tuple[str, str, int], content: str):
+        with self._lock:
+            self._cache[key] = content
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def add_version(self, module_name: str, content: str, project_id: str = None,
+                    file_path: str = None, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Append a version to a module's history
+
+        Args:
+            module_name: Module name
+            content: Full module source
+            project_id: Optional project identifier
+            file_path: Artifact path written for this version
+            metadata: Generation metadata
+
+        Returns:
+            Version record plus "previous" (the prior record, if any) and
+            "unchanged" (True when content matched the latest version and no
+            new version was added)
+        """
+        project_key = self._project_key(project_id)
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+        # Writers to the same chain must see each other's latest version
+        with self._write_lock(project_key, module_name):
+            latest = catalog.get_module_version(project_key, module_name)
+            if latest and latest["content_hash"] == content_hash:
+                return {**latest, "previous": None, "unchanged": True}
+
+            version = latest["version"] + 1 if latest else 1
+            new_lines = content.splitlines(keepends=True)
+            kind = KIND_FULL
+            payload = content.encode('utf-8')
+
+            if latest and (version - 1) % self.keyframe_interval != 0:
+                base_lines = self.get_version(module_name, latest["version"], project_id).splitlines(keepends=True)
+                delta = json.dumps(
+                    {"base": latest["version"], "ops": encode_delta(base_lines, new_lines)},
+                    separators=(",", ":")
+                ).encode('utf-8')
+                if len(delta) < len(payload):
+                    kind = KIND_DELTA
+                    payload = delta
+
+            ref_name = self._ref_name(project_key, module_name, version)
+            digest, _ = artifact_store.put_bytes(ref_name, payload)
+            stored = artifact_store.stat_ref(ref_name)
+            record = catalog.add_module_version(
+                project_key, module_name, version, kind, digest, content_hash,
+                len(content.encode('utf-8')), stored["stored_size"] if stored else len(payload),
+                file_path, metadata
+            )
+
+        self._cache_put((project_key, module_name, version), content)
+        return {**record, "previous": latest, "unchanged": False}
+
+    def _write_lock(self, project_key: str, module_name: str) -> threading.Lock:
+        with self._lock:
+            return self._chain_locks.setdefault((project_key, module_name), threading.Lock())
+
+    def get_version(self, module_name: str, version: int = None, project_id: str = None) -> str:
+        """
+        Get the source of a module version
+
+        Args:
+            module_name: Module name
+            version: Version number, or None for the latest
+            project_id: Optional project identifier
+
+        Returns:
+            Module source
+        """
+        project_key = self._project_key(project_id)
+        if version is None:
+            latest = catalog.get_module_version(project_key, module_name)
+            if latest is None:
+                raise ValueError(f"No versions found for module {module_name}")
+            version = latest["version"]
+
+        cached = self._cache_get((project_key, module_name, version))
+        if cached is not None:
+            return cached
+
+        chain = catalog.get_version_chain(project_key, module_name, version)
+        if not chain or chain[-1]["version"] != version:
+            raise ValueError(f"Version {version} of module {module_name} not found")
+
+        # Start from the newest cached version on the chain, else the keyframe
+        start = 0
+        lines: List[str] = []
+        for index in range(len(chain) - 1, -1, -1):
+            cached = self._cache_get((project_key, module_name, chain[index]["version"]))
+            if cached is not None:
+                lines = cached.splitlines(keepends=True)
+                start = index + 1
+                break
+
+        for record in chain[start:]:
+            payload = artifact_store.read_bytes(record["digest"]).decode('utf-8')
+            if record["kind"] == KIND_FULL:
+                lines = payload.splitlines(keepends=True)
+            else:
+                lines = apply_delta(lines, json.loads(payload)["ops"])
+
+        content = "".join(lines)
+        self._cache_put((project_key, module_name, version), content)
+        return content
+
+    def list_versions(self, module_name: str, project_id: str = None) -> List[Dict[str, Any]]:
+        """Get a module's version records, oldest first"""
+        return catalog.get_module_versions(self._project_key(project_id), module_name)
+
+    def prune(self, module_name: str, project_id: str = None, keep: int = 50) -> List[Dict[str, Any]]:
+        """
+        Drop old versions while keeping at least the newest keep rebuildable
+
+        Deltas depend on their predecessors, so only versions before the
+        keyframe that the oldest kept version is rebuilt from are removed.
+
+        Args:
+            module_name: Module name
+            project_id: Optional project identifier
+            keep: Number of newest versions that must stay available
+
+        Returns:
+            Records of the removed versions
+        """
+        project_key = self._project_key(project_id)
+        with self._write_lock(project_key, module_name):
+            versions = catalog.get_module_versions(project_key, module_name)
+            if len(versions) <= keep:
+                return []
+            oldest_kept = versions[-max(keep, 1)]["version"]
+            keyframe = max(
+                v["version"] for v in versions
+                if v["kind"] == KIND_FULL and v["version"] <= oldest_kept
+            )
+            removed = [v for v in versions if v["version"] < keyframe]
+            if not removed:
+                return []
+
+            catalog.delete_module_versions(project_key, module_name, keyframe)
+            for record in removed:
+                artifact_store.remove_ref(self._ref_name(project_key, module_name, record["version"]))
+
+        with self._lock:
+            for record in removed:
+                self._cache.pop((project_key, module_name, record["version"]), None)
+        return removed
+
+    def discard_version(self, module_name: str, version: int, project_id: str = None) -> bool:
+        """
+        Roll back a version whose artifact could not be written
+
+        Only the latest version is removed, since a newer one may be a delta
+        built on it.
+
+        Args:
+            module_name: Module name
+            version: Version number returned by add_version
+            project_id: Optional project identifier
+
+        Returns:
+            True if the version was removed
+        """
+        project_key = self._project_key(project_id)
+        with self._write_lock(project_key, module_name):
+            latest = catalog.get_module_version(project_key, module_name)
+            if latest is None or latest["version"] != version:
+                return False
+            catalog.delete_module_version(project_key, module_name, version)
+            artifact_store.remove_ref(self._ref_name(project_key, module_name, version))
+
+        with self._lock:
+            self._cache.pop((project_key, module_name, version), None)
+        return True
+
+    def get_version_for_path(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Get the version record an artifact path was saved as"""
+        return catalog.get_version_by_path(file_path)
+
+    def diff(self, module_name: str, from_version: int, to_version: int = None,
+             project_id: str = None, context_lines: int = 3) -> Dict[str, Any]:
+        """
+        Unified diff between two versions of a module
+
+        Args:
+            module_name: Module name
+            from_version: Older version
+            to_version: Newer version, or None for the latest
+            project_id: Optional project identifier
+            context_lines: Unchanged lines shown around each change
+
+        Returns:
+            Diff text with added/removed line counts
+        """
+        if to_version is None:
+            latest = catalog.get_module_version(self._project_key(project_id), module_name)
+            if latest is None:
+                raise ValueError(f"No versions found for module {module_name}")
+            to_version = latest["version"]
+
+        old_lines = self.get_version(module_name, from_version, project_id).splitlines(keepends=True)
+        new_lines = self.get_version(module_name, to_version, project_id).splitlines(keepends=True)
+        diff_lines = list(difflib.unified_diff(
+            old_lines, new_lines,
+            fromfile=f"{module_name}@v{from_version}",
+            tofile=f"{module_name}@v{to_version}",
+            n=context_lines
+        ))
+        added = sum(1 for line in diff_lines if line.startswith('+') and not line.startswith('+++'))
+        removed = sum(1 for line in diff_lines if line.startswith('-') and not line.startswith('---'))
+        return {
+            "module_name": module_name,
+            "from_version": from_version,
+            "to_version": to_version,
+            "diff": "".join(diff_lines),
+            "lines_added": added,
+            "lines_removed": removed
+        }
+
+
+# Global version store instance
+version_store = VersionStore()
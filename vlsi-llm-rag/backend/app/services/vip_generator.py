@@ -1,12 +1,43 @@
+import re
 from typing import Dict, Any
 from .llm_service import llm_service
+from ..utils.spec_ir import SpecIR
 
 class VIPGenerator:
     def __init__(self):
         self.llm_service = llm_service
     
-    async def generate_testbench(self, rtl_code: str, module_name: str) -> Dict[str, Any]:
-        """Generate testbench for the given RTL"""
+    async def generate_testbench(self, rtl_code: str, module_name: str, spec_ir: SpecIR = None,
+                                 design: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Generate testbench for the given RTL
+        
+        Args:
+            rtl_code: RTL source of the DUT
+            module_name: DUT module name
+            spec_ir: Structured specification; its clocks, resets and register
+                map steer both the prompt and the fallback testbench
+            design: Context from design_index.get_design_context when the DUT
+                is part of a project; its hierarchy summary goes into the
+                prompt and its ports wire up the fallback testbench
+        """
+        structure = spec_ir.summary() if spec_ir is not None else ""
+        spec_section = f"""
+        SPECIFICATION STRUCTURE:
+        {structure}
+        """ if structure else ""
+        design_section = f"""
+        DESIGN HIERARCHY:
+        {design["summary"]}
+        """ if design and design.get("summary") else ""
+        extra_requirements = []
+        if spec_ir is not None and spec_ir.registers:
+            extra_requirements.append("Exercise every register in the register map: reset values, then write/read-back by access type")
+        if design_section:
+            extra_requirements.append("Connect every DUT port listed under DESIGN HIERARCHY at its resolved width")
+        register_requirement = "".join(
+            f"\n        {number}. {requirement}" for number, requirement in enumerate(extra_requirements, 7)
+        )
         
         prompt = f"""
         Generate a comprehensive SystemVerilog testbench for the following RTL module:
@@ -14,7 +45,7 @@ class VIPGenerator:
         MODULE: {module_name}
         CODE:
         {rtl_code}
-        
+        {spec_section}{design_section}
         Requirements:
         1. Include proper clock generation and reset sequence
         2. Add basic test cases covering normal operation
@@ -22,7 +53,7 @@ class VIPGenerator:
         4. Add simple scoreboard/checker for basic functionality
         5. Include waveform dump commands
         6. Make it self-checking where possible
-        
+        {register_requirement}
         Format:
         CODE:
         ```systemverilog
@@ -37,41 +68,95 @@ class VIPGenerator:
                 "module_name": f"tb_{module_name}"
             }
         except Exception as e:
-            return self._get_fallback_testbench(module_name)
+            return self._get_fallback_testbench(module_name, spec_ir, design)
     
-    def _get_fallback_testbench(self, module_name: str) -> Dict[str, Any]:
+    def _get_fallback_testbench(self, module_name: str, spec_ir: SpecIR = None,
+                                design: Dict[str, Any] = None) -> Dict[str, Any]:
         """Fallback testbench implementation"""
+        clk, rst, active_low, half_period = "clk", "rst_n", True, "5"
+        register_notes = ""
+        ports = design["ports"] if design else []
+        inputs = [port["name"] for port in ports if port["direction"] == "input"]
+        clock_port = next(
+            (name for name in inputs if re.fullmatch(r'\w*(?:clk|clock)\w*', name, re.IGNORECASE)), None
+        )
+        reset_port = next(
+            (name for name in inputs if re.fullmatch(r'\w*(?:rst|reset)\w*', name, re.IGNORECASE)), None
+        )
+        spec_active_low = None
+        if spec_ir is not None:
+            if spec_ir.clocks:
+                clk = spec_ir.clocks[0].name
+                if spec_ir.clocks[0].frequency_hz:
+                    half_period = f"{1e9 / spec_ir.clocks[0].frequency_hz / 2:.4g}"
+            if spec_ir.resets:
+                rst = spec_ir.resets[0].name
+                spec_active_low = spec_ir.resets[0].active_low
+                active_low = spec_active_low is not False
+            register_notes = "".join(
+                f"\n        // {register.name}" + (f" @ 0x{register.offset:X}" if register.offset is not None else "")
+                for register in spec_ir.registers
+            )
+        # The DUT's own port names win over the spec's (a spec clk may be aclk
+        # on the DUT); the spec still decides reset polarity when it states one
+        if clock_port:
+            clk = clock_port
+        if reset_port:
+            rst = reset_port
+            if spec_active_low is not None:
+                active_low = spec_active_low
+            else:
+                active_low = reset_port.lower().endswith(("_n", "_b", "rstn", "resetn"))
+        asserted, released = ("0", "1") if active_low else ("1", "0")
+        
+        # With the DUT's ports known, declare and connect all of them
+        declarations = ""
+        connections = f"""
+        .{clk}({clk}),
+        .{rst}({rst})
+        // Connect other ports"""
+        if ports:
+            for port in ports:
+                if port["name"] in (clk, rst):
+                    continue
+                kind = "reg " if port["direction"] == "input" else "wire"
+                if port["bits"] and port["bits"] > 1:
+                    width = f"[{port['bits'] - 1}:0] "
+                elif port["width"] != "1" and not port["bits"]:
+                    width = f"[{port['width']}] "
+                else:
+                    width = ""
+                declarations += f"\n    {kind} {width}{port['name']};"
+            connections = ",".join(f"\n        .{port['name']}({port['name']})" for port in ports)
+        
         return {
             "testbench_code": f"""
 `timescale 1ns/1ps
 
 module tb_{module_name};
-    reg clk;
-    reg rst_n;
+    reg {clk};
+    reg {rst};{declarations}
     
     // Clock generation
-    always #5 clk = ~clk;
+    always #{half_period} {clk} = ~{clk};
     
     // Test sequence
     initial begin
         $dumpfile("waves.vcd");
         $dumpvars(0, tb_{module_name});
         
-        clk = 0;
-        rst_n = 0;
+        {clk} = 0;
+        {rst} = {asserted};
         
-        #20 rst_n = 1;
+        #20 {rst} = {released};
         
-        // Add test cases here
+        // Add test cases here{register_notes}
         
         #100 $finish;
     end
     
     // Instantiate DUT
-    {module_name} dut (
-        .clk(clk),
-        .rst_n(rst_n)
-        // Connect other ports
+    {module_name} dut ({connections}
     );
     
 endmodule
@@ -12,7 +12,8 @@ import os
 import re
 import json
 import yaml
-from typing import Dict, List, Any, Optional, Union
+import codecs
+from typing import IO, Dict, Iterator, List, Any, Optional, Tuple, Union
 from pathlib import Path
 
 # Version and module info
@@ -20,6 +21,8 @@ __version__ = "1.0.0"
 
 # Export main utilities
 from .file_parser import FileParser, parse_specification, parse_requirements
+from .spec_ir import SpecIR, extract_spec_ir
+from .verilog_parser import VerilogAST, parse_verilog
 from .prompts import (
     PromptManager,
     RTLCreationPrompts,
@@ -36,6 +39,10 @@ __all__ = [
     "FileParser",
     "parse_specification", 
     "parse_requirements",
+    "SpecIR",
+    "extract_spec_ir",
+    "VerilogAST",
+    "parse_verilog",
     
     # Prompt management
     "PromptManager",
@@ -57,21 +64,148 @@ __all__ = [
     "extract_ports_from_rtl",
     "validate_verilog_syntax",
     "calculate_pp_metrics",
-    "create_project_structure"
+    "estimate_pp_metrics",
+    "create_project_structure",
+    "analyze_specification"
 ]
 
 # Text processing utilities
+_WORD = re.compile(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b')
+_HORIZONTAL_WHITESPACE = re.compile(r'[ \t]+')
+
+# Size of the pieces read from file handles and bytes-like sources
+STREAM_CHUNK_SIZE = 1 << 20
+
+# A specification: text, a text or binary file handle, or a bytes-like object
+SpecSource = Union[str, bytes, bytearray, memoryview, IO]
+
 class TextProcessor:
     """Text processing and normalization utilities"""
     
+    # Common VLSI and digital design terms
+    VLSI_TERMS = frozenset({
+        'module', 'interface', 'protocol', 'clock', 'reset', 'register',
+        'signal', 'input', 'output', 'wire', 'reg', 'parameter', 'localparam',
+        'always', 'assign', 'posedge', 'negedge', 'begin', 'end', 'if', 'else',
+        'case', 'default', 'function', 'task', 'generate', 'for', 'while',
+        'axi', 'ahb', 'apb', 'uart', 'spi', 'i2c', 'pcie', 'ethernet',
+        'fsm', 'state', 'transition', 'counter', 'fifo', 'memory', 'cache',
+        'synthesis', 'timing', 'area', 'power', 'performance', 'frequency',
+        'synchronizer', 'arbiter', 'decoder', 'encoder', 'multiplexer', 'adder'
+    })
+    STOP_WORDS = frozenset({'the', 'and', 'for', 'with', 'this', 'that'})
+    
+    @staticmethod
+    def iter_chunks(source: SpecSource, chunk_size: int = STREAM_CHUNK_SIZE, encoding: str = 'utf-8') -> Iterator[str]:
+        """
+        Read a specification as a sequence of text chunks
+        
+        Bytes are decoded incrementally, so a multi-byte character split
+        across chunks is handled and at most one chunk is held at a time.
+        
+        Args:
+            source: Text, bytes-like object, or text/binary file handle
+            chunk_size: Bytes or characters per chunk
+            encoding: Encoding of byte sources (undecodable bytes are replaced)
+            
+        Yields:
+            Text chunks in order
+        """
+        if isinstance(source, str):
+            yield source
+            return
+        
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            view = memoryview(source).cast('B')
+            reads = (view[offset:offset + chunk_size] for offset in range(0, len(view), chunk_size))
+        elif isinstance(source.read(0), str):
+            yield from iter(lambda: source.read(chunk_size), '')
+            return
+        else:
+            reads = iter(lambda: source.read(chunk_size), b'')
+        
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        for block in reads:
+            text = decoder.decode(block)
+            if text:
+                yield text
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+    
     @staticmethod
-    def normalize_specification(text: str) -> str:
+    def iter_lines(source: SpecSource, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+        """
+        Stream the lines of a specification
+        
+        Yields exactly the items of text.split('\\n') without building the
+        list, so line endings other than '\\n' are left on the lines.
+        
+        Args:
+            source: Text, bytes-like object, or text/binary file handle
+            chunk_size: Bytes or characters read at a time
+            
+        Yields:
+            Lines without their trailing newline
+        """
+        pending = []
+        for chunk in TextProcessor.iter_chunks(source, chunk_size):
+            start = 0
+            end = chunk.find('\n')
+            while end >= 0:
+                if pending:
+                    pending.append(chunk[start:end])
+                    yield ''.join(pending)
+                    pending = []
+                else:
+                    yield chunk[start:end]
+                start = end + 1
+                end = chunk.find('\n', start)
+            if start < len(chunk):
+                pending.append(chunk[start:])
+        yield ''.join(pending)
+    
+    @staticmethod
+    def iter_normalized_lines(source: SpecSource) -> Iterator[str]:
+        """
+        Stream the lines of the normalized specification
+        
+        Joining the result with '\\n' gives normalize_specification(text).
+        
+        Args:
+            source: Text, bytes-like object, or text/binary file handle
+            
+        Yields:
+            Normalized lines
+        """
+        started = False
+        blank_pending = False
+        for raw_line in TextProcessor.iter_lines(source):
+            # '\r\n' and lone '\r' both end a line
+            parts = raw_line.split('\r')
+            if len(parts) > 1 and not parts[-1]:
+                parts.pop()
+            for part in parts:
+                if '\t' in part or '  ' in part:
+                    part = _HORIZONTAL_WHITESPACE.sub(' ', part)
+                line = part.strip()
+                if not line:
+                    blank_pending = started
+                    continue
+                if blank_pending:
+                    yield ''
+                    blank_pending = False
+                started = True
+                yield line
+    
+    @staticmethod
+    def normalize_specification(text: SpecSource) -> str:
         """
         Normalize specification text by removing extra whitespace,
         standardizing formatting, and cleaning up common issues.
         
         Args:
-            text: Raw specification text
+            text: Raw specification text, bytes-like object or file handle
             
         Returns:
             Normalized specification text
@@ -79,17 +213,16 @@ class TextProcessor:
         if not text:
             return ""
         
-        # Remove extra whitespace and normalize line endings
-        text = re.sub(r'\r\n', '\n', text)  # Windows to Unix
-        text = re.sub(r'\r', '\n', text)    # Old Mac to Unix
-        text = re.sub(r'\n\s*\n', '\n\n', text)  # Multiple blank lines to one
-        text = re.sub(r'[ \t]+', ' ', text)  # Multiple spaces/tabs to one
-        
-        # Remove leading/trailing whitespace from each line
-        lines = [line.strip() for line in text.split('\n')]
-        text = '\n'.join(lines)
-        
-        return text.strip()
+        return '\n'.join(TextProcessor.iter_normalized_lines(text))
+    
+    @staticmethod
+    def _add_keywords(text: str, keywords: set, min_length: int = 3):
+        """Add the VLSI keywords found in text to keywords"""
+        for word in _WORD.findall(text.lower()):
+            if (len(word) >= min_length and 
+                word not in TextProcessor.STOP_WORDS and
+                (word in TextProcessor.VLSI_TERMS or word.endswith(('tor', 'ter', 'der', 'ser')))):
+                keywords.add(word)
     
     @staticmethod
     def extract_keywords(text: str, min_length: int = 3) -> List[str]:
@@ -103,82 +236,127 @@ class TextProcessor:
         Returns:
             List of extracted keywords
         """
-        # Common VLSI and digital design terms
-        vlsi_terms = {
-            'module', 'interface', 'protocol', 'clock', 'reset', 'register',
-            'signal', 'input', 'output', 'wire', 'reg', 'parameter', 'localparam',
-            'always', 'assign', 'posedge', 'negedge', 'begin', 'end', 'if', 'else',
-            'case', 'default', 'function', 'task', 'generate', 'for', 'while',
-            'axi', 'ahb', 'apb', 'uart', 'spi', 'i2c', 'pcie', 'ethernet',
-            'fsm', 'state', 'transition', 'counter', 'fifo', 'memory', 'cache',
-            'synthesis', 'timing', 'area', 'power', 'performance', 'frequency',
-            'synchronizer', 'arbiter', 'decoder', 'encoder', 'multiplexer', 'adder'
-        }
-        
-        # Extract words (alphanumeric with underscores)
-        words = re.findall(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', text.lower())
-        
-        # Filter by length and relevance
-        keywords = []
-        for word in words:
-            if (len(word) >= min_length and 
-                word not in {'the', 'and', 'for', 'with', 'this', 'that'} and
-                (word in vlsi_terms or word.endswith(('tor', 'ter', 'der', 'ser')))):
-                keywords.append(word)
-        
-        return list(set(keywords))  # Remove duplicates
+        keywords = set()
+        TextProcessor._add_keywords(text, keywords, min_length)
+        return list(keywords)
+    
+    @staticmethod
+    def _is_section_header(line: str) -> bool:
+        """Detect section headers (lines with colons or all caps)"""
+        stripped = line.strip()
+        return (':' in line and len(stripped) < 100) or stripped.isupper()
     
     @staticmethod
-    def split_into_sections(text: str) -> Dict[str, str]:
+    def _section_name(line: str) -> str:
+        return line.strip().lower().replace(':', '').replace(' ', '_')
+    
+    @staticmethod
+    def iter_sections(source: SpecSource) -> Iterator[Tuple[str, str]]:
         """
-        Split specification text into logical sections
+        Stream the logical sections of a specification
+        
+        Only the section being read is buffered. Names can repeat;
+        split_into_sections keeps the last content for each name.
         
         Args:
-            text: Specification text
+            source: Text, bytes-like object, or text/binary file handle
             
-        Returns:
-            Dictionary of section names to content
+        Yields:
+            (section name, content) pairs in document order
         """
-        sections = {}
         current_section = "general"
         current_content = []
         
-        lines = text.split('\n')
-        for line in lines:
-            # Detect section headers (lines with colons or all caps)
-            if (':' in line and len(line.strip()) < 100) or line.strip().isupper():
-                # Save previous section
+        for line in TextProcessor.iter_lines(source):
+            if TextProcessor._is_section_header(line):
                 if current_content:
-                    sections[current_section] = '\n'.join(current_content).strip()
+                    yield current_section, '\n'.join(current_content).strip()
                     current_content = []
-                
-                # Start new section
-                current_section = line.strip().lower().replace(':', '').replace(' ', '_')
+                current_section = TextProcessor._section_name(line)
             else:
                 current_content.append(line)
         
-        # Add the last section
         if current_content:
-            sections[current_section] = '\n'.join(current_content).strip()
+            yield current_section, '\n'.join(current_content).strip()
+    
+    @staticmethod
+    def split_into_sections(text: SpecSource) -> Dict[str, str]:
+        """
+        Split specification text into logical sections
         
-        return sections
+        Args:
+            text: Specification text, bytes-like object or file handle
+            
+        Returns:
+            Dictionary of section names to content
+        """
+        return dict(TextProcessor.iter_sections(text))
     
     @staticmethod
-    def estimate_complexity(text: str) -> Dict[str, Any]:
+    def estimate_complexity(text: SpecSource) -> Dict[str, Any]:
         """
         Estimate the complexity of a specification
         
+        All metrics are gathered in one pass over the lines, so memory use
+        does not grow with the size of the document. analyze_specification
+        feeds the same counter from the spec IR's pass instead.
+        
         Args:
-            text: Specification text
+            text: Specification text, bytes-like object or file handle
             
         Returns:
             Complexity metrics
         """
-        # Basic metrics
-        word_count = len(text.split())
-        line_count = len(text.split('\n'))
-        section_count = len(TextProcessor.split_into_sections(text))
-        keyword_count = len(TextProcessor.extract_keywords(text))
+        counter = _ComplexityCounter()
+        for line in TextProcessor.iter_lines(text):
+            counter.feed(line)
+        return counter.result()
+
+class _ComplexityCounter:
+    """Per-line state of TextProcessor.estimate_complexity"""
+    
+    def __init__(self):
+        self.word_count = 0
+        self.line_count = 0
+        self.sections = set()
+        self.current_section = "general"
+        self.section_has_content = False
+        self.keywords = set()
+        # Words and keywords are counted over batches of lines to keep the
+        # per-line overhead down; a batch never splits a line
+        self.batch = []
+        self.batch_chars = 0
+    
+    def _flush(self):
+        joined = '\n'.join(self.batch)
+        self.word_count += len(joined.split())
+        TextProcessor._add_keywords(joined, self.keywords)
+        self.batch = []
+        self.batch_chars = 0
+    
+    def feed(self, line: str):
+        self.line_count += 1
+        self.batch.append(line)
+        self.batch_chars += len(line)
+        if self.batch_chars >= STREAM_CHUNK_SIZE // 16:
+            self._flush()
+        if TextProcessor._is_section_header(line):
+            if self.section_has_content:
+                self.sections.add(self.current_section)
+                self.section_has_content = False
+            self.current_section = TextProcessor._section_name(line)
+        else:
+            self.section_has_content = True
+    
+    def result(self) -> Dict[str, Any]:
+        if self.section_has_content:
+            self.sections.add(self.current_section)
+        if self.batch:
+            self._flush()
+        
+        word_count = self.word_count
+        section_count = len(self.sections)
+        keyword_count = len(self.keywords)
         
         # Complexity heuristics
         complexity_score = (
@@ -199,7 +377,7 @@ class TextProcessor:
         
         return {
             "word_count": word_count,
-            "line_count": line_count,
+            "line_count": self.line_count,
             "section_count": section_count,
             "keyword_count": keyword_count,
             "complexity_score": round(complexity_score, 2),
@@ -207,6 +385,14 @@ class TextProcessor:
         }
 
 # Code formatting utilities
+_PORT_GROUPS = {"input": "inputs", "output": "outputs", "inout": "inouts"}
+
+def _verilog_ast(code: Union[str, VerilogAST]) -> VerilogAST:
+    """Parse RTL code unless it already is a parsed AST"""
+    if isinstance(code, VerilogAST):
+        return code
+    return parse_verilog(code)
+
 class CodeFormatter:
     """Utilities for formatting and analyzing RTL code"""
     
@@ -272,55 +458,46 @@ class CodeFormatter:
         return '\n'.join(formatted_lines)
     
     @staticmethod
-    def extract_module_ports(code: str) -> Dict[str, List[Dict[str, str]]]:
+    def extract_module_ports(code: Union[str, VerilogAST]) -> Dict[str, List[Dict[str, str]]]:
         """
         Extract port declarations from Verilog module
         
         Args:
-            code: Verilog module code
+            code: Verilog module code, or its parsed AST
             
         Returns:
-            Dictionary with input, output, and inout ports
+            Dictionary with input, output, and inout ports of the top-level
+            module(s) in the code
         """
+        ast = _verilog_ast(code)
         ports = {
             "inputs": [],
             "outputs": [],
             "inouts": []
         }
         
-        # Simple regex pattern for port extraction (basic implementation)
-        port_pattern = r'(input|output|inout)\s+(wire|reg)?\s*(\[.*?\])?\s*(\w+)'
-        
-        matches = re.finditer(port_pattern, code, re.IGNORECASE)
-        for match in matches:
-            port_type = match.group(1).lower()
-            data_type = match.group(2) or "wire"
-            width = match.group(3) or ""
-            name = match.group(4)
-            
-            port_info = {
-                "name": name,
-                "type": data_type,
-                "width": width.strip('[] ') if width else "1",
-                "description": ""
-            }
-            
-            if port_type == "input":
-                ports["inputs"].append(port_info)
-            elif port_type == "output":
-                ports["outputs"].append(port_info)
-            elif port_type == "inout":
-                ports["inouts"].append(port_info)
+        for module in ast.top_modules():
+            for port in module.ports:
+                group = _PORT_GROUPS.get(port.direction)
+                if group is None:
+                    # Interface and ref ports have no net direction
+                    continue
+                ports[group].append({
+                    "name": port.name,
+                    "type": port.net_type or "wire",
+                    "width": port.width or "1",
+                    "description": port.description
+                })
         
         return ports
     
     @staticmethod
-    def count_code_metrics(code: str) -> Dict[str, int]:
+    def count_code_metrics(code: Union[str, VerilogAST]) -> Dict[str, int]:
         """
         Count basic code metrics
         
         Args:
-            code: RTL code to analyze
+            code: RTL code to analyze, or its parsed AST
             
         Returns:
             Dictionary of code metrics
@@ -328,26 +505,25 @@ class CodeFormatter:
         if not code:
             return {}
         
-        lines = code.split('\n')
-        total_lines = len(lines)
-        code_lines = len([line for line in lines if line.strip() and not line.strip().startswith('//')])
-        comment_lines = len([line for line in lines if line.strip().startswith('//')])
-        blank_lines = len([line for line in lines if not line.strip()])
+        ast = _verilog_ast(code)
+        metrics = {
+            "total_lines": ast.metrics["total_lines"],
+            "code_lines": ast.metrics["code_lines"],
+            "comment_lines": ast.metrics["comment_lines"],
+            "blank_lines": ast.metrics["blank_lines"],
+            "always_blocks": 0,
+            "assign_statements": 0,
+            "module_instances": 0,
+            "modules": len(ast.modules)
+        }
         
         # Count basic constructs
-        always_blocks = len(re.findall(r'\balways\b', code, re.IGNORECASE))
-        assign_statements = len(re.findall(r'\bassign\b', code, re.IGNORECASE))
-        module_instances = len(re.findall(r'\b\w+\s+\w+\s*\(', code))
+        for module in ast.modules:
+            metrics["always_blocks"] += sum(1 for process in module.processes if process.kind.startswith("always"))
+            metrics["assign_statements"] += len(module.assigns)
+            metrics["module_instances"] += len(module.instances)
         
-        return {
-            "total_lines": total_lines,
-            "code_lines": code_lines,
-            "comment_lines": comment_lines,
-            "blank_lines": blank_lines,
-            "always_blocks": always_blocks,
-            "assign_statements": assign_statements,
-            "module_instances": module_instances
-        }
+        return metrics
 
 # Specification validation
 class SpecificationValidator:
@@ -479,73 +655,46 @@ def generate_module_name(spec_text: str, prefix: str = "module") -> str:
     module_name = "_".join(name_parts)
     return f"{prefix}_{module_name}"
 
-def extract_ports_from_rtl(rtl_code: str) -> Dict[str, List[str]]:
+def extract_ports_from_rtl(rtl_code: Union[str, VerilogAST]) -> Dict[str, List[str]]:
     """
     Extract port names from RTL code
     
     Args:
-        rtl_code: RTL code to analyze
+        rtl_code: RTL code to analyze, or its parsed AST
         
     Returns:
         Dictionary of port lists by direction
     """
-    ports = {"inputs": [], "outputs": [], "inouts": []}
-    
-    # Simple pattern matching for port declarations
-    patterns = {
-        "inputs": r'\binput\s+(wire|reg)?\s*(\[.*?\])?\s*(\w+)',
-        "outputs": r'\boutput\s+(wire|reg)?\s*(\[.*?\])?\s*(\w+)',
-        "inouts": r'\binout\s+(wire|reg)?\s*(\[.*?\])?\s*(\w+)'
-    }
-    
-    for port_type, pattern in patterns.items():
-        matches = re.findall(pattern, rtl_code, re.IGNORECASE)
-        for match in matches:
-            port_name = match[2]  # Third group is the port name
-            ports[port_type].append(port_name)
-    
-    return ports
+    ports = CodeFormatter.extract_module_ports(rtl_code)
+    return {group: [port["name"] for port in entries] for group, entries in ports.items()}
 
-def validate_verilog_syntax(code: str) -> Dict[str, Any]:
+def validate_verilog_syntax(code: Union[str, VerilogAST]) -> Dict[str, Any]:
     """
-    Basic Verilog syntax validation
+    Verilog syntax validation
+    
+    Reports what the parser found: unbalanced blocks and brackets, missing
+    semicolons and endmodules, unterminated comments and strings, plus
+    warnings for X assignments and combinational self-loops.
     
     Args:
-        code: Verilog code to validate
+        code: Verilog code to validate, or its parsed AST
         
     Returns:
         Validation results
     """
+    ast = _verilog_ast(code)
     issues = []
     warnings = []
     
     # Check for basic structure
-    if "module" not in code:
+    if not ast.modules:
         issues.append("Missing module declaration")
     
-    if "endmodule" not in code:
-        issues.append("Missing endmodule statement")
-    
-    # Check for common syntax issues
-    if "always @" in code and "begin" not in code:
-        warnings.append("Always block may be missing begin/end")
-    
-    # Check for potential issues
-    if re.search(r'=\s*\'[bdh]?x', code, re.IGNORECASE):
-        warnings.append("Code contains unknown values (X) - ensure intentional")
-    
-    if "assign" in code and "=" in code:
-        # Check for potential combinational loops
-        lines = code.split('\n')
-        for i, line in enumerate(lines):
-            if "assign" in line and "=" in line:
-                # Simple check for self-assignment patterns
-                if re.search(r'assign\s+\w+\s*=\s*\w+', line):
-                    var_match = re.search(r'assign\s+(\w+)\s*=', line)
-                    if var_match:
-                        var_name = var_match.group(1)
-                        if re.search(r'=\s*[^=]*\b' + re.escape(var_name) + r'\b', line):
-                            warnings.append(f"Potential combinational loop with variable '{var_name}'")
+    for severity, line, message in ast.issues:
+        if severity == "error":
+            issues.append(f"Line {line}: {message}")
+        else:
+            warnings.append(f"Line {line}: {message}")
     
     return {
         "valid": len(issues) == 0,
@@ -553,18 +702,30 @@ def validate_verilog_syntax(code: str) -> Dict[str, Any]:
         "warnings": warnings
     }
 
-def calculate_pp_metrics(rtl_code: str) -> Dict[str, float]:
+def calculate_pp_metrics(rtl_code: Union[str, VerilogAST]) -> Dict[str, float]:
     """
     Calculate basic Power-Performance metrics estimate
     
     Args:
-        rtl_code: RTL code to analyze
+        rtl_code: RTL code to analyze, or its parsed AST
         
     Returns:
         Estimated PPA metrics
     """
-    metrics = CodeFormatter.count_code_metrics(rtl_code)
+    return estimate_pp_metrics(CodeFormatter.count_code_metrics(rtl_code))
+
+def estimate_pp_metrics(metrics: Dict[str, int]) -> Dict[str, float]:
+    """
+    Estimate Power-Performance metrics from construct counts
     
+    Args:
+        metrics: always_blocks, assign_statements and module_instances
+            counts, from count_code_metrics or flattened over a design
+            hierarchy
+        
+    Returns:
+        Estimated PPA metrics
+    """
     # Simple heuristic-based estimation
     complexity_score = (
         metrics.get("always_blocks", 0) * 2 +
@@ -585,6 +746,42 @@ def calculate_pp_metrics(rtl_code: str) -> Dict[str, float]:
                            "Medium" if complexity_score < 15 else "High"
     }
 
+def analyze_specification(file_content: str, file_type: str = "txt") -> Dict[str, Any]:
+    """
+    Parse a specification and add complexity analysis and validation
+    
+    Module-level so it can run in a worker process.
+    
+    The text is scanned once: the complexity counter is fed from the IR
+    extraction pass, and the flat interfaces/protocols/parameters fields
+    are read off the IR.
+    
+    Args:
+        file_content: Specification text
+        file_type: File extension
+        
+    Returns:
+        Parsed specification data with complexity_analysis, validation and
+        the structured IR under "structure"
+    """
+    counter = _ComplexityCounter()
+    spec_ir = extract_spec_ir(file_content, line_observer=counter.feed)
+    if not file_content or file_content.endswith('\n'):
+        # splitlines() drops the empty last line that estimate_complexity counts
+        counter.feed('')
+    
+    parsed_data = {
+        "raw_text": file_content,
+        "interfaces": [interface.name for interface in spec_ir.interfaces] + [port.name for port in spec_ir.ports],
+        "protocols": list(spec_ir.protocols),
+        "requirements": {},
+        "parameters": spec_ir.get_parameters(),
+        "structure": spec_ir.to_dict(),
+        "complexity_analysis": counter.result()
+    }
+    parsed_data["validation"] = SpecificationValidator.validate_specification_structure(parsed_data)
+    return parsed_data
+
 def create_project_structure(project_path: str) -> bool:
     """
     Create standard project directory structure
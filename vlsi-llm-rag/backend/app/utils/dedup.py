@@ -0,0 +1,113 @@
+"""
+Near-duplicate detection for knowledge base ingestion
+
+Vendor datasheets repeat the same boilerplate (legal notices, revision
+tables, page headers) on every page. SimHash fingerprints plus a banded
+LSH index let ingestion drop those repeats in roughly constant time per chunk.
+"""
+
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+
+SIMHASH_BITS = 64
+LSH_BANDS = 4
+_BAND_BITS = SIMHASH_BITS // LSH_BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9_]+')
+
+
+def _shingles(text: str, size: int = 3) -> List[str]:
+    """Word n-gram shingles of normalized text"""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) < size:
+        return [" ".join(tokens)] if tokens else []
+    return [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+
+def simhash(text: str) -> int:
+    """
+    Compute a 64-bit SimHash fingerprint of text
+
+    Args:
+        text: Text to fingerprint
+
+    Returns:
+        64-bit integer fingerprint; similar texts differ in few bits
+    """
+    weights = [0] * SIMHASH_BITS
+    for shingle in _shingles(text):
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "big")
+        for bit in range(SIMHASH_BITS):
+            if value >> bit & 1:
+                weights[bit] += 1
+            else:
+                weights[bit] -= 1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints"""
+    return (a ^ b).bit_count()
+
+
+class SimHashIndex:
+    """
+    Banded LSH index over SimHash fingerprints
+
+    The fingerprint is split into LSH_BANDS bands. Any two fingerprints within
+    a Hamming distance below LSH_BANDS share at least one identical band, so
+    only same-band bucket members need an exact distance check.
+    """
+
+    def __init__(self, threshold: int = 3):
+        if threshold >= LSH_BANDS:
+            raise ValueError(f"Threshold must be below {LSH_BANDS} for exact banded lookup")
+        self.threshold = threshold
+        self._buckets: Dict[Tuple[int, int], List[str]] = {}
+        self._fingerprints: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    @staticmethod
+    def _bands(fingerprint: int):
+        for band in range(LSH_BANDS):
+            yield band, (fingerprint >> (band * _BAND_BITS)) & _BAND_MASK
+
+    def add(self, item_id: str, fingerprint: int):
+        """Register a fingerprint under an item id"""
+        self._fingerprints[item_id] = fingerprint
+        for key in self._bands(fingerprint):
+            self._buckets.setdefault(key, []).append(item_id)
+
+    def find_duplicate(self, fingerprint: int) -> Optional[Tuple[str, int]]:
+        """
+        Find an indexed near-duplicate of a fingerprint
+
+        Args:
+            fingerprint: SimHash fingerprint to look up
+
+        Returns:
+            (item id, Hamming distance) of the closest match, or None
+        """
+        best = None
+        seen = set()
+        for key in self._bands(fingerprint):
+            for item_id in self._buckets.get(key, ()):
+                if item_id in seen:
+                    continue
+                seen.add(item_id)
+                distance = hamming_distance(fingerprint, self._fingerprints[item_id])
+                if distance <= self.threshold and (best is None or distance < best[1]):
+                    best = (item_id, distance)
+                    if distance == 0:
+                        return best
+        return best
@@ -1,70 +1,298 @@
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional
 import yaml
 import json
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# Bump whenever parse_specification (or analyze_specification) output changes;
+# cached parse results are keyed on it
+PARSER_VERSION = "3"
+
+PROTOCOL_KEYWORDS = ['AXI', 'AHB', 'APB', 'UART', 'SPI', 'I2C', 'PCIe', 'Ethernet']
+
+# Interface patterns in output order. Every pattern starts with a literal
+# keyword, so it only needs to be tried where that keyword occurs.
+_INTERFACE_PATTERNS = [
+    ('interface', re.compile(r'interface\s*:\s*(.+)', re.IGNORECASE)),
+    ('port', re.compile(r'port\s*:\s*(.+)', re.IGNORECASE)),
+    ('input', re.compile(r'input\s+(\w+\s*\w*)\s*,\s*output', re.IGNORECASE)),
+    ('output', re.compile(r'output\s+(\w+\s*\w*)\s*,\s*input', re.IGNORECASE)),
+]
+_KEYWORD_PATTERNS = {keyword: re.compile(keyword, re.IGNORECASE) for keyword, _ in _INTERFACE_PATTERNS}
+
+# Parameters are `key: value` / `key = value`; matching is anchored on the separator
+_PARAM_SEPARATOR = re.compile(r'[:=]')
+_PARAM_KEY = re.compile(r'(\w+)\s*\Z')
+_PARAM_VALUE = re.compile(r'\s*([^\n]+)')
+_PARAM_KEY_WINDOW = 64
+
+# libyaml's C loader is several times faster than the pure-Python one
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Lines a YAML requirements file is made of: `key: value`, `key:`, `- item`,
+# comments and document markers. Prose and markdown fail this check.
+_YAML_LINE = re.compile(r'\s*(?:#.*|-\s.*|-|---.*|\.\.\.|["\']?[\w .\-/]+["\']?\s*:(?:\s.*)?)\Z')
+_SNIFF_LINES = 20
+_BULLET = re.compile(r'\s*[-*+]\s+')
+
+_NUMBER = (int, float)
+# Known requirement keys and the types they may hold. Unknown keys are allowed.
+REQUIREMENTS_SCHEMA = {
+    "interface": (str,),
+    "protocol": (str,),
+    "data_width": (int,),
+    "address_width": (int,),
+    "clock_frequency": (str,) + _NUMBER,
+    "frequency": (str,) + _NUMBER,
+    "performance": (str, dict) + _NUMBER,
+    "power": (str, dict) + _NUMBER,
+    "power_optimization": (str,),
+    "area": (str, dict) + _NUMBER,
+    "target_technology": (str,),
+    "requirements": (list,),
+}
+# Fields of each entry of a requirements matrix (the "requirements" list)
+REQUIREMENT_ENTRY_SCHEMA = {
+    "id": (str, int),
+    "description": (str,),
+    "priority": (str, int),
+    "category": (str,),
+}
+_REQUIRED_ENTRY_FIELDS = ("id", "description")
+
+
+def _keyword_offsets(text: str, lowered: str, keyword: str) -> Iterator[int]:
+    """Offsets of a keyword in text, case-insensitively"""
+    if lowered is not None:
+        # ASCII text: the lowercase copy has the same offsets, and str.find
+        # scans it far faster than a case-insensitive regex
+        position = lowered.find(keyword)
+        while position != -1:
+            yield position
+            position = lowered.find(keyword, position + 1)
+    else:
+        # Unicode case folding can differ from str.lower(); let re decide
+        for match in _KEYWORD_PATTERNS[keyword].finditer(text):
+            yield match.start()
+
+
+def _find_interfaces(text: str, lowered: str) -> List[str]:
+    """
+    Interface matches, identical to re.findall of each pattern in turn
+
+    A pattern is only tried at offsets of its keyword; a match resumes the
+    search after its end, as findall does.
+    """
+    interfaces = []
+    for keyword, pattern in _INTERFACE_PATTERNS:
+        resume = 0
+        for position in _keyword_offsets(text, lowered, keyword):
+            if position < resume:
+                continue
+            match = pattern.match(text, position)
+            if match:
+                interfaces.append(match.group(1))
+                resume = match.end()
+    return interfaces
+
+
+def _find_parameters(text: str) -> Dict[str, str]:
+    r"""
+    Key-value pairs, identical to re.findall(r'(\w+)\s*[:=]\s*([^\n]+)')
+
+    Instead of trying the pattern at every offset, each ':' or '=' is
+    located and the key is read back from just before it.
+    """
+    parameters = {}
+    resume = 0
+    for separator in _PARAM_SEPARATOR.finditer(text):
+        position = separator.start()
+        if position < resume:
+            continue
+        window_start = max(resume, position - _PARAM_KEY_WINDOW)
+        key = _PARAM_KEY.search(text, window_start, position)
+        if key is None:
+            continue
+        if key.start() == window_start > resume and (text[window_start - 1].isalnum() or text[window_start - 1] == '_'):
+            # Key longer than the window
+            key = _PARAM_KEY.search(text, resume, position)
+        value = _PARAM_VALUE.match(text, position + 1)
+        if value is None:
+            continue
+        parameters[key.group(1).strip()] = value.group(1).strip()
+        resume = value.end()
+    return parameters
+
+
 class FileParser:
     @staticmethod
     def parse_specification(file_content: str, file_type: str = "txt") -> Dict[str, Any]:
-        """Parse specification file and extract structured information"""
+        """
+        Parse specification file and extract structured information
+
+        The document is lowercased once and keyword offsets are found with
+        plain substring scans; the interface and parameter regexes are only
+        evaluated at those offsets, so large specs are processed in linear
+        time with a few fast passes.
+        """
+        lowered = file_content.lower()
         
         parsed_data = {
             "raw_text": file_content,
-            "interfaces": [],
-            "protocols": [],
+            "interfaces": _find_interfaces(file_content, lowered if file_content.isascii() else None),
+            "protocols": [keyword for keyword in PROTOCOL_KEYWORDS if keyword.lower() in lowered],
             "requirements": {},
-            "parameters": {}
+            "parameters": _find_parameters(file_content)
         }
         
-        # Extract interfaces (looking for common patterns)
-        interface_patterns = [
-            r'interface\s*:\s*(.+)',
-            r'port\s*:\s*(.+)', 
-            r'input\s+(\w+\s*\w*)\s*,\s*output',
-            r'output\s+(\w+\s*\w*)\s*,\s*input'
-        ]
-        
-        for pattern in interface_patterns:
-            matches = re.findall(pattern, file_content, re.IGNORECASE)
-            parsed_data["interfaces"].extend(matches)
-        
-        # Extract protocols
-        protocol_keywords = ['AXI', 'AHB', 'APB', 'UART', 'SPI', 'I2C', 'PCIe', 'Ethernet']
-        for keyword in protocol_keywords:
-            if keyword.lower() in file_content.lower():
-                parsed_data["protocols"].append(keyword)
-        
-        # Extract parameters (looking for key-value pairs)
-        param_pattern = r'(\w+)\s*[:=]\s*([^\n]+)'
-        params = re.findall(param_pattern, file_content)
-        for key, value in params:
-            parsed_data["parameters"][key.strip()] = value.strip()
-        
         return parsed_data
     
     @staticmethod
-    def parse_requirements(file_content: str) -> Dict[str, Any]:
-        """Parse requirements file (YAML/JSON/Markdown)"""
-        
-        # Try YAML first
-        try:
-            return yaml.safe_load(file_content)
-        except:
-            pass
-        
-        # Try JSON
+    def detect_requirements_format(file_content: str, file_type: Optional[str] = None) -> str:
+        """
+        Decide how a requirements file should be loaded
+
+        Args:
+            file_content: Requirements file content
+            file_type: File extension, if known
+
+        Returns:
+            "json", "yaml" or "text"
+        """
+        file_type = (file_type or "").lower().lstrip('.')
+        if file_type == "json":
+            return "json"
+        if file_type in ("yaml", "yml"):
+            return "yaml"
+
+        head = file_content.lstrip('\ufeff \t\r\n')
+        if head[:1] in ('{', '['):
+            return "json"
+
+        # Only a prefix is inspected, so sniffing is constant time
+        significant = 0
+        for line in head[:8192].splitlines():
+            if not line.strip():
+                continue
+            if not _YAML_LINE.match(line):
+                return "text"
+            significant += 1
+            if significant >= _SNIFF_LINES:
+                break
+        return "yaml" if significant else "text"
+
+    @staticmethod
+    def validate_requirements_schema(requirements: Dict[str, Any]) -> List[str]:
+        """
+        Check requirements against REQUIREMENTS_SCHEMA
+
+        Args:
+            requirements: Loaded requirements
+
+        Returns:
+            List of schema violations (empty if valid)
+        """
+        errors = []
+        for key, allowed in REQUIREMENTS_SCHEMA.items():
+            value = requirements.get(key)
+            if value is not None and (not isinstance(value, allowed) or isinstance(value, bool)):
+                expected = " or ".join(t.__name__ for t in allowed)
+                errors.append(f"'{key}' must be {expected}, got {type(value).__name__}")
+
+        for index, entry in enumerate(requirements.get("requirements") or []):
+            if not isinstance(entry, dict):
+                errors.append(f"requirements[{index}] must be a mapping")
+                continue
+            for field in _REQUIRED_ENTRY_FIELDS:
+                if entry.get(field) in (None, ""):
+                    errors.append(f"requirements[{index}] is missing '{field}'")
+            for field, allowed in REQUIREMENT_ENTRY_SCHEMA.items():
+                value = entry.get(field)
+                if value is not None and not isinstance(value, allowed):
+                    expected = " or ".join(t.__name__ for t in allowed)
+                    errors.append(f"requirements[{index}].{field} must be {expected}")
+        return errors
+
+    @staticmethod
+    def parse_requirements(file_content: str, file_type: Optional[str] = None, validate: bool = True) -> Dict[str, Any]:
+        """
+        Parse requirements file (YAML/JSON/Markdown)
+
+        The format is sniffed up front so each file goes straight to one
+        loader: orjson (when installed) for JSON, libyaml's CSafeLoader for
+        YAML, and `key: value` line parsing for anything else. A top-level
+        list is treated as a requirements matrix.
+
+        Only files whose extension names the format are held to it. When the
+        format was sniffed, content that fails to load or does not fit the
+        schema (prose with extra colons, markdown bullet lists, values such
+        as "32 bits") is read with the `key: value` parser instead.
+
+        Args:
+            file_content: Requirements file content
+            file_type: File extension, if known
+            validate: Check the result against REQUIREMENTS_SCHEMA
+
+        Returns:
+            Requirements dictionary
+
+        Raises:
+            ValueError: If a .json/.yaml/.yml file is malformed or violates the schema
+        """
+        file_format = FileParser.detect_requirements_format(file_content, file_type)
+        sniffed = (file_type or "").lower().lstrip('.') not in ("json", "yaml", "yml")
+
+        if file_format == "text":
+            return FileParser._parse_requirement_lines(file_content)
+
         try:
-            return json.loads(file_content)
-        except:
-            pass
-        
-        # Fallback to text parsing
+            if file_format == "json":
+                try:
+                    data = _json_loads(file_content)
+                except ValueError:
+                    # Flow-style YAML such as {a: 1} looks like JSON
+                    file_format = "yaml"
+            if file_format == "yaml":
+                data = yaml.load(file_content, Loader=_YAML_LOADER)
+        except (ValueError, yaml.YAMLError) as e:
+            if sniffed:
+                return FileParser._parse_requirement_lines(file_content)
+            raise ValueError(f"Invalid {file_format.upper()} requirements: {str(e)}")
+
+        if data is None:
+            data = {}
+        elif isinstance(data, list):
+            data = {"requirements": data}
+        elif not isinstance(data, dict):
+            if sniffed:
+                return FileParser._parse_requirement_lines(file_content)
+            raise ValueError(f"Requirements must be a mapping, got {type(data).__name__}")
+
+        if validate or sniffed:
+            errors = FileParser.validate_requirements_schema(data)
+            if errors:
+                if sniffed:
+                    return FileParser._parse_requirement_lines(file_content)
+                raise ValueError(f"Invalid requirements: {'; '.join(errors[:10])}")
+        return data
+
+    @staticmethod
+    def _parse_requirement_lines(file_content: str) -> Dict[str, Any]:
+        """Parse `key: value` lines, ignoring markdown bullet markers"""
         requirements = {}
-        lines = file_content.split('\n')
-        
-        for line in lines:
+        for line in file_content.split('\n'):
             if ':' in line:
-                key, value = line.split(':', 1)
+                bullet = _BULLET.match(line)
+                key, value = line[bullet.end() if bullet else 0:].split(':', 1)
                 requirements[key.strip()] = value.strip()
-        
         return requirements
+
+
+# Module-level shortcuts
+parse_specification = FileParser.parse_specification
+parse_requirements = FileParser.parse_requirements
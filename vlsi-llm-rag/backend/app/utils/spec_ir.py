@@ -0,0 +1,702 @@
+"""
+Typed specification IR
+
+extract_spec_ir() reads a specification once, line by line, and builds a
+compact structured view of it: interfaces, ports, register maps (from
+markdown tables, `NAME @ 0x..` or `Address 0x..: Name` lines with `Bit n:`
+fields, or bullet lists under a "Registers:" label), parameters, clocks
+and resets.
+Later stages (prompt building, testbench generation) work from the IR
+instead of re-parsing the raw text.
+
+Records use __slots__ and serialize to nested tuples, so an IR round-trips
+through marshal into a small binary blob for the parse cache. marshal is
+only used for the local cache, never for data received from clients.
+"""
+
+import marshal
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .file_parser import PROTOCOL_KEYWORDS
+
+# Bump whenever extraction or the record layout changes
+IR_VERSION = 2
+
+
+class _Record:
+    """Base for IR records: equality, repr and tuple/dict conversion from __slots__"""
+
+    __slots__ = ()
+
+    def to_tuple(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def from_tuple(cls, values: tuple):
+        return cls(*values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self.to_tuple() == other.to_tuple()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Interface(_Record):
+    """A bus or interface named in the spec"""
+
+    __slots__ = ("name", "protocol")
+
+    def __init__(self, name: str, protocol: Optional[str] = None):
+        self.name = name
+        self.protocol = protocol
+
+
+class Port(_Record):
+    """A module port; width is an int, or the range text when it is symbolic"""
+
+    __slots__ = ("name", "direction", "width", "description")
+
+    def __init__(self, name: str, direction: str = "", width: Any = 1, description: str = ""):
+        self.name = name
+        self.direction = direction
+        self.width = width
+        self.description = description
+
+
+class RegisterField(_Record):
+    """A bit field of a register"""
+
+    __slots__ = ("name", "bits", "access", "reset", "description")
+
+    def __init__(self, name: str, bits: str = "", access: str = "", reset: str = "", description: str = ""):
+        self.name = name
+        self.bits = bits
+        self.access = access
+        self.reset = reset
+        self.description = description
+
+
+class Register(_Record):
+    """A register map entry; offset is None when the spec lists the register without an address"""
+
+    __slots__ = ("name", "offset", "access", "reset", "description", "fields")
+
+    def __init__(self, name: str, offset: Optional[int], access: str = "", reset: str = "",
+                 description: str = "", fields: List[RegisterField] = None):
+        self.name = name
+        self.offset = offset
+        self.access = access
+        self.reset = reset
+        self.description = description
+        self.fields = fields or []
+
+    def to_tuple(self) -> tuple:
+        return (self.name, self.offset, self.access, self.reset, self.description,
+                tuple(field.to_tuple() for field in self.fields))
+
+    @classmethod
+    def from_tuple(cls, values: tuple):
+        *head, fields = values
+        return cls(*head, fields=[RegisterField.from_tuple(field) for field in fields])
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data["fields"] = [field.to_dict() for field in self.fields]
+        return data
+
+
+class Parameter(_Record):
+    """A named scalar setting such as DATA_WIDTH: 32"""
+
+    __slots__ = ("name", "value")
+
+    def __init__(self, name: str, value: str):
+        self.name = name
+        self.value = value
+
+
+class Clock(_Record):
+    """A clock and its frequency in Hz when stated"""
+
+    __slots__ = ("name", "frequency_hz")
+
+    def __init__(self, name: str, frequency_hz: Optional[float] = None):
+        self.name = name
+        self.frequency_hz = frequency_hz
+
+
+class Reset(_Record):
+    """A reset; active_low and synchronous are None when the spec does not say"""
+
+    __slots__ = ("name", "active_low", "synchronous")
+
+    def __init__(self, name: str, active_low: Optional[bool] = None, synchronous: Optional[bool] = None):
+        self.name = name
+        self.active_low = active_low
+        self.synchronous = synchronous
+
+
+class SpecIR(_Record):
+    """Structured view of a specification"""
+
+    __slots__ = ("title", "sections", "protocols", "interfaces", "ports",
+                 "registers", "parameters", "clocks", "resets")
+
+    _LISTS = (
+        ("interfaces", Interface), ("ports", Port), ("registers", Register),
+        ("parameters", Parameter), ("clocks", Clock), ("resets", Reset),
+    )
+
+    def __init__(self, title: str = "", sections: List[str] = None, protocols: List[str] = None,
+                 interfaces: List[Interface] = None, ports: List[Port] = None,
+                 registers: List[Register] = None, parameters: List[Parameter] = None,
+                 clocks: List[Clock] = None, resets: List[Reset] = None):
+        self.title = title
+        self.sections = sections or []
+        self.protocols = protocols or []
+        self.interfaces = interfaces or []
+        self.ports = ports or []
+        self.registers = registers or []
+        self.parameters = parameters or []
+        self.clocks = clocks or []
+        self.resets = resets or []
+
+    def to_tuple(self) -> tuple:
+        return (self.title, tuple(self.sections), tuple(self.protocols)) + tuple(
+            tuple(item.to_tuple() for item in getattr(self, name)) for name, _ in self._LISTS
+        )
+
+    @classmethod
+    def from_tuple(cls, values: tuple):
+        title, sections, protocols = values[:3]
+        lists = {
+            name: [record.from_tuple(item) for item in items]
+            for (name, record), items in zip(cls._LISTS, values[3:])
+        }
+        return cls(title, list(sections), list(protocols), **lists)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"title": self.title, "sections": list(self.sections), "protocols": list(self.protocols)}
+        for name, _ in self._LISTS:
+            data[name] = [item.to_dict() for item in getattr(self, name)]
+        return data
+
+    def get_parameters(self) -> Dict[str, str]:
+        return {parameter.name: parameter.value for parameter in self.parameters}
+
+    def summary(self, max_items: int = 32) -> str:
+        """
+        Render the IR as compact text for LLM prompts
+
+        Args:
+            max_items: Cap on entries listed per category
+
+        Returns:
+            One line per non-empty category
+        """
+        lines = []
+        if self.protocols:
+            lines.append(f"Protocols: {', '.join(self.protocols)}")
+        if self.interfaces:
+            lines.append("Interfaces: " + ", ".join(
+                f"{i.name} ({i.protocol})" if i.protocol else i.name for i in self.interfaces[:max_items]
+            ))
+        if self.clocks:
+            lines.append("Clocks: " + ", ".join(
+                f"{c.name} {_format_frequency(c.frequency_hz)}".strip() for c in self.clocks[:max_items]
+            ))
+        if self.resets:
+            lines.append("Resets: " + ", ".join(_describe_reset(r) for r in self.resets[:max_items]))
+        if self.ports:
+            lines.append("Ports: " + ", ".join(
+                " ".join(part for part in (p.direction, _format_width(p.width), p.name) if part)
+                for p in self.ports[:max_items]
+            ))
+        if self.parameters:
+            lines.append("Parameters: " + ", ".join(
+                f"{p.name}={p.value}" for p in self.parameters[:max_items]
+            ))
+        for register in self.registers[:max_items]:
+            details = ", ".join(part for part in (register.access, f"reset {register.reset}" if register.reset else "") if part)
+            line = f"Register {register.name}{_format_offset(register.offset)}" + (f" ({details})" if details else "")
+            if register.fields:
+                line += ": " + ", ".join(
+                    f"{field.name}[{field.bits}]" if field.bits else field.name for field in register.fields
+                )
+            lines.append(line)
+        return "\n".join(lines)
+
+
+def dumps(ir: SpecIR) -> bytes:
+    """Serialize an IR to bytes for the parse cache"""
+    return marshal.dumps((IR_VERSION, ir.to_tuple()))
+
+
+def loads(data: bytes) -> Optional[SpecIR]:
+    """Deserialize an IR written by dumps, or None if it is from another IR_VERSION"""
+    version, values = marshal.loads(data)
+    if version != IR_VERSION:
+        return None
+    return SpecIR.from_tuple(values)
+
+
+def _format_frequency(frequency_hz: Optional[float]) -> str:
+    if not frequency_hz:
+        return ""
+    for unit, scale in (("GHz", 1e9), ("MHz", 1e6), ("kHz", 1e3)):
+        if frequency_hz >= scale:
+            return f"{frequency_hz / scale:g} {unit}"
+    return f"{frequency_hz:g} Hz"
+
+
+def _format_offset(offset: Optional[int]) -> str:
+    return f" @ 0x{offset:X}" if offset is not None else ""
+
+
+def _format_width(width: Any) -> str:
+    if width == 1 or width in ("", None):
+        return ""
+    if isinstance(width, int):
+        return f"[{width - 1}:0]"
+    return f"[{width}]"
+
+
+def _describe_reset(reset: Reset) -> str:
+    traits = []
+    if reset.active_low is not None:
+        traits.append("active-low" if reset.active_low else "active-high")
+    if reset.synchronous is not None:
+        traits.append("synchronous" if reset.synchronous else "asynchronous")
+    return f"{reset.name} ({', '.join(traits)})" if traits else reset.name
+
+
+# Line classifiers. Each is only tried on lines that pass a cheap substring check.
+_HEADING = re.compile(r'^\s{0,3}(?:#{1,6}\s+|(?:\d+\.)+\d*\s+(?=[A-Z]))(.+?)\s*#*\s*$')
+_TABLE_SEPARATOR = re.compile(r'^\s*\|?\s*:?-{3,}:?\s*(?:\|\s*:?-{3,}:?\s*)*\|?\s*$')
+_INTERFACE = re.compile(r'^\s*[-*]?\s*interface\s*:\s*(.+?)\s*$', re.IGNORECASE)
+_PORT_DECLARATION = re.compile(
+    r'(?:^|[,(;])\s*[-*]?\s*(input|output|inout)\s+(?:(?:wire|reg|logic|signed)\s+)*'
+    r'(\[[^\]]+\]\s*)?([A-Za-z_]\w*)',
+    re.IGNORECASE
+)
+_PORT_LINE = re.compile(r'^\s*[-*]?\s*port\s*:\s*([A-Za-z_]\w*)\s*(\[[^\]]+\])?', re.IGNORECASE)
+_REGISTER_NAME_FIRST = re.compile(
+    r'^\s*[-*]?\s*(?:register\s+)?([A-Za-z_]\w*)\s*(?:@|\bat\s+(?:offset\s+)?|\boffset\s+)\s*(0x[0-9A-Fa-f_]+)\b',
+    re.IGNORECASE
+)
+_REGISTER_OFFSET_FIRST = re.compile(r'^\s*[-*]?\s*(0x[0-9A-Fa-f_]+)\s*[:|\-]?\s+([A-Z][A-Z0-9_]*)\b')
+_REGISTER_ADDRESS_FIRST = re.compile(
+    r'^\s*[-*]?\s*(?:address|addr|offset)\s+(0x[0-9A-Fa-f_]+)\s*[:|\-]\s*(.+?)\s*$', re.IGNORECASE
+)
+_REGISTER_FIELD = re.compile(r'^\s*[-*]?\s*bits?\s+(\d+(?:\s*:\s*\d+)?)\s*[:\-]\s*(.+?)\s*$', re.IGNORECASE)
+_REGISTER_ITEM = re.compile(r'^\s*[-*]\s*(.+?)\s*$')
+_PARENTHESIZED = re.compile(r'\(\s*([A-Za-z_][\w/]*)\s*\)')
+_LABEL = re.compile(r'^\s*([A-Za-z][\w /&-]*?)\s*:\s*$')
+_BULLET_INTERFACE = re.compile(r'^\s*[-*]\s*(.*\binterface\b.*?)\s*$', re.IGNORECASE)
+_ACCESS = re.compile(r'\b(RW|RO|WO|W1C|W1S|RC|R/W|R/O|W/O)\b')
+_RESET_VALUE = re.compile(r'\breset(?:\s+value)?\s*[:=]?\s*(0x[0-9A-Fa-f_]+|\d+\'[bhdoBHDO][0-9A-Fa-f_xzXZ]+|\d+)\b', re.IGNORECASE)
+_PARAMETER = re.compile(r'^\s*[-*]?\s*(?:parameter\s+|localparam\s+)?([A-Za-z_]\w*)\s*[:=]\s*(.+?)\s*[;,]?\s*$')
+_SCALAR = re.compile(
+    r'^(?:[-+]?\d+(?:\.\d+)?\s*[A-Za-z%]{0,4}|0x[0-9A-Fa-f_]+|\d+\'[bhdoBHDO][0-9A-Fa-f_xzXZ]+'
+    r'|true|false|yes|no|[A-Za-z_][\w.\-]*|"[^"]*")$',
+    re.IGNORECASE
+)
+_FREQUENCY = re.compile(r'(\d+(?:\.\d+)?)\s*(GHz|MHz|kHz|Hz)\b', re.IGNORECASE)
+_CLOCK_NAME = re.compile(r'\b([A-Za-z_]\w*clk\w*|clk\w*|[A-Za-z_]\w*_clock\w*|clock_\w+)\b', re.IGNORECASE)
+_RESET_NAME = re.compile(r'\b([A-Za-z_]\w*_(?:rst|reset)\w*|(?:rst|reset)_\w+|rst\w*|resetn|reset_n)\b', re.IGNORECASE)
+_FREQUENCY_SCALE = {"ghz": 1e9, "mhz": 1e6, "khz": 1e3, "hz": 1.0}
+_NON_PARAMETER_KEYS = {"interface", "port", "note", "example", "description", "see", "http", "https"}
+
+
+def _parse_int(text: str) -> Optional[int]:
+    text = text.strip().replace("_", "")
+    try:
+        return int(text, 16) if text.lower().startswith("0x") else int(text)
+    except ValueError:
+        return None
+
+
+def _parse_width(range_text: Optional[str]) -> Any:
+    """[31:0] -> 32; symbolic ranges are kept as text"""
+    if not range_text:
+        return 1
+    inner = range_text.strip()[1:-1].strip()
+    bounds = inner.split(":")
+    if len(bounds) == 2:
+        high, low = _parse_int(bounds[0]), _parse_int(bounds[1])
+        if high is not None and low is not None:
+            return abs(high - low) + 1
+    return inner
+
+
+def _parse_width_cell(text: str) -> Any:
+    """Width column of a ports table: "8", "7:0" or "[7:0]" -> 8; symbolic widths are kept as text"""
+    text = text.strip()
+    width = _parse_int(text)
+    if width is not None:
+        return width
+    if ":" in text:
+        return _parse_width(text if text.startswith("[") else f"[{text}]")
+    return text
+
+
+def _identifier(text: str) -> str:
+    """"Interrupt Enable" -> INTERRUPT_ENABLE; a trailing "Register" is dropped"""
+    words = re.findall(r'[A-Za-z0-9]+', text)
+    if len(words) > 1 and words[-1].lower() in ("register", "reg"):
+        words.pop()
+    return "_".join(words).upper()
+
+
+def _describe(text: str) -> Tuple[str, str, str]:
+    """
+    Split prose such as "Control Register (CTRL)" or "Data Register (RW)"
+    into a register name, an access type and the remaining description
+    """
+    name = access = ""
+    for match in _PARENTHESIZED.finditer(text):
+        token = match.group(1)
+        if _ACCESS.fullmatch(token.upper()):
+            access = access or token.upper()
+        elif not name and token.isupper():
+            name = token
+    description = _PARENTHESIZED.sub("", text).strip(" -:")
+    return name or _identifier(description), access, description
+
+
+def _split_row(line: str) -> List[str]:
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+def _table_kind(header: List[str]) -> Optional[str]:
+    columns = set(header)
+    if columns & {"offset", "address", "addr"} and columns & {"name", "register", "reg"}:
+        return "registers"
+    if columns & {"field", "bits", "bit"}:
+        return "fields"
+    if columns & {"direction", "dir"} and columns & {"name", "signal", "port"}:
+        return "ports"
+    if columns & {"parameter", "param"} or ("name" in columns and columns & {"value", "default"}):
+        return "parameters"
+    return None
+
+
+def _cell(row: Dict[str, str], *names: str) -> str:
+    for name in names:
+        if row.get(name):
+            return row[name]
+    return ""
+
+
+class _Extractor:
+    """Single-pass line scanner that fills a SpecIR"""
+
+    def __init__(self):
+        self.ir = SpecIR()
+        self._seen_ports = set()
+        self._seen_params = set()
+        self._clocks: Dict[str, Clock] = {}
+        self._resets: Dict[str, Reset] = {}
+        self._registers: Dict[str, Register] = {}
+        self._table_header: Optional[List[str]] = None
+        self._table_kind: Optional[str] = None
+        self._pending_header: Optional[List[str]] = None
+        # Label of the current "Registers:" style block, and the register
+        # the `Bit n:` lines right below an address line belong to
+        self._label = ""
+        self._field_target: Optional[Register] = None
+        # Traits of a reset the spec describes without naming it
+        self._unnamed_reset: Optional[List[Optional[bool]]] = None
+
+    def feed(self, line: str):
+        stripped = line.strip()
+        if not stripped:
+            self._table_header = self._pending_header = None
+            self._field_target = None
+            return
+
+        if stripped.startswith("|"):
+            self._table_line(stripped)
+            return
+        self._table_header = self._pending_header = None
+
+        if stripped[0] == "#" or stripped[0].isdigit():
+            heading = _HEADING.match(line)
+            if heading:
+                title = heading.group(1).strip()
+                self.ir.sections.append(title)
+                if not self.ir.title:
+                    self.ir.title = title
+                self._label = ""
+                self._field_target = None
+                return
+        if not self.ir.title:
+            self.ir.title = stripped[:120]
+
+        lowered = stripped.lower()
+        if stripped[-1] == ":":
+            label = _LABEL.match(stripped)
+            if label:
+                self._label = label.group(1).lower()
+                self._field_target = None
+                return
+        if self._field_target is not None and "bit" in lowered:
+            match = _REGISTER_FIELD.match(stripped)
+            if match:
+                self._add_field(match.group(1), match.group(2))
+                return
+        if stripped[0] in "-*" and "register" in self._label and "0x" not in lowered:
+            match = _REGISTER_ITEM.match(stripped)
+            if match:
+                name, access, description = _describe(match.group(1))
+                if name:
+                    self._add_register(name, None, access, "", description)
+                    return
+        if "interface" in lowered:
+            match = _INTERFACE.match(stripped)
+            if match:
+                self._add_interface(match.group(1))
+                return
+            match = _BULLET_INTERFACE.match(stripped)
+            if match and any(keyword.lower() in lowered for keyword in PROTOCOL_KEYWORDS):
+                self._add_interface(match.group(1))
+                return
+        if "put" in lowered:
+            for direction, range_text, name in _PORT_DECLARATION.findall(stripped):
+                self._add_port(name, direction.lower(), _parse_width(range_text))
+        if lowered.startswith(("port", "- port", "* port")):
+            match = _PORT_LINE.match(stripped)
+            if match:
+                self._add_port(match.group(1), "", _parse_width(match.group(2)))
+                return
+        if "0x" in lowered:
+            if self._register_line(stripped):
+                return
+        if "clk" in lowered or "clock" in lowered or "freq" in lowered:
+            self._clock_line(stripped)
+        if "rst" in lowered or "reset" in lowered:
+            self._reset_line(stripped, lowered)
+        if ":" in stripped or "=" in stripped:
+            match = _PARAMETER.match(stripped)
+            if match:
+                self._add_parameter(match.group(1), match.group(2))
+
+    def _table_line(self, line: str):
+        if _TABLE_SEPARATOR.match(line):
+            if self._pending_header is not None:
+                self._table_header = self._pending_header
+                self._table_kind = _table_kind(self._table_header)
+            self._pending_header = None
+            return
+        cells = _split_row(line)
+        if self._table_header is None:
+            self._pending_header = [cell.lower() for cell in cells]
+            return
+        row = dict(zip(self._table_header, cells))
+        kind = self._table_kind
+        if kind == "registers":
+            offset = _parse_int(_cell(row, "offset", "address", "addr"))
+            name = _cell(row, "name", "register", "reg")
+            if offset is not None and name:
+                self._add_register(
+                    name, offset, _cell(row, "access", "type", "rw"),
+                    _cell(row, "reset", "reset value", "default"), _cell(row, "description", "desc")
+                )
+        elif kind == "fields" and self.ir.registers:
+            name = _cell(row, "field", "name")
+            if name:
+                self.ir.registers[-1].fields.append(RegisterField(
+                    name, _cell(row, "bits", "bit"), _cell(row, "access", "type", "rw"),
+                    _cell(row, "reset", "default"), _cell(row, "description", "desc")
+                ))
+        elif kind == "ports":
+            name = _cell(row, "name", "signal", "port")
+            if name:
+                width = _cell(row, "width", "bits")
+                self._add_port(
+                    name, _cell(row, "direction", "dir").lower(),
+                    _parse_width_cell(width) if width else 1,
+                    _cell(row, "description", "desc")
+                )
+        elif kind == "parameters":
+            name = _cell(row, "parameter", "param", "name")
+            value = _cell(row, "value", "default")
+            if name and value:
+                self._add_parameter(name, value)
+
+    def _register_line(self, line: str) -> bool:
+        match = _REGISTER_ADDRESS_FIRST.match(line)
+        if match:
+            offset = _parse_int(match.group(1))
+            name, access, description = _describe(match.group(2))
+            if offset is None or not name:
+                return False
+            reset = _RESET_VALUE.search(line)
+            self._add_register(name, offset, access, reset.group(1) if reset else "", description)
+            self._field_target = self._registers[name]
+            return True
+        match = _REGISTER_NAME_FIRST.match(line)
+        if match:
+            name, offset_text = match.group(1), match.group(2)
+        else:
+            match = _REGISTER_OFFSET_FIRST.match(line)
+            if not match:
+                return False
+            offset_text, name = match.group(1), match.group(2)
+        offset = _parse_int(offset_text)
+        if offset is None:
+            # "0x_" and the like are not addresses
+            return False
+        access = _ACCESS.search(line[match.end():])
+        reset = _RESET_VALUE.search(line)
+        self._add_register(
+            name, offset, access.group(1) if access else "",
+            reset.group(1) if reset else ""
+        )
+        self._field_target = self._registers[name]
+        return True
+
+    def _add_field(self, bits: str, text: str):
+        name, access, description = _describe(text)
+        reset = _RESET_VALUE.search(text)
+        self._field_target.fields.append(RegisterField(
+            name, re.sub(r'\s+', '', bits), access, reset.group(1) if reset else "", description
+        ))
+
+    def _clock_line(self, line: str):
+        frequency = _FREQUENCY.search(line)
+        name_match = _CLOCK_NAME.search(line)
+        if frequency is None and name_match is None:
+            return
+        name = name_match.group(1) if name_match else "clk"
+        hz = float(frequency.group(1)) * _FREQUENCY_SCALE[frequency.group(2).lower()] if frequency else None
+        clock = self._clocks.get(name)
+        if clock is None:
+            clock = self._clocks[name] = Clock(name, hz)
+            self.ir.clocks.append(clock)
+        elif clock.frequency_hz is None:
+            clock.frequency_hz = hz
+
+    def _reset_line(self, line: str, lowered: str):
+        names = _RESET_NAME.findall(line)
+        if "asynchronous" in lowered or "async" in lowered:
+            synchronous = False
+        elif "synchronous" in lowered:
+            synchronous = True
+        else:
+            synchronous = None
+        active_low = True if ("active low" in lowered or "active-low" in lowered) else (
+            False if ("active high" in lowered or "active-high" in lowered) else None
+        )
+        if not names:
+            # "Active-low reset": remember the traits for finish()
+            if "reset" in lowered and (active_low is not None or synchronous is not None):
+                if self._unnamed_reset is None:
+                    self._unnamed_reset = [active_low, synchronous]
+                else:
+                    self._unnamed_reset = [
+                        known if known is not None else new
+                        for known, new in zip(self._unnamed_reset, (active_low, synchronous))
+                    ]
+            return
+        for name in names:
+            self._add_reset(name, active_low, synchronous)
+
+    def finish(self):
+        """Apply what only the whole spec tells, such as an unnamed reset"""
+        if self._unnamed_reset is None:
+            return
+        active_low, synchronous = self._unnamed_reset
+        if not self.ir.resets:
+            self._add_reset("rst_n" if active_low else "rst", active_low, synchronous)
+        elif len(self.ir.resets) == 1:
+            # The spec's only reset is the one described
+            self._add_reset(self.ir.resets[0].name, active_low, synchronous)
+
+    def _add_interface(self, value: str):
+        lowered = value.lower()
+        protocol = next((keyword for keyword in PROTOCOL_KEYWORDS if keyword.lower() in lowered), None)
+        self.ir.interfaces.append(Interface(value, protocol))
+
+    def _add_port(self, name: str, direction: str, width: Any, description: str = ""):
+        if name in self._seen_ports:
+            return
+        self._seen_ports.add(name)
+        self.ir.ports.append(Port(name, direction, width, description))
+        lowered = name.lower()
+        if "clk" in lowered or "clock" in lowered:
+            if name not in self._clocks:
+                self._clocks[name] = Clock(name)
+                self.ir.clocks.append(self._clocks[name])
+        elif "rst" in lowered or "reset" in lowered:
+            self._add_reset(name, None, None)
+
+    def _add_reset(self, name: str, active_low: Optional[bool], synchronous: Optional[bool]):
+        if active_low is None:
+            lowered = name.lower()
+            if lowered.endswith(("_n", "_b", "_l", "rstn", "resetn")):
+                active_low = True
+        reset = self._resets.get(name)
+        if reset is None:
+            reset = self._resets[name] = Reset(name, active_low, synchronous)
+            self.ir.resets.append(reset)
+            return
+        if reset.active_low is None:
+            reset.active_low = active_low
+        if reset.synchronous is None:
+            reset.synchronous = synchronous
+
+    def _add_register(self, name: str, offset: Optional[int], access: str = "", reset: str = "", description: str = ""):
+        if name in self._registers:
+            return
+        register = self._registers[name] = Register(name, offset, access.upper(), reset, description)
+        self.ir.registers.append(register)
+
+    def _add_parameter(self, name: str, value: str):
+        value = value.strip()
+        if name.lower() in _NON_PARAMETER_KEYS or name in self._seen_params:
+            return
+        if len(value) > 64 or not _SCALAR.match(value):
+            # Prose after a colon is not a parameter
+            return
+        self._seen_params.add(name)
+        self.ir.parameters.append(Parameter(name, value))
+        lowered = name.lower()
+        if "freq" in lowered or "clock" in lowered or "clk" in lowered:
+            frequency = _FREQUENCY.search(value)
+            if frequency and not any(clock.frequency_hz for clock in self.ir.clocks):
+                hz = float(frequency.group(1)) * _FREQUENCY_SCALE[frequency.group(2).lower()]
+                if self.ir.clocks:
+                    self.ir.clocks[0].frequency_hz = hz
+                else:
+                    self._clocks["clk"] = Clock("clk", hz)
+                    self.ir.clocks.append(self._clocks["clk"])
+
+
+def extract_spec_ir(text: str, line_observer: Optional[Callable[[str], None]] = None) -> SpecIR:
+    """
+    Build the structured IR of a specification in one pass over its lines
+
+    Args:
+        text: Specification text
+        line_observer: Optional callable given each line as it is scanned,
+            so other per-line analyses can share the pass
+
+    Returns:
+        SpecIR with interfaces, ports, registers, parameters, clocks and resets
+    """
+    extractor = _Extractor()
+    for line in text.splitlines():
+        if line_observer is not None:
+            line_observer(line)
+        extractor.feed(line)
+    extractor.finish()
+    lowered = text.lower()
+    extractor.ir.protocols = [keyword for keyword in PROTOCOL_KEYWORDS if keyword.lower() in lowered]
+    return extractor.ir
@@ -0,0 +1,1194 @@
+"""
+Verilog / SystemVerilog lexer and parser
+
+parse_verilog() tokenizes a source once with a single compiled regex and
+builds a compact AST of its design units: modules (and interfaces and
+programs) with their parameters, ports, nets, instances, procedural blocks
+and continuous assignments, plus the problems found on the way. The
+analysis helpers in app.utils (syntax validation, port extraction, code
+metrics, PPA estimation) all work from this AST instead of rescanning the
+text with their own regexes.
+
+The parser is structural: it follows declarations and block nesting well
+enough for analysis, but does not elaborate expressions or check types.
+Comments, strings and compiler directives are consumed by the lexer, so
+code inside them is never mistaken for declarations. ASTs serialize through
+marshal (dumps/loads) for the RTL analysis cache.
+"""
+
+import bisect
+import marshal
+import re
+from itertools import accumulate, chain, compress, count
+from typing import Any, Dict, List, Optional, Tuple
+
+from .spec_ir import _Record
+
+# Bump whenever parsing or the record layout changes
+AST_VERSION = 1
+
+_COMMENT = r"//[^\n]*|/\*.*?\*/"
+_DIRECTIVE = r"""
+    `(?:define|undef|include|timescale|default_nettype|resetall|celldefine|endcelldefine
+       |line|pragma|unconnected_drive|nounconnected_drive|begin_keywords|end_keywords)\b
+    (?:\\\r?\n|[^\n])*
+  | `(?:ifdef|ifndef|elsif)[ \t]+\w+
+  | `(?:else|endif|undefineall)\b
+"""
+
+# One lexeme: (whitespace, comments and directives before the token,
+# token, irregular token). Identifiers and unambiguous punctuation come
+# first because they make up most of any RTL source. Unterminated comments
+# and strings and stray characters land in the third group so the lexer
+# can check for them without looking at every token.
+_LEXEME = re.compile(r"""
+    (
+        [ \t\r\n\f\v]*
+        (?:(?=[/`])(?:""" + _COMMENT + "|" + _DIRECTIVE + r""")[ \t\r\n\f\v]*)*
+    )
+    (?:
+        (
+            [A-Za-z_][\w$]*
+          | [(),;\[\]{}@?]
+          | "(?:[^"\\\n]|\\.)*"
+          | \d[\d_]*(?:\.\d[\d_]*)?(?:[eE][+-]?\d[\d_]*)?(?:[ \t]*'[sS]?[bBoOdDhH][ \t]*[\dA-Fa-fxXzZ?_]+)?
+          | '[sS]?[bBoOdDhH][ \t]*[\dA-Fa-fxXzZ?_]+
+          | '[01xXzZ](?!\w)
+          | \\[^ \t\r\n\f\v]+
+          | \$[\w$]+
+          | `[A-Za-z_]\w*
+          | <<<=|>>>=|===|!==|==\?|!=\?|<<<|>>>|<<=|>>=|\|->|\|=>|<->
+          | <=|>=|==|!=|&&|\|\||\*\*|<<|>>|->|\+\+|--|[-+*/%&|^]=
+          | ~&|~\||~\^|\^~|::|\+:|-:|\#\#|\.\*|'\{
+          | (?!/\*)[-+*/%&|^!~=<>.:\#'`$]
+          | \Z
+        )
+      | (/\*.*|"(?:[^"\\\n]|\\.)*(?=\n|\Z)|[^ \t\r\n\f\v])
+    )
+""", re.VERBOSE | re.DOTALL)
+_TRIVIA_MARKER = re.compile(r'[/`]')
+_TRIVIA = re.compile(r"(?P<comment>" + _COMMENT + r")|(?P<directive>" + _DIRECTIVE + ")",
+                     re.VERBOSE | re.DOTALL)
+_NONBLANK_LINE = re.compile(r'^[ \t\r\f\v]*[^ \t\r\f\v\n]', re.MULTILINE)
+_X_LITERAL = re.compile(r"'[sS]?[bBoOhH][ \t]*[\dA-Fa-f_]*[xX]|^'[xX]$")
+
+# Design units and the keyword that closes each
+_UNITS = {"module": "endmodule", "macromodule": "endmodule",
+          "interface": "endinterface", "program": "endprogram"}
+_UNIT_ENDS = frozenset(_UNITS.values())
+
+# Constructs skipped whole inside a module or at the top level
+_SKIPPED_BLOCKS = {
+    "specify": "endspecify", "covergroup": "endgroup", "property": "endproperty",
+    "sequence": "endsequence", "clocking": "endclocking", "class": "endclass",
+    "checker": "endchecker", "package": "endpackage", "primitive": "endprimitive",
+    "config": "endconfig", "table": "endtable"
+}
+
+_DIRECTIONS = frozenset(("input", "output", "inout", "ref"))
+_DATA_TYPES = frozenset((
+    "wire", "reg", "logic", "var", "tri", "tri0", "tri1", "triand", "trior", "trireg",
+    "wand", "wor", "uwire", "supply0", "supply1", "bit", "byte", "shortint", "int",
+    "longint", "integer", "time", "real", "realtime", "shortreal", "string", "genvar",
+    "event", "chandle", "enum", "struct", "union", "packed", "interconnect", "const",
+    "static", "automatic", "vectored", "scalared", "signed", "unsigned"
+))
+_DECLARATION_STARTS = _DATA_TYPES - {"signed", "unsigned", "packed", "vectored", "scalared"}
+_PROCESSES = frozenset(("always", "always_ff", "always_comb", "always_latch", "initial", "final"))
+_GATES = frozenset((
+    "and", "nand", "or", "nor", "xor", "xnor", "buf", "not", "bufif0", "bufif1",
+    "notif0", "notif1", "nmos", "pmos", "cmos", "rnmos", "rpmos", "rcmos", "tran",
+    "rtran", "tranif0", "tranif1", "rtranif0", "rtranif1", "pullup", "pulldown"
+))
+# Built-in primitives: instances of these have no module declaration
+PRIMITIVES = _GATES
+_CASES = frozenset(("case", "casex", "casez", "randcase"))
+_BLOCK_ENDS = frozenset(("end", "join", "join_any", "join_none"))
+_ASSIGNMENT_OPERATORS = frozenset((
+    "=", "<=", "+=", "-=", "*=", "/=", "%=", "&=", "|=", "^=", "<<=", ">>=", "<<<=", ">>>="
+))
+
+# Keywords that cannot appear inside a statement; hitting one means the
+# statement (or block) before it was not closed
+_STATEMENT_STOPS = frozenset(
+    {"end", "join", "join_any", "join_none", "endcase", "endfunction", "endtask",
+     "endgenerate", "endspecify", "generate"}
+    | set(_UNITS) | _UNIT_ENDS | _PROCESSES
+)
+
+_KEYWORDS = frozenset(
+    set(_UNITS) | _UNIT_ENDS | set(_SKIPPED_BLOCKS) | set(_SKIPPED_BLOCKS.values())
+    | _DIRECTIONS | _DATA_TYPES | _PROCESSES | _GATES | _CASES | _BLOCK_ENDS
+    | {
+        "assign", "deassign", "force", "release", "begin", "fork", "if", "else", "for",
+        "foreach", "while", "do", "repeat", "forever", "endcase", "default", "function",
+        "endfunction", "task", "endtask", "generate", "endgenerate", "parameter",
+        "localparam", "defparam", "specparam", "posedge", "negedge", "edge", "or",
+        "wait", "disable", "return", "break", "continue", "typedef", "import", "export",
+        "unique", "unique0", "priority", "inside", "matches", "assert", "assume",
+        "cover", "restrict", "expect", "timeunit", "timeprecision", "bind", "let",
+        "modport", "virtual", "extern", "null", "this", "super", "type", "void"
+    }
+)
+
+_IDENTIFIER_START = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_\\")
+
+# Bracket depth changes; 0 marks keywords that cannot sit inside a bracket
+_GROUP = {"(": 1, "[": 1, "{": 1, "'{": 1, ")": -1, "]": -1, "}": -1}
+_GROUP.update((keyword, 0) for keyword in _STATEMENT_STOPS | {"begin", "module"})
+_CLOSERS = {"(": ")", "[": "]", "{": "}", "'{": "}"}
+_STRUCTURE = frozenset(_GROUP) | {","}
+
+
+def _is_identifier(token: str) -> bool:
+    return token[:1] in _IDENTIFIER_START and token not in _KEYWORDS
+
+
+class PortDecl(_Record):
+    """A module port; width is the packed range text ("7:0"), empty when scalar"""
+
+    __slots__ = ("name", "direction", "net_type", "signed", "width", "description", "line")
+
+    def __init__(self, name: str, direction: Optional[str] = None, net_type: Optional[str] = None,
+                 signed: bool = False, width: str = "", description: str = "", line: int = 0):
+        self.name = name
+        self.direction = direction
+        self.net_type = net_type
+        self.signed = signed
+        self.width = width
+        self.description = description
+        self.line = line
+
+
+class ParamDecl(_Record):
+    """A parameter or localparam and its default value expression"""
+
+    __slots__ = ("name", "value", "local", "type")
+
+    def __init__(self, name: str, value: str = "", local: bool = False, type: str = ""):
+        self.name = name
+        self.value = value
+        self.local = local
+        self.type = type
+
+
+class NetDecl(_Record):
+    """A net or variable declared in a module body"""
+
+    __slots__ = ("name", "kind", "width", "line")
+
+    def __init__(self, name: str, kind: str = "wire", width: str = "", line: int = 0):
+        self.name = name
+        self.kind = kind
+        self.width = width
+        self.line = line
+
+
+class Instance(_Record):
+    """
+    A module or gate instantiation; parameters and connections are
+    (name, expression) pairs, with name None when positional
+    """
+
+    __slots__ = ("module", "name", "parameters", "connections", "line")
+
+    def __init__(self, module: str, name: str = "", parameters: tuple = (),
+                 connections: tuple = (), line: int = 0):
+        self.module = module
+        self.name = name
+        self.parameters = parameters
+        self.connections = connections
+        self.line = line
+
+
+class Process(_Record):
+    """
+    An always/initial/final block; edges are (posedge|negedge|edge, signal)
+    pairs, sensitivity is "*" for @* / always_comb, the event text for other
+    lists and "" when the block has no event control
+    """
+
+    __slots__ = ("kind", "sensitivity", "edges", "targets", "line")
+
+    def __init__(self, kind: str, sensitivity: str = "", edges: tuple = (),
+                 targets: tuple = (), line: int = 0):
+        self.kind = kind
+        self.sensitivity = sensitivity
+        self.edges = edges
+        self.targets = targets
+        self.line = line
+
+    @property
+    def sequential(self) -> bool:
+        return bool(self.edges) or self.kind == "always_ff"
+
+
+class Assign(_Record):
+    """A continuous assignment: the signals it drives and the ones it reads"""
+
+    __slots__ = ("targets", "sources", "line")
+
+    def __init__(self, targets: tuple = (), sources: tuple = (), line: int = 0):
+        self.targets = targets
+        self.sources = sources
+        self.line = line
+
+
+class ModuleDecl(_Record):
+    """A module, interface or program and everything declared in it"""
+
+    __slots__ = ("name", "kind", "line", "end_line", "parameters", "ports", "nets",
+                 "instances", "processes", "assigns", "functions", "tasks", "defparams")
+
+    _CHILDREN = {"parameters": ParamDecl, "ports": PortDecl, "nets": NetDecl,
+                 "instances": Instance, "processes": Process, "assigns": Assign}
+
+    def __init__(self, name: str, kind: str = "module", line: int = 0, end_line: Optional[int] = None,
+                 parameters: List[ParamDecl] = None, ports: List[PortDecl] = None,
+                 nets: List[NetDecl] = None, instances: List[Instance] = None,
+                 processes: List[Process] = None, assigns: List[Assign] = None,
+                 functions: List[str] = None, tasks: List[str] = None,
+                 defparams: List[Tuple[str, str]] = None):
+        self.name = name
+        self.kind = kind
+        self.line = line
+        self.end_line = end_line
+        self.parameters = parameters or []
+        self.ports = ports or []
+        self.nets = nets or []
+        self.instances = instances or []
+        self.processes = processes or []
+        self.assigns = assigns or []
+        self.functions = functions or []
+        self.tasks = tasks or []
+        self.defparams = defparams or []
+
+    def to_tuple(self) -> tuple:
+        values = []
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if name in self._CHILDREN:
+                value = tuple(child.to_tuple() for child in value)
+            elif isinstance(value, list):
+                value = tuple(value)
+            values.append(value)
+        return tuple(values)
+
+    @classmethod
+    def from_tuple(cls, values: tuple):
+        fields = dict(zip(cls.__slots__, values))
+        for name, record in cls._CHILDREN.items():
+            fields[name] = [record.from_tuple(child) for child in fields[name]]
+        for name in ("functions", "tasks", "defparams"):
+            fields[name] = list(fields[name])
+        return cls(**fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        for name in self._CHILDREN:
+            data[name] = [child.to_dict() for child in data[name]]
+        return data
+
+    def port(self, name: str) -> Optional[PortDecl]:
+        for port in self.ports:
+            if port.name == name:
+                return port
+        return None
+
+
+class VerilogAST(_Record):
+    """
+    Parsed source: its design units, the problems found as
+    (severity, line, message) tuples, and line metrics
+    """
+
+    __slots__ = ("modules", "issues", "metrics")
+
+    def __init__(self, modules: List[ModuleDecl] = None, issues: List[Tuple[str, int, str]] = None,
+                 metrics: Dict[str, int] = None):
+        self.modules = modules or []
+        self.issues = issues or []
+        self.metrics = metrics or {}
+
+    def to_tuple(self) -> tuple:
+        return (tuple(module.to_tuple() for module in self.modules),
+                tuple(self.issues), tuple(sorted(self.metrics.items())))
+
+    @classmethod
+    def from_tuple(cls, values: tuple):
+        modules, issues, metrics = values
+        return cls(modules=[ModuleDecl.from_tuple(module) for module in modules],
+                   issues=list(issues), metrics=dict(metrics))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "modules": [module.to_dict() for module in self.modules],
+            "issues": [{"severity": severity, "line": line, "message": message}
+                       for severity, line, message in self.issues],
+            "metrics": dict(self.metrics)
+        }
+
+    def module(self, name: str) -> Optional[ModuleDecl]:
+        for module in self.modules:
+            if module.name == name:
+                return module
+        return None
+
+    def top_modules(self) -> List[ModuleDecl]:
+        """Modules no other module in this source instantiates (all of them if none qualify)"""
+        instantiated = {instance.module for module in self.modules for instance in module.instances}
+        tops = [module for module in self.modules if module.name not in instantiated]
+        return tops or list(self.modules)
+
+    @property
+    def errors(self) -> List[Tuple[str, int, str]]:
+        return [issue for issue in self.issues if issue[0] == "error"]
+
+    @property
+    def warnings(self) -> List[Tuple[str, int, str]]:
+        return [issue for issue in self.issues if issue[0] == "warning"]
+
+
+def tokenize(source: str) -> Tuple[List[str], List[int], List[Tuple[int, str]],
+                                   List[Tuple[int, str]], List[Tuple[int, str]]]:
+    """
+    Split Verilog source into tokens
+
+    Args:
+        source: Verilog/SystemVerilog text
+
+    Returns:
+        (tokens, token offsets, comments, directives, problems); comments
+        and directives are (offset, text) pairs kept out of the token
+        stream, problems are (offset, message) pairs for unterminated
+        comments and strings
+    """
+    lexemes = list(chain.from_iterable(_LEXEME.findall(source)))
+    tokens = lexemes[1::3]
+    irregular = lexemes[2::3]
+    offsets = list(accumulate(map(len, lexemes)))
+    starts = offsets[0::3]
+    comments: List[Tuple[int, str]] = []
+    directives: List[Tuple[int, str]] = []
+    problems: List[Tuple[int, str]] = []
+
+    trivia = lexemes[0::3]
+    for index in compress(count(), map(_TRIVIA_MARKER.search, trivia)):
+        base = starts[index] - len(trivia[index])
+        for match in _TRIVIA.finditer(trivia[index]):
+            target = comments if match.lastgroup == "comment" else directives
+            target.append((base + match.start(), match.group()))
+    if any(irregular):
+        for index in compress(count(), irregular):
+            token = tokens[index] = irregular[index]
+            if token.startswith("/*"):
+                problems.append((starts[index], "Unterminated block comment"))
+            elif token[0] == '"':
+                problems.append((starts[index], "Unterminated string"))
+            else:
+                problems.append((starts[index], f"Unexpected character '{token}'"))
+    # The matches at the end of the source carry only trailing trivia
+    while tokens and not tokens[-1]:
+        tokens.pop()
+        starts.pop()
+    if tokens and tokens[-1].startswith("/*"):
+        # An unterminated block comment runs to the end of the source
+        comments.append((starts.pop(), tokens.pop()))
+    return tokens, starts, comments, directives, problems
+
+
+class _Parser:
+    """Recursive-descent parser over the token list of one source"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens, self.starts, self.comments, self.directives, self.problems = tokenize(source)
+        self.n = len(self.tokens)
+        # Sentinel so lookahead past the end never raises
+        self.tokens.append("")
+        self.starts.append(len(source))
+        self.issues: List[Tuple[str, int, str]] = []
+        # Offset just past each newline
+        self._line_starts = list(accumulate(map((1).__add__, map(len, source.split('\n')))))
+        self._commas: List[int] = []
+        self._comma_parents: List[int] = []
+        self._closers = self._match_brackets()
+        self._line_comments: Optional[Dict[int, str]] = None
+        self._items = {
+            "assign": self._assign,
+            "parameter": self._parameter_declaration,
+            "localparam": self._parameter_declaration,
+            "defparam": self._defparam,
+            "function": self._subroutine,
+            "task": self._subroutine,
+        }
+        for keyword in _DIRECTIONS:
+            self._items[keyword] = self._port_declaration
+        for keyword in _DECLARATION_STARTS:
+            self._items[keyword] = self._net_declaration
+        for keyword in _PROCESSES:
+            self._items[keyword] = self._process
+        for keyword in _GATES:
+            self._items[keyword] = self._instances
+
+    # Positions and text
+
+    def _line_at(self, offset: int) -> int:
+        return bisect.bisect_right(self._line_starts, offset) + 1
+
+    def _line(self, index: int) -> int:
+        return bisect.bisect_right(self._line_starts, self.starts[index]) + 1
+
+    def _text(self, start: int, end: int) -> str:
+        if start >= end:
+            return ""
+        last = end - 1
+        return " ".join(self.source[self.starts[start]:self.starts[last] + len(self.tokens[last])].split())
+
+    def _comment_on_line(self, line: int) -> str:
+        if self._line_comments is None:
+            self._line_comments = {}
+            for offset, text in self.comments:
+                if text.startswith("//"):
+                    self._line_comments.setdefault(self._line_at(offset), text[2:].strip())
+        return self._line_comments.get(line, "")
+
+    def _issue(self, severity: str, index: int, message: str):
+        self.issues.append((severity, self._line(index), message))
+
+    # Token-range helpers
+
+    def _match_brackets(self) -> Dict[int, int]:
+        """
+        Map every opening bracket to the index of its closer, or to minus the
+        index of the keyword that cut it off when it is never closed. Also
+        records each comma with the bracket it sits in, for _split().
+        """
+        tokens = self.tokens
+        closers: Dict[int, int] = {}
+        stack: List[int] = []
+        commas = self._commas
+        parents = self._comma_parents
+        for j in compress(count(), map(_STRUCTURE.__contains__, tokens)):
+            token = tokens[j]
+            if token == ",":
+                commas.append(j)
+                parents.append(stack[-1] if stack else -1)
+                continue
+            delta = _GROUP[token]
+            if delta == 1:
+                stack.append(j)
+            elif delta == -1:
+                if stack:
+                    closers[stack.pop()] = j
+            elif stack:
+                for opener in stack:
+                    closers[opener] = -j
+                stack.clear()
+        for opener in stack:
+            closers[opener] = -self.n
+        return closers
+
+    def _group_end(self, i: int) -> int:
+        """Index of the bracket closing the one at i; reports and recovers when unbalanced"""
+        close = self._closers.get(i, -self.n)
+        if close > 0:
+            return close
+        self._issue("error", i, f"Unbalanced '{self.tokens[i]}': missing '{_CLOSERS.get(self.tokens[i], ')')}'")
+        return -close - 1
+
+    def _split(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """Comma-separated ranges of tokens[start:end] at bracket depth 0"""
+        commas = self._commas
+        parents = self._comma_parents
+        ranges = []
+        begin = start
+        for k in range(bisect.bisect_left(commas, start), bisect.bisect_left(commas, end)):
+            # Commas inside a bracket opened within the range belong to it
+            if parents[k] < start:
+                ranges.append((begin, commas[k]))
+                begin = commas[k] + 1
+        if begin < end:
+            ranges.append((begin, end))
+        return ranges
+
+    def _semicolon(self, i: int) -> int:
+        """Index of the ';' ending the statement that starts at i (brackets respected)"""
+        tokens = self.tokens
+        closers = self._closers
+        get = _GROUP.get
+        j = i
+        n = self.n
+        while j < n:
+            token = tokens[j]
+            if token == ";":
+                return j
+            delta = get(token)
+            if delta is not None:
+                if delta == 1:
+                    close = closers[j]
+                    if close < 0:
+                        j = -close
+                        continue
+                    j = close
+                elif delta == 0 and j > i:
+                    break
+            j += 1
+        self._issue("error", j, f"Missing ';' before '{tokens[j]}'" if j < n else "Missing ';' at end of file")
+        return j - 1
+
+    def _skip_block(self, i: int, end_keyword: str) -> int:
+        """Skip from i to just past end_keyword, stopping at the end of the enclosing unit"""
+        tokens = self.tokens
+        n = self.n
+        j = i + 1
+        while j < n:
+            token = tokens[j]
+            if token == end_keyword:
+                return self._skip_label(j + 1)
+            if token in _UNIT_ENDS or token in _UNITS:
+                break
+            j += 1
+        self._issue("error", i, f"'{tokens[i]}' without matching '{end_keyword}'")
+        return j
+
+    def _skip_label(self, i: int) -> int:
+        if self.tokens[i] == ":" and _is_identifier(self.tokens[i + 1]):
+            return i + 2
+        return i
+
+    def _identifiers(self, start: int, end: int, top_level_only: bool = False) -> List[str]:
+        """Signal names referenced in tokens[start:end]"""
+        tokens = self.tokens
+        names = []
+        depth = 0
+        for j in range(start, end):
+            token = tokens[j]
+            if token == "(" or token == "[":
+                depth += 1
+            elif token == ")" or token == "]":
+                depth -= 1
+            elif (_is_identifier(token) and not (top_level_only and depth)
+                  and tokens[j - 1] not in (".", "::", "'") and tokens[j + 1] not in ("(", "::")):
+                names.append(token)
+        return names
+
+    # Declarations
+
+    def _declarators(self, start: int, end: int) -> List[Tuple[Optional[str], Optional[str], bool, str, str, int]]:
+        """
+        Parse a comma-separated declaration list such as `input wire [7:0] a, b`
+
+        Later declarators without their own direction/type inherit the ones
+        before them. Returns (direction, net_type, signed, width, name, index).
+        """
+        tokens = self.tokens
+        result = []
+        direction = None
+        net_type = None
+        signed = False
+        width = ""
+        for chunk_start, chunk_end in self._split(start, end):
+            chunk_direction = None
+            words: List[str] = []
+            chunk_signed = None
+            dims: List[str] = []
+            name = None
+            name_index = -1
+            j = chunk_start
+            while j < chunk_end:
+                token = tokens[j]
+                if token in _DIRECTIONS:
+                    chunk_direction = token
+                elif token == "signed" or token == "unsigned":
+                    chunk_signed = token == "signed"
+                elif token in _GROUP and _GROUP[token] == 1:
+                    close = self._group_end(j)
+                    if token == "[" and name is None:
+                        dims.append(self._text(j + 1, close))
+                    j = close
+                elif token == "=":
+                    break
+                elif token in _DATA_TYPES:
+                    if token not in ("const", "static", "automatic", "packed"):
+                        words.append(token)
+                elif _is_identifier(token):
+                    if name is not None and tokens[j - 1] == ".":
+                        name = f"{name}.{token}"
+                    elif name is not None and tokens[j - 1] == "::":
+                        name = f"{name}::{token}"
+                    else:
+                        if name is not None:
+                            words.append(name)
+                            dims = []
+                        name = token
+                        name_index = j
+                j += 1
+            if name is None:
+                continue
+            if chunk_direction is None and not words and not dims and chunk_signed is None:
+                result.append((direction, net_type, signed, width, name, name_index))
+                continue
+            net_type = " ".join(words) or None
+            if chunk_direction is None and net_type and "." in net_type:
+                # interface.modport port
+                chunk_direction = "interface"
+            direction = chunk_direction or direction
+            signed = bool(chunk_signed)
+            width = "][".join(dims)
+            result.append((direction, net_type, signed, width, name, name_index))
+        return result
+
+    def _parameters(self, start: int, end: int, local: bool, module: ModuleDecl):
+        tokens = self.tokens
+        for chunk_start, chunk_end in self._split(start, end):
+            equals = -1
+            for j in range(chunk_start, chunk_end):
+                token = tokens[j]
+                if token == "localparam":
+                    local = True
+                elif token == "parameter":
+                    local = False
+                elif token == "=":
+                    equals = j
+                    break
+            stop = equals if equals >= 0 else chunk_end
+            names = [j for j in range(chunk_start, stop) if _is_identifier(tokens[j])
+                     and tokens[j - 1] != "::" and tokens[j + 1] != "::"]
+            if not names:
+                continue
+            name_index = names[-1]
+            type_start = chunk_start
+            while tokens[type_start] in ("parameter", "localparam"):
+                type_start += 1
+            module.parameters.append(ParamDecl(
+                name=tokens[name_index],
+                value=self._text(equals + 1, chunk_end) if equals >= 0 else "",
+                local=local,
+                type=self._text(type_start, name_index)
+            ))
+
+    def _port_list(self, i: int, module: ModuleDecl) -> int:
+        """Header port list starting at '(' (ANSI or a list of names)"""
+        tokens = self.tokens
+        close = self._group_end(i)
+        chunks = self._split(i + 1, close)
+        if not chunks:
+            return close + 1
+        first_start, first_end = chunks[0]
+        non_ansi = (first_end - first_start == 1 and _is_identifier(tokens[first_start])) \
+            or tokens[first_start] == "."
+        if non_ansi:
+            for chunk_start, chunk_end in chunks:
+                j = chunk_start + 1 if tokens[chunk_start] == "." else chunk_start
+                if j < chunk_end and _is_identifier(tokens[j]):
+                    module.ports.append(PortDecl(name=tokens[j], line=self._line(j)))
+            return close + 1
+        for direction, net_type, signed, width, name, index in self._declarators(i + 1, close):
+            if direction is None:
+                direction = "interface" if net_type and net_type not in _DATA_TYPES else "inout"
+            line = self._line(index)
+            module.ports.append(PortDecl(
+                name=name, direction=direction, net_type=net_type, signed=signed,
+                width=width, description=self._comment_on_line(line), line=line
+            ))
+        return close + 1
+
+    def _port_declaration(self, i: int, module: ModuleDecl) -> int:
+        """Non-ANSI body declaration: input [7:0] a, b;"""
+        end = self._semicolon(i)
+        for direction, net_type, signed, width, name, index in self._declarators(i, end):
+            line = self._line(index)
+            port = module.port(name)
+            if port is None:
+                self._issue("warning", index, f"'{name}' is declared {direction} but is not in the port list of '{module.name}'")
+                port = PortDecl(name=name, line=line)
+                module.ports.append(port)
+            port.direction = direction
+            port.net_type = net_type or port.net_type
+            port.signed = signed
+            port.width = width
+            port.description = self._comment_on_line(line)
+            port.line = line
+        return end + 1
+
+    def _parameter_declaration(self, i: int, module: ModuleDecl) -> int:
+        end = self._semicolon(i)
+        self._parameters(i, end, self.tokens[i] == "localparam", module)
+        return end + 1
+
+    def _defparam(self, i: int, module: ModuleDecl) -> int:
+        end = self._semicolon(i)
+        for chunk_start, chunk_end in self._split(i + 1, end):
+            for j in range(chunk_start, chunk_end):
+                if self.tokens[j] == "=":
+                    module.defparams.append((self._text(chunk_start, j), self._text(j + 1, chunk_end)))
+                    break
+        return end + 1
+
+    def _net_declaration(self, i: int, module: ModuleDecl) -> int:
+        end = self._semicolon(i)
+        ports = {port.name: port for port in module.ports}
+        for _, net_type, _, width, name, index in self._declarators(i, end):
+            kind = net_type or "wire"
+            port = ports.get(name)
+            if port is not None:
+                # Non-ANSI `output q; reg [7:0] q;`
+                port.net_type = kind
+                port.width = port.width or width
+                continue
+            module.nets.append(NetDecl(name=name, kind=kind, width=width, line=self._line(index)))
+        return end + 1
+
+    def _subroutine(self, i: int, module: ModuleDecl) -> int:
+        tokens = self.tokens
+        keyword = tokens[i]
+        name = None
+        j = i + 1
+        while j < self.n and tokens[j] not in ("(", ";") and tokens[j] not in _STATEMENT_STOPS:
+            if _is_identifier(tokens[j]):
+                name = tokens[j]
+            j += 1
+        if name:
+            (module.functions if keyword == "function" else module.tasks).append(name)
+        return self._skip_block(i, "endfunction" if keyword == "function" else "endtask")
+
+    # Continuous assignments and instances
+
+    def _assign(self, i: int, module: ModuleDecl) -> int:
+        tokens = self.tokens
+        end = self._semicolon(i)
+        j = i + 1
+        if tokens[j] == "(":
+            j = self._group_end(j) + 1
+        if tokens[j] == "#":
+            j = self._group_end(j + 1) + 1 if tokens[j + 1] == "(" else j + 2
+        for chunk_start, chunk_end in self._split(j, end):
+            for k in range(chunk_start, chunk_end):
+                if tokens[k] == "=":
+                    self._check_x(k + 1)
+                    module.assigns.append(Assign(
+                        targets=tuple(self._identifiers(chunk_start, k, top_level_only=True)),
+                        sources=tuple(self._identifiers(k + 1, chunk_end)),
+                        line=self._line(chunk_start)
+                    ))
+                    break
+        return end + 1
+
+    def _connections(self, start: int, end: int) -> tuple:
+        tokens = self.tokens
+        connections = []
+        for chunk_start, chunk_end in self._split(start, end):
+            if tokens[chunk_start] == ".*":
+                connections.append(("*", "*"))
+            elif tokens[chunk_start] == "." and chunk_start + 1 < chunk_end:
+                port = tokens[chunk_start + 1]
+                if chunk_start + 2 < chunk_end and tokens[chunk_start + 2] == "(":
+                    close = self._group_end(chunk_start + 2)
+                    connections.append((port, self._text(chunk_start + 3, close)))
+                else:
+                    connections.append((port, port))
+            else:
+                connections.append((None, self._text(chunk_start, chunk_end)))
+        return tuple(connections)
+
+    def _instances(self, i: int, module: ModuleDecl) -> int:
+        """`mod #(...) u0 (...), u1 (...);` or a user-typed declaration `state_t s;`"""
+        tokens = self.tokens
+        module_name = tokens[i]
+        j = i + 1
+        parameters = ()
+        if tokens[j] == "(" and tokens[i] in _GATES:
+            # Gate strength or unnamed gate instance
+            if tokens[j + 1] in ("strong0", "strong1", "weak0", "weak1", "pull0", "pull1", "supply0",
+                                 "supply1", "highz0", "highz1"):
+                j = self._group_end(j) + 1
+        if tokens[j] == "#":
+            if tokens[j + 1] == "(":
+                close = self._group_end(j + 1)
+                parameters = self._connections(j + 2, close)
+                j = close + 1
+            else:
+                j = min(j + 2, self.n)
+        is_instance = False
+        while True:
+            name = ""
+            if _is_identifier(tokens[j]):
+                name = tokens[j]
+                name_index = j
+                j += 1
+                while tokens[j] == "[":
+                    j = self._group_end(j) + 1
+            elif tokens[j] != "(" or tokens[i] not in _GATES:
+                break
+            if tokens[j] == "(":
+                close = self._group_end(j)
+                module.instances.append(Instance(
+                    module=module_name, name=name, parameters=parameters,
+                    connections=self._connections(j + 1, close), line=self._line(i)
+                ))
+                is_instance = True
+                j = close + 1
+            elif name and not is_instance:
+                # A declaration with a user-defined type
+                module.nets.append(NetDecl(name=name, kind=module_name, line=self._line(name_index)))
+                if tokens[j] == "=":
+                    j = self._semicolon(j)
+            else:
+                break
+            if tokens[j] != ",":
+                break
+            j += 1
+        if tokens[j] == ";":
+            return j + 1
+        return self._semicolon(j) + 1
+
+    # Procedural code
+
+    def _process(self, i: int, module: ModuleDecl) -> int:
+        tokens = self.tokens
+        kind = tokens[i]
+        line = self._line(i)
+        j = i + 1
+        sensitivity = "*" if kind in ("always_comb", "always_latch") else ""
+        edges = []
+        if tokens[j] == "@":
+            j += 1
+            if tokens[j] == "(":
+                close = self._group_end(j)
+                for k in range(j + 1, close):
+                    if tokens[k] in ("posedge", "negedge", "edge") and _is_identifier(tokens[k + 1]):
+                        edges.append((tokens[k], tokens[k + 1]))
+                sensitivity = "*" if tokens[j + 1] == "*" and close == j + 2 else self._text(j + 1, close)
+                j = close + 1
+            elif tokens[j] == "*" or tokens[j] == "(*)":
+                sensitivity = "*"
+                j += 1
+            else:
+                sensitivity = tokens[j]
+                j += 1
+        elif kind == "always":
+            self._issue("warning", i, "Always block without an event control (@...) runs forever")
+        targets: Dict[str, None] = {}
+        j = self._statement(j, targets)
+        module.processes.append(Process(
+            kind=kind, sensitivity=sensitivity, edges=tuple(edges),
+            targets=tuple(targets), line=line
+        ))
+        return j
+
+    def _statement(self, i: int, targets: Dict[str, None]) -> int:
+        """Skip one procedural statement starting at i, collecting assignment targets"""
+        tokens = self.tokens
+        if i >= self.n:
+            return i
+        token = tokens[i]
+        if _is_identifier(token) and tokens[i + 1] == ":" and tokens[i + 2] in ("begin", "fork"):
+            i += 2
+            token = tokens[i]
+        if token == "begin" or token == "fork":
+            j = self._skip_label(i + 1)
+            n = self.n
+            while j < n:
+                current = tokens[j]
+                if current in _BLOCK_ENDS:
+                    return self._skip_label(j + 1)
+                if current in _STATEMENT_STOPS:
+                    break
+                j = self._statement(j, targets)
+            self._issue("error", i, f"'{token}' without matching '{'end' if token == 'begin' else 'join'}'")
+            return j
+        if token == "if" or token in ("unique", "unique0", "priority"):
+            j = i
+            while True:
+                while tokens[j] in ("unique", "unique0", "priority"):
+                    j += 1
+                if tokens[j] != "if":
+                    return self._statement(j, targets)
+                j = self._group_end(j + 1) + 1 if tokens[j + 1] == "(" else j + 1
+                j = self._statement(j, targets)
+                if tokens[j] != "else":
+                    return j
+                j += 1
+                if tokens[j] != "if":
+                    return self._statement(j, targets)
+        if token in _CASES:
+            return self._case(i, targets)
+        if token in ("for", "foreach", "while", "repeat", "wait"):
+            j = self._group_end(i + 1) + 1 if tokens[i + 1] == "(" else i + 1
+            return self._statement(j, targets)
+        if token == "forever":
+            return self._statement(i + 1, targets)
+        if token == "do":
+            j = self._statement(i + 1, targets)
+            if tokens[j] == "while":
+                j = self._semicolon(j) + 1
+            return j
+        if token == "@":
+            j = i + 1
+            j = self._group_end(j) + 1 if tokens[j] == "(" else j + 1
+            return self._statement(j, targets)
+        if token == "#":
+            j = i + 1
+            j = self._group_end(j) + 1 if tokens[j] == "(" else j + 1
+            return self._statement(j, targets)
+        if token == ";":
+            return i + 1
+        if token in _STATEMENT_STOPS:
+            self._issue("error", i, f"Statement expected before '{token}'")
+            return i
+        return self._simple_statement(i, targets)
+
+    def _simple_statement(self, i: int, targets: Dict[str, None]) -> int:
+        tokens = self.tokens
+        closers = self._closers
+        get = _GROUP.get
+        try:
+            end = tokens.index(";", i, self.n)
+        except ValueError:
+            end = self.n
+        operator = -1
+        j = i
+        while j < end:
+            token = tokens[j]
+            kind = get(token)
+            if kind is None:
+                if operator < 0 and token in _ASSIGNMENT_OPERATORS:
+                    operator = j
+            elif kind == 1:
+                close = closers[j]
+                if close < 0 and -close < end:
+                    # Cut off by a keyword before the ';'
+                    j = -close
+                    continue
+                if close < 0 or close > end:
+                    self._issue("error", end, "Unbalanced brackets before ';'")
+                    break
+                j = close
+            elif kind == 0:
+                self._issue("error", j, f"Missing ';' before '{token}'")
+                return j
+            j += 1
+        if operator >= 0:
+            for name in self._identifiers(i, operator, top_level_only=True):
+                targets[name] = None
+            self._check_x(operator + 1)
+        if end == self.n:
+            self._issue("error", end, "Missing ';' at end of file")
+            return end
+        return end + 1
+
+    def _case(self, i: int, targets: Dict[str, None]) -> int:
+        tokens = self.tokens
+        get = _GROUP.get
+        n = self.n
+        j = self._group_end(i + 1) + 1 if tokens[i + 1] == "(" else i + 1
+        if tokens[j] in ("inside", "matches"):
+            j += 1
+        while j < n:
+            token = tokens[j]
+            if token == "endcase":
+                return j + 1
+            if token in _STATEMENT_STOPS:
+                break
+            if token == "default":
+                j += 1
+                if tokens[j] == ":":
+                    j += 1
+            else:
+                depth = 0
+                k = j
+                while k < n:
+                    label_token = tokens[k]
+                    if label_token == ":" and depth == 0:
+                        break
+                    if label_token == ";":
+                        break
+                    delta = get(label_token)
+                    if delta is not None:
+                        if delta == 0:
+                            break
+                        depth += delta
+                    k += 1
+                if tokens[k] != ":":
+                    self._issue("error", j, "Case item without ':'")
+                    # Always move past the bad item, e.g. 'case (x) begin'
+                    j = k + 1 if tokens[k] == ";" else max(k, j + 1)
+                    continue
+                j = k + 1
+            j = self._statement(j, targets)
+        self._issue("error", i, f"'{tokens[i]}' without matching 'endcase'")
+        return j
+
+    def _check_x(self, i: int):
+        token = self.tokens[i]
+        if token and (token[0] == "'" or token[0].isdigit()) and _X_LITERAL.search(token):
+            self._issue("warning", i, "Code contains unknown values (X) - ensure intentional")
+
+    # Design units
+
+    def _unit(self, i: int) -> int:
+        tokens = self.tokens
+        kind = tokens[i]
+        end_keyword = _UNITS[kind]
+        j = i + 1
+        while tokens[j] in ("static", "automatic"):
+            j += 1
+        if not _is_identifier(tokens[j]):
+            self._issue("error", i, f"Missing {kind} name")
+            name = ""
+        else:
+            name = tokens[j]
+            j += 1
+        module = ModuleDecl(name=name, kind="module" if kind == "macromodule" else kind, line=self._line(i))
+        while tokens[j] == "import":
+            j = self._semicolon(j) + 1
+        if tokens[j] == "#" and tokens[j + 1] == "(":
+            close = self._group_end(j + 1)
+            self._parameters(j + 2, close, False, module)
+            j = close + 1
+        if tokens[j] == "(":
+            j = self._port_list(j, module)
+        if tokens[j] == ";":
+            j += 1
+        else:
+            self._issue("error", j, f"Expected ';' after the header of {kind} '{name}'")
+        j = self._body(j, module, end_keyword)
+        for port in module.ports:
+            if port.direction is None:
+                self._issue("warning", i, f"Port '{port.name}' of '{name}' has no direction declaration")
+        self.modules.append(module)
+        return j
+
+    def _body(self, i: int, module: ModuleDecl, end_keyword: str) -> int:
+        tokens = self.tokens
+        items = self._items
+        n = self.n
+        generate_depth = 0
+        while i < n:
+            token = tokens[i]
+            if token == end_keyword:
+                module.end_line = self._line(i)
+                if generate_depth > 0:
+                    self._issue("error", i, f"'begin' without matching 'end' in '{module.name}'")
+                return self._skip_label(i + 1)
+            handler = items.get(token)
+            if handler is not None:
+                i = handler(i, module)
+            elif tokens[i + 1] == ":" and (token == "default" or _is_identifier(token) or token[0].isdigit()
+                                           or token[0] == "'"):
+                # Generate case item or a labelled item
+                i += 2
+            elif _is_identifier(token):
+                i = self._instances(i, module)
+            elif token == "begin":
+                generate_depth += 1
+                i = self._skip_label(i + 1)
+            elif token == "end":
+                if generate_depth == 0:
+                    self._issue("error", i, "'end' without matching 'begin'")
+                else:
+                    generate_depth -= 1
+                i = self._skip_label(i + 1)
+            elif token in ("if", "for", "case") or token in _CASES:
+                i = self._group_end(i + 1) + 1 if tokens[i + 1] == "(" else i + 1
+            elif token in ("generate", "endgenerate", "else", "endcase", ";", "default"):
+                i += 1
+            elif token in _SKIPPED_BLOCKS:
+                i = self._skip_block(i, _SKIPPED_BLOCKS[token])
+            elif token in _UNIT_ENDS or token in _UNITS:
+                break
+            elif token[0] == "`":
+                i = self._group_end(i + 1) + 1 if tokens[i + 1] == "(" else i + 1
+            else:
+                i = self._semicolon(i) + 1
+        self._issue("error", min(i, n), f"Missing {end_keyword} statement for {module.kind} '{module.name}'")
+        return i
+
+    def parse(self) -> VerilogAST:
+        tokens = self.tokens
+        n = self.n
+        self.modules: List[ModuleDecl] = []
+        for offset, message in self.problems:
+            self.issues.append(("error", self._line_at(offset), message))
+        i = 0
+        while i < n:
+            token = tokens[i]
+            if token in _UNITS:
+                i = self._unit(i)
+            elif token in _UNIT_ENDS:
+                self._issue("error", i, f"'{token}' without matching '{'module' if token == 'endmodule' else token[3:]}'")
+                i += 1
+            elif token in _SKIPPED_BLOCKS:
+                i = self._skip_block(i, _SKIPPED_BLOCKS[token])
+            else:
+                i += 1
+        self._check_loops()
+        self._check_duplicates()
+        self.issues.sort(key=lambda issue: issue[1])
+        return VerilogAST(modules=self.modules, issues=self.issues, metrics=self._metrics())
+
+    def _check_loops(self):
+        for module in self.modules:
+            for assign in module.assigns:
+                sources = set(assign.sources)
+                for target in assign.targets:
+                    if target in sources:
+                        self.issues.append(("warning", assign.line,
+                                            f"Potential combinational loop with variable '{target}'"))
+
+    def _check_duplicates(self):
+        seen = set()
+        for module in self.modules:
+            if module.name in seen:
+                self.issues.append(("error", module.line, f"Duplicate definition of {module.kind} '{module.name}'"))
+            seen.add(module.name)
+
+    def _metrics(self) -> Dict[str, int]:
+        source = self.source
+        total = source.count('\n') + 1
+        non_blank = len(_NONBLANK_LINE.findall(source))
+        if self.comments:
+            pieces = []
+            previous = 0
+            for offset, text in self.comments:
+                pieces.append(source[previous:offset])
+                pieces.append('\n' * text.count('\n'))
+                previous = offset + len(text)
+            pieces.append(source[previous:])
+            code_lines = len(_NONBLANK_LINE.findall("".join(pieces)))
+        else:
+            code_lines = non_blank
+        return {
+            "total_lines": total,
+            "code_lines": code_lines,
+            "comment_lines": non_blank - code_lines,
+            "blank_lines": total - non_blank,
+            "tokens": self.n
+        }
+
+
+def parse_verilog(source: str) -> VerilogAST:
+    """
+    Parse Verilog/SystemVerilog source into an AST
+
+    Args:
+        source: RTL source text (one or more design units)
+
+    Returns:
+        VerilogAST with the design units, issues and line metrics
+    """
+    return _Parser(source or "").parse()
+
+
+def dumps(ast: VerilogAST) -> bytes:
+    """Serialize an AST to bytes for the RTL analysis cache"""
+    return marshal.dumps((AST_VERSION, ast.to_tuple()))
+
+
+def loads(data: bytes) -> Optional[VerilogAST]:
+    """Deserialize an AST written by dumps, or None if it is from another AST_VERSION"""
+    version, values = marshal.loads(data)
+    if version != AST_VERSION:
+        return None
+    return VerilogAST.from_tuple(values)
@@ -0,0 +1,310 @@
+"""
+Streaming ZIP archive writer
+
+Archives are produced on the fly from files on disk in fixed-size chunks, so
+memory use does not depend on archive size. Output is deterministic for a
+given entry list and compression level (fixed entry order and timestamps),
+which lets an interrupted download resume from a byte offset.
+
+Stored (level 0) archives have a layout that is known up front: their total
+size is computed without reading any data and a byte range is served by
+seeking straight into the member file. Deflated archives are regenerated
+and skipped up to the requested offset.
+"""
+
+import hashlib
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
+
+READ_CHUNK_SIZE = 64 * 1024
+ZIP32_LIMIT = 0xFFFFFFFF
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_DATA_DESCRIPTOR = struct.Struct("<IIII")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+
+# Bit 3: sizes and CRC follow the data; bit 11: UTF-8 names
+_FLAGS = 0x0808
+_VERSION = 20
+_EXTERNAL_ATTR = 0o100644 << 16
+
+_crc_cache: "OrderedDict[Tuple, int]" = OrderedDict()
+_crc_cache_lock = threading.Lock()
+_CRC_CACHE_SIZE = 4096
+
+
+class ZipEntry:
+    """
+    A file to place in the archive
+
+    Args:
+        arcname: Name inside the archive
+        file_path: Source path (also identifies the entry in the ETag)
+        size: Uncompressed size in bytes
+        modified: Timestamp recorded in the archive
+        opener: Returns a binary file object with the content; defaults to
+            opening file_path. It must support forward seeks.
+        cache_key: Stable content key for the CRC cache; defaults to the
+            path, size and modification time of file_path
+    """
+
+    def __init__(self, arcname: str, file_path: str, size: int, modified: datetime = None,
+                 opener: Callable[[], BinaryIO] = None, cache_key: str = None):
+        self.arcname = arcname
+        self.name_bytes = arcname.encode("utf-8")
+        self.file_path = file_path
+        self.size = size
+        self.modified = modified or datetime(1980, 1, 1)
+        self.cache_key = cache_key
+        self._opener = opener
+
+    def open(self) -> BinaryIO:
+        if self._opener is not None:
+            return self._opener()
+        return open(self.file_path, "rb")
+
+    @property
+    def dos_datetime(self) -> Tuple[int, int]:
+        stamp = max(self.modified, datetime(1980, 1, 1))
+        dos_time = (stamp.hour << 11) | (stamp.minute << 5) | (stamp.second // 2)
+        dos_date = ((stamp.year - 1980) << 9) | (stamp.month << 5) | stamp.day
+        return dos_time, dos_date
+
+
+def _crc_key(entry: ZipEntry) -> Tuple:
+    if entry.cache_key is not None:
+        return (entry.cache_key,)
+    stat = os.stat(entry.file_path)
+    return (entry.file_path, stat.st_size, stat.st_mtime)
+
+
+def _remember_crc(entry: ZipEntry, crc: int):
+    key = _crc_key(entry)
+    with _crc_cache_lock:
+        _crc_cache[key] = crc
+        if len(_crc_cache) > _CRC_CACHE_SIZE:
+            _crc_cache.popitem(last=False)
+
+
+def entry_crc32(entry: ZipEntry) -> int:
+    """CRC-32 of an entry's content, cached by its content key"""
+    key = _crc_key(entry)
+    with _crc_cache_lock:
+        if key in _crc_cache:
+            _crc_cache.move_to_end(key)
+            return _crc_cache[key]
+
+    crc = 0
+    with entry.open() as f:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+
+    _remember_crc(entry, crc)
+    return crc
+
+
+class ZipStream:
+    """
+    Deterministic streaming ZIP archive over a list of entries
+
+    Args:
+        entries: Archive members, written in the given order
+        compress_level: 0 to store, 1-9 to deflate
+    """
+
+    def __init__(self, entries: List[ZipEntry], compress_level: int = 0):
+        if not 0 <= compress_level <= 9:
+            raise ValueError("Compression level must be between 0 and 9")
+        self.entries = entries
+        self.compress_level = compress_level
+        self.method = 8 if compress_level else 0
+        self._size: Optional[int] = self._stored_size() if not compress_level else None
+
+    @property
+    def etag(self) -> str:
+        """Validator that changes whenever the archive bytes would change"""
+        digest = hashlib.sha256(f"zip:{self.compress_level}".encode())
+        for entry in self.entries:
+            digest.update(entry.name_bytes + b"\0")
+            digest.update(f"{entry.size}:{entry.modified.isoformat()}:{entry.file_path}\0".encode())
+        return f'"{digest.hexdigest()[:32]}"'
+
+    @property
+    def size(self) -> Optional[int]:
+        """Archive size in bytes, or None while unknown for deflated archives"""
+        return self._size
+
+    def compute_size(self) -> int:
+        """Get the archive size, generating a deflated archive once if needed"""
+        if self._size is None:
+            self._size = sum(len(chunk) for chunk in self._generate())
+        return self._size
+
+    def _stored_size(self) -> int:
+        size = 0
+        for entry in self.entries:
+            size += _LOCAL_HEADER.size + len(entry.name_bytes) + entry.size + _DATA_DESCRIPTOR.size
+            size += _CENTRAL_HEADER.size + len(entry.name_bytes)
+        size += _END_RECORD.size
+        if size > ZIP32_LIMIT:
+            raise ValueError("Archive would exceed 4 GiB; select fewer files")
+        return size
+
+    def iter_bytes(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Yield archive bytes from start up to and including end
+
+        Args:
+            start: First byte offset
+            end: Last byte offset (inclusive), or None for the rest of the archive
+
+        Yields:
+            Archive chunks
+        """
+        if self.method == 0:
+            source = self._generate_stored_from(start)
+            position = start
+        else:
+            source = self._generate()
+            position = 0
+
+        for chunk in source:
+            chunk_end = position + len(chunk)
+            if chunk_end > start:
+                low = max(start - position, 0)
+                high = len(chunk) if end is None else min(len(chunk), end + 1 - position)
+                if high > low:
+                    yield chunk[low:high]
+            position = chunk_end
+            if end is not None and position > end:
+                break
+
+    def _local_header(self, entry: ZipEntry) -> bytes:
+        dos_time, dos_date = entry.dos_datetime
+        return _LOCAL_HEADER.pack(
+            0x04034b50, _VERSION, _FLAGS, self.method, dos_time, dos_date,
+            0, 0, 0, len(entry.name_bytes), 0
+        ) + entry.name_bytes
+
+    def _central_header(self, entry: ZipEntry, crc: int, compressed: int, offset: int) -> bytes:
+        dos_time, dos_date = entry.dos_datetime
+        return _CENTRAL_HEADER.pack(
+            0x02014b50, _VERSION, _VERSION, _FLAGS, self.method, dos_time, dos_date,
+            crc, compressed, entry.size, len(entry.name_bytes), 0, 0, 0, 0,
+            _EXTERNAL_ATTR, offset
+        ) + entry.name_bytes
+
+    def _end_record(self, central_size: int, central_offset: int) -> bytes:
+        count = len(self.entries)
+        return _END_RECORD.pack(0x06054b50, 0, 0, count, count, central_size, central_offset, 0)
+
+    def _read_member(self, entry: ZipEntry, offset: int = 0) -> Iterator[bytes]:
+        remaining = entry.size - offset
+        with entry.open() as f:
+            if offset:
+                f.seek(offset)
+            while remaining > 0:
+                chunk = f.read(min(READ_CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise ValueError(f"{entry.arcname} changed while archiving")
+                remaining -= len(chunk)
+                yield chunk
+
+    def _generate(self) -> Iterator[bytes]:
+        """Generate the whole archive from the start"""
+        offset = 0
+        central = []
+        for entry in self.entries:
+            header = self._local_header(entry)
+            yield header
+            entry_offset = offset
+            offset += len(header)
+
+            crc = 0
+            written = 0
+            compressor = zlib.compressobj(self.compress_level, zlib.DEFLATED, -15) if self.method else None
+            for chunk in self._read_member(entry):
+                crc = zlib.crc32(chunk, crc)
+                if compressor:
+                    chunk = compressor.compress(chunk)
+                if chunk:
+                    written += len(chunk)
+                    yield chunk
+            if compressor:
+                tail = compressor.flush()
+                written += len(tail)
+                yield tail
+            offset += written
+
+            descriptor = _DATA_DESCRIPTOR.pack(0x08074b50, crc, written, entry.size)
+            yield descriptor
+            offset += len(descriptor)
+            if offset > ZIP32_LIMIT:
+                raise ValueError("Archive would exceed 4 GiB; select fewer files")
+            central.append(self._central_header(entry, crc, written, entry_offset))
+
+        central_bytes = b"".join(central)
+        yield central_bytes
+        yield self._end_record(len(central_bytes), offset)
+
+    def _generate_stored_from(self, start: int) -> Iterator[bytes]:
+        """
+        Generate a stored archive from byte offset start
+
+        Member data before start is skipped by seeking, so resuming near the
+        end of a large archive does not re-read what was already sent. CRCs
+        of skipped members come from the CRC cache.
+        """
+        def clip(data: bytes, data_start: int) -> bytes:
+            return data[max(start - data_start, 0):]
+
+        position = 0
+        offsets = []
+        crcs = []
+        for entry in self.entries:
+            header = self._local_header(entry)
+            offsets.append(position)
+            header_end = position + len(header)
+            data_end = header_end + entry.size
+            entry_end = data_end + _DATA_DESCRIPTOR.size
+
+            crc = None
+            if entry_end > start:
+                if header_end > start:
+                    yield clip(header, position)
+                if data_end > start:
+                    skip = max(start - header_end, 0)
+                    if skip == 0:
+                        crc = 0
+                        for chunk in self._read_member(entry):
+                            crc = zlib.crc32(chunk, crc)
+                            yield chunk
+                        _remember_crc(entry, crc)
+                    else:
+                        yield from self._read_member(entry, skip)
+                if crc is None:
+                    crc = entry_crc32(entry)
+                yield clip(_DATA_DESCRIPTOR.pack(0x08074b50, crc, entry.size, entry.size), data_end)
+            crcs.append(crc)
+            position = entry_end
+
+        central_size = sum(_CENTRAL_HEADER.size + len(e.name_bytes) for e in self.entries)
+        if position + central_size > start:
+            central = b"".join(
+                self._central_header(
+                    entry, crc if crc is not None else entry_crc32(entry),
+                    entry.size, entry_offset
+                )
+                for entry, crc, entry_offset in zip(self.entries, crcs, offsets)
+            )
+            yield clip(central, position)
+        yield clip(self._end_record(central_size, position), position + central_size)
@@ -0,0 +1,100 @@
+"""
+Benchmark FileParser.parse_requirements against the previous implementation
+
+Builds requirement matrices of increasing size, serialized as YAML and as
+JSON, checks that both implementations load the same data and reports the
+time each takes. The previous code always tried the pure-Python YAML loader
+first, even for JSON.
+
+Usage (from the backend directory):
+    python benchmarks/bench_requirements.py [--entries 1000 10000] [--repeat 3]
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict
+
+import yaml
+
+from bench_spec_parser import file_parser
+
+FileParser = file_parser.FileParser
+
+
+def legacy_parse_requirements(file_content: str) -> Dict[str, Any]:
+    """parse_requirements as it was before format sniffing"""
+    try:
+        return yaml.safe_load(file_content)
+    except:
+        pass
+    try:
+        return json.loads(file_content)
+    except:
+        pass
+    requirements = {}
+    for line in file_content.split('\n'):
+        if ':' in line:
+            key, value = line.split(':', 1)
+            requirements[key.strip()] = value.strip()
+    return requirements
+
+
+def generate_requirements(entries: int, seed: int = 0) -> Dict[str, Any]:
+    """Synthetic requirements file with a matrix of entries"""
+    rng = random.Random(seed)
+    return {
+        "interface": "AXI4-Lite",
+        "data_width": 32,
+        "address_width": 32,
+        "clock_frequency": "200MHz",
+        "requirements": [
+            {
+                "id": f"REQ-{index:06d}",
+                "description": f"Register {index} shall reset to 0x{rng.randint(0, 0xFFFF):04X} and be readable",
+                "priority": rng.choice(["high", "medium", "low"]),
+                "category": rng.choice(["functional", "timing", "power", "interface"]),
+                "verification": {"method": rng.choice(["sim", "formal"]), "coverage": rng.randint(80, 100)},
+            }
+            for index in range(entries)
+        ],
+    }
+
+
+def best_of(func, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, nargs="+", default=[1000, 10000], help="Matrix sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    print(f"loaders: yaml={file_parser._YAML_LOADER.__name__} json={file_parser._json_loads.__module__}")
+    print(f"{'entries':>8} {'format':>6} {'size':>8} {'legacy':>9} {'sniffed':>9} {'speedup':>8}")
+    for entries in args.entries:
+        data = generate_requirements(entries)
+        documents = {
+            "yaml": yaml.safe_dump(data, sort_keys=False),
+            "json": json.dumps(data, indent=2),
+        }
+        for name, text in documents.items():
+            if legacy_parse_requirements(text) != FileParser.parse_requirements(text):
+                raise SystemExit(f"Results differ for {entries} entries as {name}")
+            legacy = best_of(legacy_parse_requirements, text, args.repeat)
+            sniffed = best_of(FileParser.parse_requirements, text, args.repeat)
+            print(
+                f"{entries:>8} {name:>6} {len(text) / 1e6:>6.1f}MB {legacy:>8.3f}s {sniffed:>8.3f}s "
+                f"{legacy / sniffed:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark FileParser.parse_specification against the previous implementation
+
+Generates synthetic specifications of 1-50 MB (prose, key/value parameters,
+interface and port lines, protocol mentions), checks that both parsers give
+identical results and reports the time each takes.
+
+Usage (from the backend directory):
+    python benchmarks/bench_spec_parser.py [--sizes 1 5 10 25 50] [--repeat 3]
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import re
+import time
+from typing import Any, Dict
+
+# Load the parser module directly so importing the app package does not
+# start the application services
+_PARSER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app", "utils", "file_parser.py")
+_spec = importlib.util.spec_from_file_location("file_parser", _PARSER_PATH)
+file_parser = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(file_parser)
+FileParser = file_parser.FileParser
+
+
+def legacy_parse_specification(file_content: str, file_type: str = "txt") -> Dict[str, Any]:
+    """parse_specification as it was before the single-pass scanner"""
+    parsed_data = {
+        "raw_text": file_content,
+        "interfaces": [],
+        "protocols": [],
+        "requirements": {},
+        "parameters": {}
+    }
+
+    interface_patterns = [
+        r'interface\s*:\s*(.+)',
+        r'port\s*:\s*(.+)',
+        r'input\s+(\w+\s*\w*)\s*,\s*output',
+        r'output\s+(\w+\s*\w*)\s*,\s*input'
+    ]
+
+    for pattern in interface_patterns:
+        matches = re.findall(pattern, file_content, re.IGNORECASE)
+        parsed_data["interfaces"].extend(matches)
+
+    protocol_keywords = ['AXI', 'AHB', 'APB', 'UART', 'SPI', 'I2C', 'PCIe', 'Ethernet']
+    for keyword in protocol_keywords:
+        if keyword.lower() in file_content.lower():
+            parsed_data["protocols"].append(keyword)
+
+    param_pattern = r'(\w+)\s*[:=]\s*([^\n]+)'
+    params = re.findall(param_pattern, file_content)
+    for key, value in params:
+        parsed_data["parameters"][key.strip()] = value.strip()
+
+    return parsed_data
+
+
+_WORDS = (
+    "the data bus shall support burst transfers with configurable width and "
+    "the controller must handle read write requests when reset is asserted "
+    "clock domain crossing fifo depth latency throughput report transport"
+).split()
+
+
+def generate_spec(size_mb: float, seed: int = 0) -> str:
+    """Synthetic specification text of roughly size_mb megabytes"""
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    lines = []
+    length = 0
+    index = 0
+    while length < target:
+        roll = rng.random()
+        if roll < 0.55:
+            line = " ".join(rng.choice(_WORDS) for _ in range(14)) + "."
+        elif roll < 0.75:
+            line = f"param_{index % 700}: {rng.randint(1, 4096)}"
+        elif roll < 0.80:
+            line = f"Interface: {rng.choice(['AXI4', 'AHB-Lite', 'APB3', 'UART'])} slave {index % 50}"
+        elif roll < 0.84:
+            line = f"  port : data_{index % 32}[31:0]"
+        elif roll < 0.88:
+            line = f"input clk_{index % 8}, output ready_{index % 8}"
+        elif roll < 0.94:
+            line = f"## {index}. Register map"
+        else:
+            line = f"WIDTH = {index % 64}"
+        lines.append(line)
+        length += len(line) + 1
+        index += 1
+    return "\n".join(lines)
+
+
+def best_of(func, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 5, 10, 25, 50], help="Spec sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'size':>8} {'legacy':>10} {'scanner':>10} {'speedup':>8}  identical")
+    for size in args.sizes:
+        text = generate_spec(size)
+        if legacy_parse_specification(text) != FileParser.parse_specification(text):
+            raise SystemExit(f"Results differ for the {size} MB spec")
+        legacy = best_of(legacy_parse_specification, text, args.repeat)
+        scanner = best_of(FileParser.parse_specification, text, args.repeat)
+        print(f"{size:>6g}MB {legacy:>9.3f}s {scanner:>9.3f}s {legacy / scanner:>7.1f}x  yes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark the streaming TextProcessor against the previous list-based code
+
+Runs normalize_specification, split_into_sections and estimate_complexity
+on synthetic specifications, checks the results match the previous
+implementation and reports time and peak traced memory. The streaming code
+is also measured reading from a file, where only one chunk is in memory.
+
+Usage (from the backend directory):
+    python benchmarks/bench_text_stream.py [--sizes 1 10 30]
+"""
+
+import argparse
+import codecs
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+from typing import IO, Any, Dict, Iterator, List, Tuple, Union
+
+from bench_spec_parser import generate_spec
+
+_UTILS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app", "utils", "__init__.py")
+
+
+def _load_text_processor():
+    """Exec the text processing section of app/utils without importing the package"""
+    with open(_UTILS_PATH, encoding="utf-8") as f:
+        source = f.read()
+    start = source.index("# Text processing utilities")
+    end = source.index("# Code formatting utilities")
+    namespace = {
+        "re": re, "codecs": codecs, "IO": IO, "Any": Any, "Dict": Dict, "Iterator": Iterator,
+        "List": List, "Tuple": Tuple, "Union": Union,
+    }
+    exec(compile(source[start:end], _UTILS_PATH, "exec"), namespace)
+    return namespace["TextProcessor"]
+
+
+TextProcessor = _load_text_processor()
+
+
+class LegacyTextProcessor:
+    """The list-based implementations the streaming code replaced"""
+
+    @staticmethod
+    def normalize_specification(text: str) -> str:
+        if not text:
+            return ""
+        text = re.sub(r'\r\n', '\n', text)
+        text = re.sub(r'\r', '\n', text)
+        text = re.sub(r'\n\s*\n', '\n\n', text)
+        text = re.sub(r'[ \t]+', ' ', text)
+        lines = [line.strip() for line in text.split('\n')]
+        text = '\n'.join(lines)
+        return text.strip()
+
+    @staticmethod
+    def split_into_sections(text: str) -> Dict[str, str]:
+        sections = {}
+        current_section = "general"
+        current_content = []
+        for line in text.split('\n'):
+            if (':' in line and len(line.strip()) < 100) or line.strip().isupper():
+                if current_content:
+                    sections[current_section] = '\n'.join(current_content).strip()
+                    current_content = []
+                current_section = line.strip().lower().replace(':', '').replace(' ', '_')
+            else:
+                current_content.append(line)
+        if current_content:
+            sections[current_section] = '\n'.join(current_content).strip()
+        return sections
+
+    @staticmethod
+    def estimate_complexity(text: str) -> Dict[str, Any]:
+        word_count = len(text.split())
+        line_count = len(text.split('\n'))
+        section_count = len(LegacyTextProcessor.split_into_sections(text))
+        keyword_count = len(TextProcessor.extract_keywords(text))
+        complexity_score = (word_count / 100) + (section_count * 2) + (keyword_count * 0.5)
+        return {
+            "word_count": word_count,
+            "line_count": line_count,
+            "section_count": section_count,
+            "keyword_count": keyword_count,
+            "complexity_score": round(complexity_score, 2),
+        }
+
+
+def measure(func, *args) -> Tuple[Any, float, float]:
+    """Run func once; return its result, seconds and peak traced MB"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 10, 30], help="Spec sizes in MB")
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'function':<24} {'legacy':>16} {'stream (str)':>16} {'stream (file)':>16}")
+    for size in args.sizes:
+        text = generate_spec(size)
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8", newline="") as f:
+            f.write(text)
+        try:
+            for name in ("normalize_specification", "split_into_sections", "estimate_complexity"):
+                legacy, legacy_time, legacy_peak = measure(getattr(LegacyTextProcessor, name), text)
+                streamed, stream_time, stream_peak = measure(getattr(TextProcessor, name), text)
+                with open(f.name, "rb") as handle:
+                    from_file, file_time, file_peak = measure(getattr(TextProcessor, name), handle)
+                if name == "estimate_complexity":
+                    streamed = {key: streamed[key] for key in legacy}
+                    from_file = {key: from_file[key] for key in legacy}
+                if not legacy == streamed == from_file:
+                    raise SystemExit(f"{name} results differ for the {size} MB spec")
+                print(
+                    f"{size:>4g}MB {name:<24} {legacy_time:>6.2f}s {legacy_peak:>6.1f}MB "
+                    f"{stream_time:>6.2f}s {stream_peak:>6.1f}MB {file_time:>6.2f}s {file_peak:>6.1f}MB"
+                )
+        finally:
+            os.remove(f.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Benchmark the Verilog parser against the regex analysis helpers it replaced
+
+Generates synthetic RTL of 1-20 MB (parameterized modules with ANSI port
+lists, comments, always/case blocks, continuous assignments, instances and
+generate loops), parses it once and reports lexer and parser throughput,
+then times syntax/metrics/port analysis from the shared AST next to the
+previous regex helpers, which each rescanned the text. A small sample with
+ports in comments, strings and functions shows where the regexes misparse.
+
+Usage (from the backend directory):
+    python benchmarks/bench_verilog_parser.py [--sizes 1 5 20] [--repeat 3]
+"""
+
+import argparse
+import importlib
+import os
+import random
+import re
+import sys
+import time
+import types
+from typing import Any, Callable, Dict, List, Union
+
+_UTILS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app", "utils")
+
+
+def _load_parser():
+    """Import app/utils/verilog_parser.py without running the package __init__"""
+    package = types.ModuleType("rtl_utils")
+    package.__path__ = [_UTILS_DIR]
+    sys.modules["rtl_utils"] = package
+    return importlib.import_module("rtl_utils.verilog_parser")
+
+
+def _load_analyses():
+    """Exec the RTL analysis helpers of app/utils against the parser module"""
+    path = os.path.join(_UTILS_DIR, "__init__.py")
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    namespace = {
+        "re": re, "Any": Any, "Dict": Dict, "List": List, "Union": Union,
+        "VerilogAST": verilog_parser.VerilogAST, "parse_verilog": verilog_parser.parse_verilog,
+    }
+    for start, end in (("# Code formatting utilities", "# Specification validation"),
+                       ("def extract_ports_from_rtl", "def analyze_specification")):
+        section = source[source.index(start):source.index(end)]
+        exec(compile(section, path, "exec"), namespace)
+    return types.SimpleNamespace(**namespace)
+
+
+verilog_parser = _load_parser()
+utils = _load_analyses()
+
+
+def legacy_extract_module_ports(code: str) -> Dict[str, List[Dict[str, str]]]:
+    """CodeFormatter.extract_module_ports as it was before the parser"""
+    ports = {"inputs": [], "outputs": [], "inouts": []}
+    port_pattern = r'(input|output|inout)\s+(wire|reg)?\s*(\[.*?\])?\s*(\w+)'
+    for match in re.finditer(port_pattern, code, re.IGNORECASE):
+        width = match.group(3) or ""
+        ports[match.group(1).lower() + "s"].append({
+            "name": match.group(4),
+            "type": match.group(2) or "wire",
+            "width": width.strip('[] ') if width else "1",
+            "description": ""
+        })
+    return ports
+
+
+def legacy_count_code_metrics(code: str) -> Dict[str, int]:
+    """CodeFormatter.count_code_metrics as it was before the parser"""
+    lines = code.split('\n')
+    return {
+        "total_lines": len(lines),
+        "code_lines": len([line for line in lines if line.strip() and not line.strip().startswith('//')]),
+        "comment_lines": len([line for line in lines if line.strip().startswith('//')]),
+        "blank_lines": len([line for line in lines if not line.strip()]),
+        "always_blocks": len(re.findall(r'\balways\b', code, re.IGNORECASE)),
+        "assign_statements": len(re.findall(r'\bassign\b', code, re.IGNORECASE)),
+        "module_instances": len(re.findall(r'\b\w+\s+\w+\s*\(', code))
+    }
+
+
+def legacy_validate_verilog_syntax(code: str) -> Dict[str, Any]:
+    """validate_verilog_syntax as it was before the parser"""
+    issues = []
+    warnings = []
+    if "module" not in code:
+        issues.append("Missing module declaration")
+    if "endmodule" not in code:
+        issues.append("Missing endmodule statement")
+    if "always @" in code and "begin" not in code:
+        warnings.append("Always block may be missing begin/end")
+    if re.search(r'=\s*\'[bdh]?x', code, re.IGNORECASE):
+        warnings.append("Code contains unknown values (X) - ensure intentional")
+    if "assign" in code and "=" in code:
+        for line in code.split('\n'):
+            if "assign" in line and "=" in line and re.search(r'assign\s+\w+\s*=\s*\w+', line):
+                var_match = re.search(r'assign\s+(\w+)\s*=', line)
+                if var_match and re.search(r'=\s*[^=]*\b' + re.escape(var_match.group(1)) + r'\b', line):
+                    warnings.append(f"Potential combinational loop with variable '{var_match.group(1)}'")
+    return {"valid": len(issues) == 0, "issues": issues, "warnings": warnings}
+
+
+def generate_module(rng: random.Random, name: str, children: List[str]) -> str:
+    """One synthetic module, instantiating some of the earlier ones"""
+    width = rng.choice((8, 16, 32))
+    lines = [
+        f"// {name}: generated block",
+        f"module {name} #(",
+        f"    parameter WIDTH = {width},  // data width",
+        f"    parameter DEPTH = {rng.choice((4, 8, 16))},",
+        "    localparam AW = $clog2(DEPTH)",
+        ") (",
+        "    input  wire             clk,    // system clock",
+        "    input  wire             rst_n,  // active low reset",
+        "    input  wire [WIDTH-1:0] din,",
+        "    input  wire             valid,",
+        "    output reg  [WIDTH-1:0] dout,",
+        "    output wire             ready",
+        ");",
+        "    /* state and storage */",
+        "    reg [WIDTH-1:0] mem [0:DEPTH-1];",
+        "    reg [AW-1:0] wr_ptr, rd_ptr;",
+        "    reg [1:0] state;",
+        "    wire full = (wr_ptr + 1'b1) == rd_ptr;",
+        "",
+        "    assign ready = ~full & (state != 2'd3);",
+        "",
+        "    always @(posedge clk or negedge rst_n) begin",
+        "        if (!rst_n) begin",
+        "            wr_ptr <= '0;",
+        "            rd_ptr <= '0;",
+        "            state  <= 2'd0;",
+        "        end else begin",
+        "            case (state)",
+        "                2'd0: if (valid) state <= 2'd1;",
+        "                2'd1: begin",
+        "                    mem[wr_ptr] <= din;",
+        "                    wr_ptr <= wr_ptr + 1'b1;",
+        "                    state <= full ? 2'd3 : 2'd2;",
+        "                end",
+        "                2'd2: begin dout <= mem[rd_ptr]; rd_ptr <= rd_ptr + 1'b1; state <= 2'd0; end",
+        "                default: state <= 2'd0;",
+        "            endcase",
+        "        end",
+        "    end",
+    ]
+    for index, child in enumerate(rng.sample(children, min(len(children), rng.randint(0, 3)))):
+        lines += [
+            f"    {child} #(.WIDTH(WIDTH), .DEPTH({rng.choice((4, 8))})) u_{child}_{index} (",
+            "        .clk(clk), .rst_n(rst_n), .din(din ^ {WIDTH{1'b1}}), .valid(valid),",
+            f"        .dout(), .ready(ready_{index})",
+            "    );",
+        ]
+    lines += [
+        "    genvar g;",
+        "    generate",
+        "        for (g = 0; g < 4; g = g + 1) begin : g_pipe",
+        "            reg [WIDTH-1:0] stage;",
+        "            always @(posedge clk) stage <= din + g;",
+        "        end",
+        "    endgenerate",
+        f"endmodule // {name}",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def generate_rtl(size_mb: float, seed: int = 0) -> str:
+    """Synthetic RTL source of roughly size_mb megabytes"""
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    modules = []
+    names: List[str] = []
+    length = 0
+    while length < target:
+        name = f"block_{len(names)}"
+        module = generate_module(rng, name, names[-20:])
+        modules.append(module)
+        names.append(name)
+        length += len(module) + 1
+    return "\n".join(modules)
+
+
+TRICKY = r'''
+module tricky (
+    input  logic [7:0] a, b,   // two operands
+    output logic [8:0] sum
+);
+    // input wire [3:0] commented_out;
+    string msg = "output reg fake_port";
+    /* assign sum = sum; */
+    function automatic [8:0] add(input [7:0] x, input [7:0] y);
+        add = x + y;
+    endfunction
+    assign sum = add(a, b);
+endmodule
+'''
+
+
+def _best(function: Callable, source: Any, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(source)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 5, 20], help="RTL sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    ast = verilog_parser.parse_verilog(TRICKY)
+    legacy_ports = legacy_extract_module_ports(TRICKY)
+    print("misparse check (ports of `tricky`):")
+    print(f"  legacy regex: {sum(len(v) for v in legacy_ports.values())} "
+          f"{[p['name'] for v in legacy_ports.values() for p in v]}")
+    print(f"  parser:       {len(ast.modules[0].ports)} {[p.name for p in ast.modules[0].ports]}")
+    print()
+
+    print(f"{'size':>6} {'tokens':>9} {'lex':>10} {'parse':>10} {'analyses':>10} {'legacy':>10}")
+    for size in args.sizes:
+        source = generate_rtl(size)
+        megabytes = len(source) / (1024 * 1024)
+        lex_time = _best(verilog_parser.tokenize, source, args.repeat)
+        parse_time = _best(verilog_parser.parse_verilog, source, args.repeat)
+        ast = verilog_parser.parse_verilog(source)
+        assert not ast.errors, ast.errors[:5]
+
+        def from_ast(tree):
+            # What /analyze-rtl does after parsing: every analysis reads the AST
+            utils.validate_verilog_syntax(tree)
+            utils.CodeFormatter.count_code_metrics(tree)
+            utils.calculate_pp_metrics(tree)
+            utils.CodeFormatter.extract_module_ports(tree)
+
+        analysis_time = _best(from_ast, ast, args.repeat)
+
+        def legacy(text):
+            legacy_validate_verilog_syntax(text)
+            legacy_count_code_metrics(text)
+            legacy_extract_module_ports(text)
+
+        legacy_time = _best(legacy, source, args.repeat)
+        print(
+            f"{size:>4.0f}MB {ast.metrics['tokens']:>9} "
+            f"{megabytes / lex_time:>7.2f}MB/s {megabytes / parse_time:>7.2f}MB/s "
+            f"{analysis_time * 1000:>8.2f}ms {legacy_time:>9.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -16,13 +16,79 @@ class Settings:
     # File Upload
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
     UPLOAD_DIR: str = "uploads"
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB streaming read size
+    MAX_EXTRACTED_CHARS: int = 20 * 1024 * 1024  # Cap on text extracted from PDF/DOC/DOCX
+    CATALOG_DB_PATH: str = "uploads/catalog.db"  # SQLite project/artifact catalog
+    SEARCH_INDEX_MAX_CHARS: int = 10 * 1024 * 1024  # Per-file cap on full-text indexed text
+    ARTIFACT_COMPRESSION: str = os.getenv("ARTIFACT_COMPRESSION", "auto")  # auto, zstd, gzip or none
+    ARTIFACT_COMPRESSION_LEVEL: int = 6
+    ARTIFACT_COMPRESS_MIN_BYTES: int = 512
+    VERSION_KEYFRAME_INTERVAL: int = 10  # Store a full copy every N module versions
+    VERSION_CACHE_SIZE: int = 64
+    PARSE_CACHE_DB_PATH: str = "uploads/parse_cache.db"  # Parsed specifications keyed by content hash
+    PARSE_CACHE_MEMORY_ENTRIES: int = 256
+    PARSE_CACHE_MAX_ENTRIES: int = 10000
+    RTL_CACHE_MEMORY_ENTRIES: int = 256  # Parsed RTL and analysis results per process
+    RTL_CACHE_STORE_PATH: str = "uploads/rtl_analysis_cache.bin"  # Memory-mapped store shared by worker processes
+    RTL_CACHE_STORE_BYTES: int = 64 * 1024 * 1024  # 0 disables the shared store
+    RTL_CACHE_STORE_SLOTS: int = 16384
+    DURABLE_WRITES: bool = os.getenv("DURABLE_WRITES", "true").lower() == "true"  # fsync artifacts before acknowledging
+    FSYNC_BATCH_WINDOW_MS: float = 2.0  # How long a commit waits for concurrent writes to join it
+    STAGED_WRITE_MAX_AGE_SECONDS: int = 3600  # Older uncommitted writes are leftovers of a crashed process
+    
+    # Retention Settings
+    RETENTION_ENABLED: bool = os.getenv("RETENTION_ENABLED", "false").lower() == "true"
+    RETENTION_INTERVAL_SECONDS: int = 3600
+    RETENTION_BATCH_SIZE: int = 100  # Files deleted per batch
+    RETENTION_BATCH_PAUSE_SECONDS: float = 0.5  # Pause between batches to leave I/O to requests
+    RETENTION_EVICTION_ORDER: str = "lru"  # lru or age, for byte budgets
+    RETENTION_TEMP_MAX_AGE_HOURS: int = 24
+    RETENTION_POLICIES: dict = {
+        # max_age_hours, max_per_module, max_versions, max_total_bytes
+        "documents": {"max_age_hours": 24 * 30, "max_total_bytes": 2 * 1024 ** 3},
+        "specifications": {"max_age_hours": 24 * 90, "max_total_bytes": 2 * 1024 ** 3},
+        "rtl": {"max_per_module": 20, "max_versions": 50, "max_total_bytes": 4 * 1024 ** 3},
+        "testbenches": {"max_per_module": 10, "max_total_bytes": 2 * 1024 ** 3},
+        "reports": {"max_age_hours": 24 * 30, "max_total_bytes": 1024 ** 3},
+    }
+    
+    # Worker Pool Settings
+    PROCESS_POOL_WORKERS: int = 0  # 0 = one less than the CPU count
     
     # LLM Settings
     LLM_TEMPERATURE: float = 0.1
     MAX_TOKENS: int = 4000
+
+    # Hierarchical Generation Settings
+    HIERARCHICAL_GENERATION: bool = os.getenv("HIERARCHICAL_GENERATION", "false").lower() == "true"
+    HIERARCHY_MIN_SUBMODULES: int = 2  # Datapath blocks (FIFO, TX, RX, ...) a spec needs before it is split
+    HIERARCHY_MAX_CONCURRENCY: int = 4
+    HIERARCHY_MAX_ATTEMPTS: int = 2
+    
+    # Design Index Settings
+    DESIGN_INDEX_MAX_PROJECTS: int = 32  # Projects whose parsed RTL stays in memory
+    DESIGN_INDEX_MAX_DEPTH: int = 64
+    DESIGN_INDEX_MAX_INSTANCES: int = 20000  # Per elaborated top module
+    DESIGN_INDEX_READ_CONCURRENCY: int = 16  # Changed files read and parsed at once on refresh
     
     # RAG Settings
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
+    DEDUP_ENABLED: bool = True
+    DEDUP_HAMMING_THRESHOLD: int = 3
+    
+    # Multi-Query Retrieval Settings
+    MULTI_QUERY_ENABLED: bool = True
+    MULTI_QUERY_MAX_QUERIES: int = 8
+    MULTI_QUERY_MAX_CHARS: int = 512
+    RRF_K: int = 60
+    
+    # Re-ranking Settings
+    RERANK_ENABLED: bool = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+    RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_CANDIDATES: int = 20
+    RERANK_BATCH_SIZE: int = 16
+    RERANK_TIME_BUDGET_MS: int = 150
+    RERANK_CACHE_SIZE: int = 10000
 
 settings = Settings()
@@ -180,11 +180,21 @@ async def startup_event():
             print("⚠️  LLM service: No API key configured - using fallback mode")
     except Exception as e:
         print(f"❌ LLM service error: {e}")
+    
+    from app.services.retention import retention_worker
+    if retention_worker.enabled:
+        retention_worker.start()
+        print(f"🧹 Retention worker started - every {retention_worker.interval}s")
 
 # Shutdown event  
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
+    from app.services.process_pool import shutdown_process_pool
+    from app.services.retention import retention_worker
+    
+    await retention_worker.stop()
+    shutdown_process_pool()
     print("🛑 VLSI Design AI Tool Backend Shutting Down...")
 
 # Favicon
@@ -0,0 +1,28 @@
+"""
+Shared test setup
+
+The parsing utilities under app/utils are plain Python, but importing the
+app package runs app/__init__, which brings up every service (vector store,
+LLM clients, catalog). Register bare app and app.utils packages instead so
+tests can import those modules on their own.
+"""
+
+import os
+import sys
+import types
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLES_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "examples")
+
+for name, path in (("app", os.path.join(BACKEND_DIR, "app")),
+                   ("app.utils", os.path.join(BACKEND_DIR, "app", "utils"))):
+    if name not in sys.modules:
+        package = types.ModuleType(name)
+        package.__path__ = [path]
+        sys.modules[name] = package
+
+
+def read_example(*parts: str) -> str:
+    """Read a file from the repository's examples directory"""
+    with open(os.path.join(EXAMPLES_DIR, *parts), encoding="utf-8") as f:
+        return f.read()
@@ -0,0 +1,51 @@
+"""
+Tests for requirements parsing in app/utils/file_parser.py
+"""
+
+import pytest
+
+from app.utils.file_parser import FileParser, parse_requirements
+
+
+def test_prose_with_extra_colons_falls_back_to_text():
+    requirements = parse_requirements("Clock: 100 MHz\nNote: see section 3: timing")
+    assert requirements == {"Clock": "100 MHz", "Note": "see section 3: timing"}
+
+
+def test_markdown_bullets_are_not_a_requirements_matrix():
+    requirements = parse_requirements("# Design Requirements\n- Data width: 32 bits\n- Protocol: AXI4")
+    assert requirements == {"Data width": "32 bits", "Protocol": "AXI4"}
+
+
+def test_sniffed_values_outside_the_schema_fall_back_to_text():
+    assert parse_requirements("data_width: 32 bits") == {"data_width": "32 bits"}
+
+
+def test_sniffed_yaml_is_loaded():
+    requirements = parse_requirements("protocol: AXI4\ndata_width: 32\naddress_width: 8\n")
+    assert requirements == {"protocol": "AXI4", "data_width": 32, "address_width": 8}
+
+
+def test_sniffed_matrix_is_loaded():
+    content = "- id: R1\n  description: Reset clears all registers\n- id: R2\n  description: Writes are acknowledged\n"
+    requirements = parse_requirements(content)
+    assert [entry["id"] for entry in requirements["requirements"]] == ["R1", "R2"]
+
+
+def test_sniffed_json_is_loaded():
+    assert parse_requirements('{"protocol": "APB", "data_width": 32}') == {"protocol": "APB", "data_width": 32}
+
+
+@pytest.mark.parametrize("content, file_type", [
+    ("data_width: 32 bits", "yaml"),
+    ("Note: see section 3: timing", "yml"),
+    ('{"data_width": ', "json"),
+])
+def test_declared_format_is_enforced(content, file_type):
+    with pytest.raises(ValueError):
+        parse_requirements(content, file_type)
+
+
+def test_detect_format_prefers_extension():
+    assert FileParser.detect_requirements_format("a: 1", "json") == "json"
+    assert FileParser.detect_requirements_format("Some prose without structure") == "text"
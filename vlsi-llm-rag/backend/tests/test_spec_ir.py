@@ -0,0 +1,75 @@
+"""
+Tests for specification IR extraction in app/utils/spec_ir.py
+"""
+
+import pytest
+
+from app.utils.spec_ir import Register, SpecIR, dumps, extract_spec_ir, loads
+from conftest import read_example
+
+
+def test_unparsable_offset_is_not_a_register():
+    ir = extract_spec_ir("CTRL @ 0x_ RW")
+    assert ir.registers == []
+    ir.summary()
+
+
+def test_summary_without_offset():
+    ir = SpecIR(registers=[Register("CTRL", None, "RW")])
+    assert ir.summary() == "Register CTRL (RW)"
+
+
+def test_round_trips_through_dumps():
+    ir = extract_spec_ir("# Timer\nCTRL @ 0x00 RW reset 0x0\ninput [7:0] din\nDATA_WIDTH: 32\n")
+    assert loads(dumps(ir)) == ir
+
+
+def test_axi4_lite_example():
+    ir = extract_spec_ir(read_example("axi4_lite", "spec.txt"))
+    assert [(r.name, r.offset, r.access) for r in ir.registers] == [
+        ("CONTROL", 0x00, ""), ("DATA", 0x04, "RW"), ("CONFIGURATION", 0x08, "RW")
+    ]
+    assert [(f.name, f.bits, f.access) for f in ir.registers[0].fields] == [
+        ("ENABLE", "0", "RW"), ("INTERRUPT_ENABLE", "1", "RW"), ("STATUS", "2", "RO")
+    ]
+    assert ir.registers[0].description == "Control Register"
+    assert [(r.name, r.active_low) for r in ir.resets] == [("rst_n", True)]
+    assert [i.protocol for i in ir.interfaces] == ["AXI"]
+    assert [(c.name, c.frequency_hz) for c in ir.clocks] == [("clk", 100e6)]
+
+
+def test_uart_example():
+    ir = extract_spec_ir(read_example("uart", "spec.txt"))
+    assert [(r.name, r.offset, r.description) for r in ir.registers] == [
+        ("CTRL", None, "Control Register"),
+        ("STAT", None, "Status Register"),
+        ("BRD", None, "Baud Rate Divisor"),
+        ("TXD", None, "Transmit Data"),
+        ("RXD", None, "Receive Data"),
+    ]
+    assert [(i.name, i.protocol) for i in ir.interfaces] == [("APB slave interface for configuration", "APB")]
+    assert "Register CTRL" in ir.summary()
+
+
+def test_named_reset_takes_unnamed_traits():
+    ir = extract_spec_ir("Ports:\n- input aresetn\nAsynchronous active-low reset\n")
+    assert [(r.name, r.active_low, r.synchronous) for r in ir.resets] == [("aresetn", True, False)]
+
+
+@pytest.mark.parametrize("cell, width", [
+    ("8", 8),
+    ("7:0", 8),
+    ("[31:0]", 32),
+    ("[0:3]", 4),
+    ("WIDTH", "WIDTH"),
+    ("WIDTH-1:0", "WIDTH-1:0"),
+    ("[WIDTH-1:0]", "WIDTH-1:0"),
+    ("", 1),
+])
+def test_ports_table_widths(cell, width):
+    ir = extract_spec_ir(
+        "| Name | Direction | Width | Description |\n"
+        "|------|-----------|-------|-------------|\n"
+        f"| data | input | {cell} | Data in |\n"
+    )
+    assert [(p.name, p.direction, p.width) for p in ir.ports] == [("data", "input", width)]
@@ -0,0 +1,113 @@
+"""
+Tests for the Verilog lexer and parser in app/utils/verilog_parser.py
+"""
+
+import random
+import signal
+from contextlib import contextmanager
+
+import pytest
+
+from app.utils.verilog_parser import dumps, loads, parse_verilog
+
+COUNTER = """
+module counter #(parameter WIDTH = 8) (
+    input  wire             clk,
+    input  wire             rst_n,
+    output reg  [WIDTH-1:0] count
+);
+    always @(posedge clk or negedge rst_n) begin
+        if (!rst_n)
+            count <= 0;
+        else
+            case (count)
+                8'hff: count <= 0;
+                default: count <= count + 1'b1;
+            endcase
+    end
+endmodule
+
+module top (input clk, input rst_n, output [7:0] q);
+    counter #(.WIDTH(8)) u_counter (.clk(clk), .rst_n(rst_n), .count(q));
+endmodule
+"""
+
+# Mutations seen in truncated or hand-edited RTL
+FUZZ_TOKENS = [
+    "begin", "end", "case", "endcase", "module", "endmodule", "interface", "program",
+    "(", ")", ";", ":", "#", "[", "]", "{", "}", "generate", "endgenerate",
+    "function", "endfunction", "always", "assign", "if", "else", "'", "/*", '"', "=", "<=",
+]
+
+
+@contextmanager
+def time_limit(seconds: int):
+    """Fail instead of hanging where SIGALRM is available"""
+    if not hasattr(signal, "SIGALRM"):
+        yield
+        return
+
+    def expire(signum, frame):
+        raise TimeoutError(f"Parser did not finish within {seconds}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.alarm(seconds)
+    try:
+        yield
+    finally:
+        signal.alarm(0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def test_parses_modules_ports_and_instances():
+    ast = parse_verilog(COUNTER)
+    assert not ast.errors
+    assert [module.name for module in ast.modules] == ["counter", "top"]
+    counter = ast.module("counter")
+    assert [(port.name, port.direction, port.width) for port in counter.ports] == [
+        ("clk", "input", ""), ("rst_n", "input", ""), ("count", "output", "WIDTH-1:0")
+    ]
+    assert [module.name for module in ast.top_modules()] == ["top"]
+    instance = ast.module("top").instances[0]
+    assert (instance.module, instance.name) == ("counter", "u_counter")
+
+
+def test_round_trips_through_dumps():
+    ast = parse_verilog(COUNTER)
+    assert loads(dumps(ast)).to_dict() == ast.to_dict()
+
+
+def test_case_with_begin_reports_issue_instead_of_hanging():
+    source = "module m(input [1:0] state, output reg y);\n" \
+             "always @* case (state) begin 2'b00: y <= 0; end endcase\nendmodule\n"
+    with time_limit(5):
+        ast = parse_verilog(source)
+    assert any("Case item without ':'" in message for _, _, message in ast.errors)
+
+
+@pytest.mark.parametrize("source", [
+    "module",
+    "interface",
+    "program",
+    "module a; endmodule\nmodule",
+    "module a; b #",
+])
+def test_truncated_source_reports_issue(source):
+    ast = parse_verilog(source)
+    assert ast.errors
+
+
+def test_mutated_sources_never_raise_or_hang():
+    rng = random.Random(0)
+    for _ in range(1000):
+        cut = rng.randrange(len(COUNTER) + 1)
+        mutation = rng.random()
+        if mutation < 0.3:
+            source = COUNTER[:cut]
+        elif mutation < 0.6:
+            source = COUNTER[:cut] + COUNTER[cut + rng.randrange(40):]
+        else:
+            inserted = " ".join(rng.choice(FUZZ_TOKENS) for _ in range(rng.randint(1, 6)))
+            source = f"{COUNTER[:cut]} {inserted} {COUNTER[cut:]}"
+        with time_limit(5):
+            parse_verilog(source)